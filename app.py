@@ -1,12 +1,18 @@
 import streamlit as st
 import json
+import threading
 import pandas as pd
 from datetime import datetime, timedelta
-from utils.study_planner import StudyPlannerAgent
-from utils.ics_generator import generate_ics
-from utils.calendar_sync import sync_to_google_calendar
-from utils.auth_google import GoogleAuthManager
-from utils.exam_scout import ExamScoutAgent, update_exam_database
+from utils.study_planner import StudyPlannerAgent, plan_changes
+from utils.plan_cache import get_plan_cache
+from utils.streaming import background_iter
+from utils.syllabus_repo import get_subjects
+from utils.exam_index import load_exam_index
+from utils.ics_generator import generate_ics, build_ics_feed
+from utils.ics_feed import get_feed_store, start_feed_server, feeds_enabled, feed_id_for, public_feed_url
+from utils.calendar_sync import sync_to_google_calendar, sync_to_google_tasks, get_google_tasks_streak
+from utils.sync_journal import get_sync_journal
+from utils.scout_review import get_scout_review_queue
 
 # Page configuration
 st.set_page_config(
@@ -55,6 +61,35 @@ def load_exam_data():
             {"exam_name": "MHT-CET", "level": "State", "stream": "Engineering", "registration_start": "2024-11-15", "registration_end": "2024-12-20", "exam_date": "2025-05-27"}
         ]}
 
+def run_sync_with_progress(kind, sync, *args, **kwargs):
+    """
+    Run a Google sync on a worker thread, showing its progress from the sync journal.
+    Only the job this run opens is read, never another session's sync of the same kind.
+    """
+    outcome = {}
+    journal = get_sync_journal()
+    worker = threading.Thread(
+        target=lambda: outcome.update(result=sync(*args, on_job=lambda job_id: outcome.update(job=job_id), **kwargs)),
+        daemon=True
+    )
+    worker.start()
+    bar = st.progress(0.0, text="Starting sync...")
+    while worker.is_alive():
+        worker.join(0.25)
+        job = journal.progress(outcome['job']) if 'job' in outcome else None
+        if job and job['total']:
+            bar.progress(job['done'] / job['total'], text=f"{job['done']} of {job['total']} changes written")
+    bar.empty()
+    if 'job' in outcome:
+        st.session_state.setdefault('sync_jobs', {})[kind] = outcome['job']
+    return outcome.get('result') or {"status": "error", "message": "Sync stopped unexpectedly."}
+
+def show_unfinished_sync(kind, label):
+    job_id = st.session_state.get('sync_jobs', {}).get(kind)
+    job = get_sync_journal().progress(job_id) if job_id is not None else None
+    if job and job['status'] == 'failed':
+        st.caption(f"⚠️ Last {label} sync stopped at {job['done']} of {job['total']}. Syncing again picks up the rest.")
+
 # Authentication Logic (Google OAuth)
 if 'user_email' not in st.session_state:
     st.session_state['user_email'] = None
@@ -67,6 +102,7 @@ if not st.session_state['user_email']:
     # Sidebar Login
     with st.sidebar:
         st.header("Sign In")
+        from utils.auth_google import GoogleAuthManager
         google_auth = GoogleAuthManager()
         user_email = google_auth.login()
         
@@ -138,104 +174,34 @@ if page == "📅 Exam Calendar":
         # Prepare calendar events
         events = []
         
-        # We need to parse dates for the calendar
-        # Helper to parse specifically for the calendar view
-        def parse_dates_for_cal(date_str):
-            if not date_str: return []
-            import re
-            
-            all_events = []
+        # Session dates come pre-parsed from the exam index (data/exam_dates.index.json);
+        # here we only slice it down to the filtered exams.
+        exam_index = load_exam_index()['exams']
+
+        for exam_name in df['exam_name']:
+            entry = exam_index.get(exam_name)
+            if not entry:
+                continue
             
-            # Split by semicolon to handle multiple sessions (e.g. Session 1; Session 2)
-            parts = date_str.split(';')
-            
-            for part in parts:
-                part = part.strip()
-                if not part: continue
-                
-                # Extract potential label: Text before the date
-                # Simple heuristic: split by ':' if present, or take text before the first digit
-                label = ""
-                if ':' in part:
-                    label = part.split(':')[0].strip()
-                else:
-                    # try to extract text before the first number
-                    match_text = re.match(r'^([^\d]+)', part)
-                    if match_text:
-                        label = match_text.group(1).strip()
-                
-                events_found = []
-                
-                # 1. Range Pattern: "21-30 January 2026"
-                match_range = re.search(r'(\d{1,2})\s*[-–\u2013\u2014to]+\s*(\d{1,2})\s+([A-Za-z]+)\s+(\d{4})', part, re.IGNORECASE)
-                if match_range:
-                    d_start, d_end, m, y = match_range.groups()
-                    try:
-                        dt_start = datetime.strptime(f"{d_start} {m} {y}", "%d %B %Y")
-                        dt_end = datetime.strptime(f"{d_end} {m} {y}", "%d %B %Y")
-                        
-                        curr = dt_start
-                        while curr <= dt_end:
-                            d_str = curr.strftime('%Y-%m-%d')
-                            events_found.append({'start': d_str, 'end': d_str, 'label': label})
-                            curr += timedelta(days=1)
-                        all_events.extend(events_found)
-                        continue
-                    except: pass
-                
-                # 2. Month-Days-Year Pattern: "January 21, 22, 23... 2026"
-                months = "January|February|March|April|May|June|July|August|September|October|November|December"
-                match_main = re.search(fr'({months})\s+(.*?)\s+(\d{{4}})', part, re.IGNORECASE)
-                if match_main:
-                    mon_str = match_main.group(1)
-                    day_part = match_main.group(2)
-                    year_str = match_main.group(3)
-                    
-                    day_nums = re.findall(r'\d+', day_part)
-                    for d in day_nums:
-                        try:
-                            dt = datetime.strptime(f"{d} {mon_str} {year_str}", "%d %B %Y")
-                            events_found.append({'start': dt.strftime('%Y-%m-%d'), 'end': dt.strftime('%Y-%m-%d'), 'label': label})
-                        except: pass
-                    if events_found:
-                        all_events.extend(events_found)
-                        continue
-
-                # 3. Single Date / Fallback
-                match_single = re.search(r'(\d{1,2})\s+([A-Za-z]+)\s+(\d{4})', part)
-                if match_single:
-                    d, m, y = match_single.groups()
-                    try:
-                        dt = datetime.strptime(f"{d} {m} {y}", "%d %B %Y")
-                        all_events.append({'start': dt.strftime('%Y-%m-%d'), 'end': dt.strftime('%Y-%m-%d'), 'label': label})
-                    except: pass
-
-            return all_events
-
-        for index, row in df.iterrows():
-            raw_date = row['exam_date']
-            
-            # Get list of event dicts
-            valid_events = parse_dates_for_cal(raw_date)
-            
-            for event in valid_events:
+            for session in entry['sessions']:
                 # Construct title: "JEE (Main)" or "JEE (Main) - Session 1"
-                evt_title = row['exam_name']
-                if event.get('label'):
-                    evt_title += f" - {event['label']}"
+                evt_title = exam_name
+                if session['label']:
+                    evt_title += f" - {session['label']}"
                     
-                events.append({
-                    "title": evt_title,
-                    "start": event['start'],
-                    "end": event['end'],
-                    "resourceId": row['exam_name'],
-                    "extendedProps": {
-                       "level": row.get('level', ''),
-                       "stream": row.get('stream', ''),
-                       "original_text": raw_date,
-                       "desc": row.get('exam_date', '')
-                    }
-                })
+                for day in session['dates']:
+                    events.append({
+                        "title": evt_title,
+                        "start": day,
+                        "end": day,
+                        "resourceId": exam_name,
+                        "extendedProps": {
+                           "level": entry['level'],
+                           "stream": entry['stream'],
+                           "original_text": entry['exam_date'],
+                           "desc": entry['exam_date']
+                        }
+                    })
 
         # Calendar options
         calendar_options = {
@@ -314,20 +280,11 @@ elif page == "📚 Study Planner":
             st.caption(f"Max Score for {selected_exam}: {max_score}")
         
     with col2:
-        # Load Syllabus for dynamic subjects
-        # We need to peek at syllabus.json
-        import os
-        base_path = os.path.dirname(__file__)
-        syllabus_path = os.path.join(base_path, 'data', 'syllabus.json')
+        # Load Syllabus for dynamic subjects (shared, parsed once per process)
         subject_options = ["All", "Physics", "Chemistry", "Biology", "Mathematics", "English"] # Default
-        
-        try:
-            with open(syllabus_path, 'r') as f:
-                syl_data = json.load(f)
-                if selected_exam in syl_data:
-                    subject_list = list(syl_data[selected_exam].keys())
-                    subject_options = ["All"] + subject_list
-        except: pass
+        subject_list = get_subjects(selected_exam)
+        if subject_list:
+            subject_options = ["All"] + subject_list
         
         selected_subjects = st.multiselect("Subjects (Filter)", subject_options, default=["All"], help="Select 'All' or specific subjects.")
         
@@ -336,7 +293,7 @@ elif page == "📚 Study Planner":
         if "All" in selected_subjects:
             selected_subjects = [] 
         
-        # daily_hours currently unused in simple agent V1 but good to keep
+        # Chapters are packed into days by their time_required against this budget
         study_hours = st.number_input("Daily Study Hours", 1, 12, 4)
     
     # Check if we have data for this exam
@@ -357,22 +314,41 @@ elif page == "📚 Study Planner":
                  exam_name=selected_exam, 
                  exam_date=exam_info['exam_date'],
                  subjects=selected_subjects,
-                 target_year=target_year
+                 target_year=target_year,
+                 daily_hours=study_hours
              )
              
              with st.spinner("Agent is analyzing syllabus and generating plan..."):
-                 plan_df = agent.generate_plan()
+                 # Same exam, subjects, date and hours as an earlier click: reuse that plan
+                 plan_df = get_plan_cache().get_plan(agent)
              
              if isinstance(plan_df, dict) and "error" in plan_df:
                  st.error(plan_df['error'])
              elif isinstance(plan_df, pd.DataFrame) and not plan_df.empty:
                  st.success("✨ Study plan generated! Optimized based on chapter weightage.")
+                 # Kept so the plan can be adjusted later without regenerating it
+                 st.session_state['study_plan'] = {
+                     "exam": selected_exam,
+                     "plan": plan_df,
+                     "strategy_mode": agent.strategy_mode,
+                     "agent_args": dict(
+                         exam_name=selected_exam,
+                         exam_date=exam_info['exam_date'],
+                         subjects=selected_subjects,
+                         target_year=target_year,
+                         daily_hours=study_hours
+                     )
+                 }
+                 if agent.required_daily_hours > study_hours:
+                     st.warning(f"The selected syllabus needs about {agent.required_daily_hours:g} hours/day to finish before the exam.")
                  
-                 # AI Strategy
+                 # AI Strategy: requested now on a background thread, rendered into this
+                 # slot once the plan and exports below are on screen
+                 strategy_slot = st.empty()
+                 strategy_stream = None
                  if gemini_api_key:
-                     with st.spinner("🤖 AI Coach is formulating your strategy..."):
-                        strategy = agent.generate_ai_strategy(gemini_api_key, plan_df)
-                        st.info(strategy)
+                     strategy_stream = background_iter(agent.stream_ai_strategy(gemini_api_key, plan_df))
+                     strategy_slot.caption("🤖 AI Coach is formulating your strategy...")
                  elif not gemini_api_key:
                      st.caption("💡 Tip: Add a Gemini API Key in settings to get personalized AI strategy tips!")
 
@@ -400,7 +376,7 @@ elif page == "📚 Study Planner":
                  # Download button
                  csv = plan_df.to_csv(index=False).encode('utf-8')
                  
-                 exp_col1, exp_col2, exp_col3 = st.columns(3)
+                 exp_col1, exp_col2 = st.columns(2)
                  
                  with exp_col1:
                      st.download_button(
@@ -412,7 +388,10 @@ elif page == "📚 Study Planner":
                      )
                  
                  with exp_col2:
-                     ics_data = generate_ics(plan_df, selected_exam)
+                     # Stable UIDs: re-downloads only bump SEQUENCE on events that changed
+                     previous_feed = st.session_state.get('ics_manifests', {}).get(selected_exam)
+                     ics_data, ics_manifest, _ = build_ics_feed(plan_df, selected_exam, previous=previous_feed)
+                     st.session_state.setdefault('ics_manifests', {})[selected_exam] = ics_manifest
                      st.download_button(
                         "📅 Calendar (.ics)",
                         ics_data,
@@ -421,44 +400,128 @@ elif page == "📚 Study Planner":
                         key='download-ics'
                      )
 
-                 with exp_col3:
-                     # Google Tasks Button
-                     if st.button("✅ Google Tasks"):
-                         with st.spinner("Syncing..."):
-                             result = sync_to_google_tasks(plan_df, f"SG: {selected_exam}")
-                             if result['status'] == 'success':
-                                 st.success(result['message'])
-                             else:
-                                 st.error("Sync Failed")
-                                 with st.expander("See Error Info"):
-                                     st.warning(result['message'])
-                    
-                     # Google Calendar Button
-                     from utils.calendar_sync import sync_to_google_calendar
-                     if st.button("📅 Google Calendar (Direct)"):
-                        with st.spinner("Adding events to default calendar..."):
-                            result = sync_to_google_calendar(plan_df)
-                            if result['status'] == 'success':
-                                st.success(result['message'])
-                            else:
-                                st.error("Calendar Sync Failed")
-                                with st.expander("Error Details"):
-                                    st.write(result['message'])
-                                    st.info("Note: You may need to delete 'token.pickle' and re-login to grant Calendar permissions.")
-
-                                    st.markdown("""
-                                    **To enable Google Tasks/Calendar Sync:**
-                                    1. Create a project in Google Cloud Console.
-                                    2. Enable **'Google Tasks API'** and **'Google Calendar API'**.
-                                    3. Create 'Desktop App' credentials.
-                                    4. Download JSON and rename to `credentials.json`.
-                                    5. Place it in the root folder.
-                                    """)
+                 # Subscribable feed: calendar apps pick up later replans on their own.
+                 # Only offered when the deployment exposes the feed server publicly
+                 if feeds_enabled() and start_feed_server():
+                     feed_id = feed_id_for(user_email, selected_exam)
+                     get_feed_store().publish(feed_id, plan_df, selected_exam)
+                     st.caption("🔗 Subscribe in your calendar app to get plan changes automatically:")
+                     st.code(public_feed_url(feed_id), language=None)
+
+                 if strategy_stream is not None:
+                     with strategy_slot.container():
+                         st.write_stream(strategy_stream)
              else:
                   st.warning(f"No specific syllabus data found for {selected_exam}. Please select JEE-Main or NEET to see the demo.")
         else:
             st.error("Exam data not found.")
-            
+
+    # Google sync works from the saved plan: these buttons rerun the page, and the
+    # Generate branch above is gone on a rerun
+    saved_plan = st.session_state.get('study_plan')
+    if saved_plan and saved_plan['exam'] == selected_exam:
+        st.subheader("Sync to Google")
+        sync_plan = saved_plan['plan']
+        sync_col1, sync_col2 = st.columns(2)
+
+        with sync_col1:
+            show_unfinished_sync('tasks', "Google Tasks")
+            if st.button("✅ Google Tasks"):
+                with st.spinner("Syncing..."):
+                    # Reconciling sync: clicking again only sends what changed
+                    result = run_sync_with_progress('tasks', sync_to_google_tasks, sync_plan, f"SG: {selected_exam}",
+                                                    reconcile=True, exam_name=selected_exam)
+                    if result['status'] == 'success':
+                        st.success(result['message'])
+                    else:
+                        st.error("Sync Failed")
+                        with st.expander("See Error Info"):
+                            st.warning(result['message'])
+
+        with sync_col2:
+            show_unfinished_sync('calendar', "Google Calendar")
+            # Crunch plans pack several chapters into a day; one event per day keeps the calendar readable
+            per_day = st.checkbox("One event per day", value=saved_plan.get('strategy_mode') == "Short Term (Crunch)",
+                                  key='calendar-per-day',
+                                  help="Group each day's chapters into a single event with a checklist.")
+            if st.button("📅 Google Calendar (Direct)"):
+                with st.spinner("Adding events to default calendar..."):
+                    result = run_sync_with_progress('calendar', sync_to_google_calendar, sync_plan,
+                                                    reconcile=True, exam_name=selected_exam, per_day=per_day)
+                    if result['status'] == 'success':
+                        st.success(result['message'])
+                    else:
+                        st.error("Calendar Sync Failed")
+                        with st.expander("Error Details"):
+                            st.write(result['message'])
+                            st.info("Note: You may need to delete 'token.pickle' and re-login to grant Calendar permissions.")
+
+                            st.markdown("""
+                            **To enable Google Tasks/Calendar Sync:**
+                            1. Create a project in Google Cloud Console.
+                            2. Enable **'Google Tasks API'** and **'Google Calendar API'**.
+                            3. Create 'Desktop App' credentials.
+                            4. Download JSON and rename to `credentials.json`.
+                            5. Place it in the root folder.
+                            """)
+
+        # Replan: finished days stay as they are, only what's left is rescheduled from today
+        with st.expander("🔁 Missed a day or finished early? Replan from today"):
+            current_plan = saved_plan['plan']
+            chapter_options = {
+                f"{subject}: {chapter}": (subject, chapter)
+                for subject, chapter in dict.fromkeys(zip(current_plan['Subject'].astype(str), current_plan['Chapter']))
+            }
+            completed = st.multiselect("Completed chapters", list(chapter_options), key='replan-completed')
+            skipped = st.multiselect("Skipped chapters", list(chapter_options), key='replan-skipped')
+
+            if st.button("Replan"):
+                agent = StudyPlannerAgent(**saved_plan['agent_args'])
+                new_plan = agent.replan(
+                    current_plan,
+                    completed=[chapter_options[c] for c in completed],
+                    skipped=[chapter_options[c] for c in skipped]
+                )
+                if isinstance(new_plan, dict) and "error" in new_plan:
+                    st.error(new_plan['error'])
+                else:
+                    saved_plan['changes'] = plan_changes(current_plan, new_plan)
+                    saved_plan['plan'] = new_plan
+                    # Moved sessions plus CANCELLED entries for dropped ones
+                    feeds = st.session_state.setdefault('ics_manifests', {})
+                    new_manifest = {}
+                    saved_plan['changes_ics'] = generate_ics(
+                        new_plan, selected_exam,
+                        previous=feeds.get(selected_exam), manifest=new_manifest, changed_only=True
+                    )
+                    feeds[selected_exam] = new_manifest
+                    if feeds_enabled():
+                        get_feed_store().publish(feed_id_for(user_email, selected_exam), new_plan, selected_exam)
+                    st.success(f"Plan updated: {len(saved_plan['changes'])} sessions changed.")
+
+            changes = saved_plan.get('changes')
+            if changes is not None and not changes.empty:
+                st.dataframe(changes, use_container_width=True)
+                rp_col1, rp_col2 = st.columns(2)
+                with rp_col1:
+                    st.download_button(
+                        "📅 Changed sessions (.ics)",
+                        saved_plan['changes_ics'],
+                        f"{selected_exam.replace(' ', '_')}_Changes.ics",
+                        "text/calendar",
+                        key='download-ics-changes'
+                    )
+                with rp_col2:
+                    if st.button("✅ Push changes to Google Tasks"):
+                        with st.spinner("Syncing..."):
+                            # Diffed against the list, so only the moved/dropped tasks are sent
+                            result = run_sync_with_progress('tasks', sync_to_google_tasks, saved_plan['plan'], f"SG: {selected_exam}",
+                                                            reconcile=True, exam_name=selected_exam)
+                            if result['status'] == 'success':
+                                st.success(result['message'])
+                            else:
+                                st.error(result['message'])
+
     st.divider()
 
 # Page: Analytics
@@ -607,48 +670,59 @@ elif page == "⚙️ Settings":
         if not scout_api_key:
             st.error("Please provide a Gemini API Key to use the Scout Agent.")
         else:
+            from utils.exam_scout import ExamScoutAgent
             scout = ExamScoutAgent(scout_api_key)
-            updates_found = []
+            review_queue = get_scout_review_queue()
+            queued = 0
             
             progress_bar = st.progress(0)
             status_text = st.empty()
             
-            # Scan top 3 exams for demo to save time/quota
-            exams_to_scan = exam_data['exams'][:3] 
+            # Whole catalogue, scanned concurrently; results arrive as each exam finishes.
+            # Unbatched here: batching saves Gemini calls but holds results back until a
+            # batch fills, so it is left to the nightly scout
+            exams_to_scan = exam_data['exams']
+            status_text.text(f"Scouting {len(exams_to_scan)} exams...")
             
-            for i, exam in enumerate(exams_to_scan):
-                status_text.text(f"Scouting for {exam['exam_name']}...")
-                result = scout.scan_exam(exam['exam_name'], exam.get('exam_date'))
+            for i, (exam, result) in enumerate(scout.scan_all(exams_to_scan)):
+                status_text.text(f"Scouted {exam['exam_name']} ({i + 1}/{len(exams_to_scan)})")
                 
-                if result and result.get('found'):
-                    updates_found.append({
-                        "Exam": exam['exam_name'],
-                        "Old Date": exam.get('exam_date', 'Unknown'),
-                        "New Date": result.get('exam_date'),
-                        "Source": result.get('source_link'),
-                        "Status": result.get('status')
-                    })
+                # Findings wait for review below instead of going straight to the database
+                queued += review_queue.add_scan_result(exam, result)
                 
                 progress_bar.progress((i + 1) / len(exams_to_scan))
             
             status_text.text("Scan Complete!")
-            
-            if updates_found:
-                st.success(f"Found updates for {len(updates_found)} exams!")
-                update_df = pd.DataFrame(updates_found)
-                st.dataframe(update_df)
-                
-                if st.button("💾 Save Updates to Database"):
-                    success, msg = update_exam_database(updates_found)
-                    if success:
-                        st.success(msg)
-                        st.cache_data.clear() # Clear cache to reload new data
-                        st.rerun()
-                    else:
-                        st.error(f"Failed to save: {msg}")
+            if queued:
+                st.success(f"Found updates for {queued} exams! Review them below.")
             else:
                 st.warning("No new official updates found.")
 
+    # Review: scout findings (from this page or the nightly scout) are only saved once approved
+    pending_updates = get_scout_review_queue().pending()
+    if pending_updates:
+        st.markdown("#### Pending exam date updates")
+        st.dataframe(pd.DataFrame(pending_updates), use_container_width=True)
+        labels = {f"{u['Exam']}: {u['Old Date'] or 'Unknown'} → {u['New Date']}": u for u in pending_updates}
+        chosen = [labels[label] for label in st.multiselect("Updates to review", list(labels), key='scout-review')]
+
+        review_col1, review_col2 = st.columns(2)
+        with review_col1:
+            if st.button("💾 Save Updates to Database", disabled=not chosen):
+                from utils.exam_scout import update_exam_database
+                success, msg = update_exam_database(chosen)
+                if success:
+                    get_scout_review_queue().resolve(chosen, 'approved')
+                    st.success(msg)
+                    st.cache_data.clear() # Clear cache to reload new data
+                    st.rerun()
+                else:
+                    st.error(f"Failed to save: {msg}")
+        with review_col2:
+            if st.button("🗑️ Dismiss", disabled=not chosen):
+                get_scout_review_queue().resolve(chosen, 'dismissed')
+                st.rerun()
+
 st.divider()
 st.markdown("---")
 st.markdown("Made with ❤️ for Indian students | StrikeGoal v1.0")
@@ -0,0 +1,124 @@
+"""
+Benchmark Google Calendar sync against a local stand-in for the Calendar API: one
+events.insert round trip per plan row (the previous behaviour) versus batched inserts
+through run_batched.
+
+The stand-in server adds LATENCY_S to every HTTP request, which is what dominates a real
+sync; batch requests pay it once per batch plus PER_ITEM_S per sub-request. The client is
+the real googleapiclient, built from its bundled Calendar v3 discovery document with
+rootUrl pointed at the stand-in.
+
+Usage: python scripts/bench_calendar_sync.py
+"""
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httplib2
+import googleapiclient
+from googleapiclient.discovery import build_from_document
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.calendar_sync import _calendar_event, run_batched
+
+LATENCY_S = 0.02
+PER_ITEM_S = 0.0005
+
+
+class StandInCalendar(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(LATENCY_S)
+        if self.path.startswith("/batch/"):
+            self._batch(body)
+        else:
+            self._reply(200, "application/json", json.dumps({"id": uuid.uuid4().hex}).encode())
+
+    def _batch(self, body):
+        boundary = self.headers["Content-Type"].split("boundary=")[1].strip('"')
+        parts = body.split(f"--{boundary}".encode())[1:-1]
+        out_boundary = "batch_" + uuid.uuid4().hex
+        chunks = []
+        for part in parts:
+            content_id = next(
+                line.split(b":", 1)[1].strip().decode()
+                for line in part.splitlines() if line.lower().startswith(b"content-id:")
+            )
+            time.sleep(PER_ITEM_S)
+            payload = json.dumps({"id": uuid.uuid4().hex})
+            chunks.append(
+                f"--{out_boundary}\r\n"
+                "Content-Type: application/http\r\n"
+                f"Content-ID: <response-{content_id.strip('<>')}>\r\n\r\n"
+                "HTTP/1.1 200 OK\r\n"
+                "Content-Type: application/json; charset=UTF-8\r\n"
+                f"Content-Length: {len(payload)}\r\n\r\n"
+                f"{payload}\r\n"
+            )
+        chunks.append(f"--{out_boundary}--\r\n")
+        self._reply(200, f"multipart/mixed; boundary={out_boundary}", "".join(chunks).encode())
+
+
+def calendar_service(root_url):
+    path = os.path.join(os.path.dirname(googleapiclient.__file__), "discovery_cache", "documents", "calendar.v3.json")
+    with open(path) as f:
+        doc = json.load(f)
+    doc["rootUrl"] = root_url
+    doc["baseUrl"] = root_url + doc["servicePath"]
+    return build_from_document(doc, http=httplib2.Http())
+
+
+def synthetic_events(n):
+    start = datetime(2026, 1, 1)
+    return [
+        _calendar_event({
+            "Date": (start + timedelta(days=i // 3)).strftime("%Y-%m-%d"),
+            "Subject": "Physics", "Chapter": f"Chapter {i}", "Weightage": "High", "Focus": "Deep Study"
+        })
+        for i in range(n)
+    ]
+
+
+def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInCalendar)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    service = calendar_service(f"http://127.0.0.1:{server.server_address[1]}/")
+
+    print(f"{'events':>7} {'per-row s':>10} {'batched s':>10} {'speedup':>8}")
+    for n in (50, 300, 1000):
+        events = synthetic_events(n)
+
+        start = time.perf_counter()
+        for event in events:
+            service.events().insert(calendarId="primary", body=event).execute()
+        sequential = time.perf_counter() - start
+
+        start = time.perf_counter()
+        results = run_batched(service, lambda e: service.events().insert(calendarId="primary", body=e), events)
+        batched = time.perf_counter() - start
+        assert all(error is None for _, error in results)
+
+        print(f"{n:>7} {sequential:>10.2f} {batched:>10.2f} {sequential / batched:>7.1f}x")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Benchmark the shared exam date parser over every date string in data/exam_dates.json.
+
+Usage: python scripts/bench_date_parser.py [rounds]
+"""
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.date_parser import parse_exam_dates, _parse
+
+JSON_FILE = 'data/exam_dates.json'
+DATE_FIELDS = ('exam_date', 'registration_start', 'registration_end')
+
+
+def load_strings():
+    with open(JSON_FILE, 'r') as f:
+        data = json.load(f)
+    return [exam.get(field) for exam in data.get('exams', []) for field in DATE_FIELDS if exam.get(field)]
+
+
+def per_call_us(strings, rounds, cold):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        if cold:
+            _parse.cache_clear()
+        for s in strings:
+            parse_exam_dates(s)
+    elapsed = time.perf_counter() - start
+    return elapsed / (rounds * len(strings)) * 1e6
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    strings = load_strings()
+    print(f"{len(strings)} date strings ({len(set(strings))} unique), {rounds} rounds")
+    print(f"cold (cache cleared each round): {per_call_us(strings, rounds, cold=True):8.2f} us/call")
+    print(f"warm (memoized):                 {per_call_us(strings, rounds, cold=False):8.2f} us/call")
+
+
+if __name__ == "__main__":
+    main()
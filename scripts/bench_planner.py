@@ -0,0 +1,95 @@
+"""
+Benchmark study plan assembly: the columnar StudyPlannerAgent.generate_plan against the
+previous row-by-row construction (one dict and two strftime calls per row).
+
+"cold" rebuilds the chapter table on every call; "cached" uses a prebuilt table, which is
+what the app sees since SyllabusRepository keeps one table per exam per file version.
+
+Usage: python scripts/bench_planner.py
+"""
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.scheduler import pack_chapters
+from utils.study_planner import StudyPlannerAgent
+from utils.syllabus_repo import build_chapter_table
+
+
+def synthetic_syllabus(n_chapters, n_subjects=6, seed=42):
+    rng = random.Random(seed)
+    syllabus = {f"Subject {s}": [] for s in range(n_subjects)}
+    for i in range(n_chapters):
+        syllabus[f"Subject {i % n_subjects}"].append({
+            "name": f"Chapter {i}",
+            "weightage": rng.choice(["High", "Medium", "Low"]),
+            "time_required": rng.choice([1, 2, 3, 4])
+        })
+    return syllabus
+
+
+def rowwise_plan(agent):
+    # The pre-columnar construction, kept here as the baseline
+    days_remaining = (agent.exam_date - agent.today).days
+    weight_map = {'High': 3, 'Medium': 2, 'Low': 1}
+    all_chapters = []
+    for subject, chapters in agent.syllabus.items():
+        for chapter in chapters:
+            chapter_data = dict(chapter)
+            chapter_data['subject'] = subject
+            chapter_data['priority_score'] = weight_map.get(chapter.get('weightage', 'Low'), 1)
+            all_chapters.append(chapter_data)
+
+    day_offsets, chapter_indices, part_hours, _ = pack_chapters(
+        [c.get('time_required', 1) for c in all_chapters],
+        [c['priority_score'] for c in all_chapters],
+        days_remaining,
+        agent.daily_hours
+    )
+    schedule = []
+    for offset, idx, hours in zip(day_offsets.tolist(), chapter_indices.tolist(), part_hours.tolist()):
+        current_date = agent.today + timedelta(days=offset)
+        task = all_chapters[idx]
+        schedule.append({
+            "Date": current_date.strftime("%Y-%m-%d"),
+            "Day": current_date.strftime("%A"),
+            "Subject": task['subject'],
+            "Chapter": task['name'],
+            "Weightage": task.get('weightage', 'Low'),
+            "Focus": "Deep Study" if task.get('weightage') == 'High' else "Review",
+            "Hours": hours
+        })
+    return pd.DataFrame(schedule)
+
+
+def timed(fn, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds * 1e3
+
+
+def main():
+    exam_date = (datetime.now() + timedelta(days=365)).strftime('%Y-%m-%d')
+    print(f"{'chapters':>9} {'rows':>6} {'row-wise ms':>12} {'cold ms':>8} {'cached ms':>10} {'speedup':>8}")
+    for n_chapters in (50, 500, 2000, 10000):
+        agent = StudyPlannerAgent("Benchmark Exam", exam_date, daily_hours=6)
+        agent.syllabus = synthetic_syllabus(n_chapters)
+        rounds = max(5, 4000 // n_chapters)
+
+        rows = len(agent.generate_plan())
+        old = timed(lambda: rowwise_plan(agent), rounds)
+        cold = timed(agent.generate_plan, rounds)
+        table = build_chapter_table(agent.syllabus)
+        agent._chapter_table = lambda: table
+        cached = timed(agent.generate_plan, rounds)
+        print(f"{n_chapters:>9} {rows:>6} {old:>12.2f} {cold:>8.2f} {cached:>10.2f} {old / cached:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
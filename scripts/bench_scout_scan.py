@@ -0,0 +1,97 @@
+"""
+Benchmark a full-catalogue exam scout: scan_exam over every exam one after another (the
+previous Settings page loop) against ExamScoutAgent.scan_all, with one Gemini call per
+exam and with batched extraction.
+
+DuckDuckGo and Gemini are replaced by stand-ins with latencies drawn between
+SEARCH_S and LLM_S bounds; the scout's default per-provider rate limits apply. Those bound
+every concurrent scan: searches are spaced 1 / SEARCH_RATE_PER_SECOND apart, so EXAMS
+uncached exams take at least (EXAMS - SEARCH_BURST) / SEARCH_RATE_PER_SECOND seconds
+(19.5s for 40 exams at 2 per second), plus the last exam's own search and extraction.
+
+A batched prompt takes as long as its slowest exam plus BATCH_ITEM_S per exam. A last run
+repeats the scan with unchanged search results, where the scout cache skips the Gemini calls.
+
+Usage: python scripts/bench_scout_scan.py
+"""
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import exam_scout
+from utils.scout_cache import ScoutCache
+
+EXAMS = 40
+SEARCH_S = (0.3, 1.2)
+LLM_S = (0.8, 2.5)
+BATCH_ITEM_S = 0.2  # extra generation time per exam in a batched prompt
+
+
+def stand_ins(seed):
+    rng = random.Random(seed)
+    search_latency = {f"Exam {i}": rng.uniform(*SEARCH_S) for i in range(EXAMS)}
+    llm_latency = {f"Exam {i}": rng.uniform(*LLM_S) for i in range(EXAMS)}
+
+    def text(query, max_results=5):
+        exam = query.split(" exam date")[0]
+        time.sleep(search_latency[exam])
+        return [{"title": exam, "body": "Exam on 4 May 2026", "href": "https://example.org"}]
+
+    def generate_content(prompt):
+        batch = re.findall(r'=== Exam: "([^"]+)"', prompt)
+        if batch:
+            time.sleep(max(llm_latency[exam] for exam in batch) + BATCH_ITEM_S * len(batch))
+            return MagicMock(text=json.dumps([{"exam_name": exam, "found": True, "exam_date": "May 4, 2026"}
+                                              for exam in batch]))
+        exam = prompt.split('for the exam "')[1].split('"')[0]
+        time.sleep(llm_latency[exam])
+        return MagicMock(text=json.dumps({"found": True, "exam_date": "May 4, 2026"}))
+
+    ddg = MagicMock()
+    ddg.DDGS.return_value.text.side_effect = text
+    genai = MagicMock()
+    genai.GenerativeModel.return_value.generate_content.side_effect = generate_content
+    slowest = max(search_latency[e] + llm_latency[e] for e in search_latency)
+    return ddg, genai, slowest
+
+
+def timed(label, scan, llm):
+    calls = llm.call_count
+    start = time.perf_counter()
+    first = None
+    for _ in scan():
+        first = first or time.perf_counter() - start
+    elapsed = time.perf_counter() - start
+    print(f"{label:<22}: {elapsed:6.2f}s, first result after {first:5.2f}s, {llm.call_count - calls:3d} Gemini calls")
+
+
+def main():
+    exam_scout.duckduckgo_search, exam_scout.genai, slowest = stand_ins(seed=7)
+    llm = exam_scout.genai.GenerativeModel.return_value.generate_content
+    exams = [{"exam_name": f"Exam {i}", "exam_date": "TBA"} for i in range(EXAMS)]
+    tmp = tempfile.mkdtemp()
+
+    def agent(name):
+        return exam_scout.ExamScoutAgent("key", cache=ScoutCache(os.path.join(tmp, name + ".sqlite3")))
+
+    print(f"{EXAMS} exams, slowest single exam {slowest:.2f}s")
+    sequential = agent("sequential")
+    timed("sequential scan_exam", lambda: ((e, sequential.scan_exam(e['exam_name'], e['exam_date'])) for e in exams), llm)
+    concurrent = agent("concurrent")
+    timed("scan_all", lambda: concurrent.scan_all(exams), llm)
+    batched = agent("batched")
+    timed("scan_all batched", lambda: batched.scan_all(exams, batched=True), llm)
+
+    # Same sources the next night: searches run again, extractions come from the cache
+    batched.cache.search_ttl = 0
+    timed("batched, unchanged", lambda: batched.scan_all(exams, batched=True), llm)
+
+
+if __name__ == "__main__":
+    main()
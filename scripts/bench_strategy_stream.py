@@ -0,0 +1,75 @@
+"""
+Benchmark time-to-first-content on the Study Planner page: the blocking AI strategy call
+(rendered before the plan) against the streamed one started on a background thread.
+
+Gemini is replaced by a stand-in that takes FIRST_TOKEN_S to start answering and then
+emits CHUNKS chunks CHUNK_S apart; RENDER_S stands for drawing the plan and exports.
+
+Usage: python scripts/bench_strategy_stream.py
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import response_cache, study_planner
+from utils.streaming import background_iter
+
+FIRST_TOKEN_S = 0.8
+CHUNKS = 10
+CHUNK_S = 0.1
+RENDER_S = 0.3
+
+
+class FakeModel:
+    def generate_content(self, prompt, stream=False):
+        if not stream:
+            time.sleep(FIRST_TOKEN_S + CHUNKS * CHUNK_S)
+            return MagicMock(text="x" * CHUNKS)
+        return self._stream()
+
+    def _stream(self):
+        time.sleep(FIRST_TOKEN_S)
+        for _ in range(CHUNKS):
+            time.sleep(CHUNK_S)
+            yield MagicMock(text="x")
+
+
+def page(agent, plan, streaming):
+    """
+    Returns (time until the plan is on screen, time until the whole strategy is).
+    """
+    start = time.perf_counter()
+    if streaming:
+        chunks = background_iter(agent.stream_ai_strategy("key", plan))
+        time.sleep(RENDER_S)
+        plan_at = time.perf_counter() - start
+        for _ in chunks:
+            pass
+    else:
+        agent.generate_ai_strategy("key", plan)
+        time.sleep(RENDER_S)
+        plan_at = time.perf_counter() - start
+    return plan_at, time.perf_counter() - start
+
+
+def main():
+    study_planner.genai = MagicMock(GenerativeModel=lambda name: FakeModel())
+    exam_date = (datetime.now() + timedelta(days=90)).strftime('%Y-%m-%d')
+    agent = study_planner.StudyPlannerAgent("JEE (Main)", exam_date)
+    plan = agent.generate_plan()
+
+    print(f"{'mode':>10} {'plan shown s':>13} {'strategy done s':>16}")
+    for streaming in (False, True):
+        with tempfile.TemporaryDirectory() as tmp:
+            # Fresh cache each run so both modes actually call the stand-in
+            response_cache._default_cache = response_cache.ResponseCache(os.path.join(tmp, "bench.sqlite3"))
+            plan_at, done_at = page(agent, plan, streaming)
+        print(f"{'streaming' if streaming else 'blocking':>10} {plan_at:>13.2f} {done_at:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
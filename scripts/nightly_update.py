@@ -1,46 +1,26 @@
+import argparse
 import pandas as pd
 import json
-import re
 import os
-from datetime import datetime
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.date_parser import parse_exam_dates
+from utils.exam_index import write_exam_index
+from utils.exam_scout import ExamScoutAgent
+from utils.scout_review import get_scout_review_queue
+from utils.scout_scheduler import ScoutScheduler, DEFAULT_BUDGET
 
 EXCEL_FILE = 'data/National and State Level Entrance Examinations for UG Admissions.xlsx'
 JSON_FILE = 'data/exam_dates.json'
 
 def parse_date(date_str):
     """
-    Extracts the first valid date from a string like "21–30 January 2026" or "04 May 2026".
+    Extracts the first exact date from a string like "21–30 January 2026" or "04 May 2026".
     Returns YYYY-MM-DD string or None.
     """
-    if not isinstance(date_str, str):
-        return None
-    
-    # Try to find date pattern like "21 January 2026" or "21-30 January 2026"
-    # We will pick the start date
-    
-    # Match strings like "21 January 2026" or "02 April 2026"
-    # Regex explanation:
-    # (\d{1,2})  -> Day (1 or 2 digits)
-    # [–-]?      -> Optional range separator (en-dash or hyphen)
-    # \d{0,2}    -> Optional end day (ignored)
-    # \s*        -> whitespace
-    # ([A-Za-z]+)-> Month
-    # \s*        -> whitespace
-    # (\d{4})    -> Year
-    
-    pattern = r"(\d{1,2})(?:[–-]\d{1,2})?\s+([A-Za-z]+)\s+(\d{4})"
-    match = re.search(pattern, date_str)
-    
-    if match:
-        day, month, year = match.groups()
-        date_string = f"{day} {month} {year}"
-        try:
-            dt = datetime.strptime(date_string, "%d %B %Y")
-            return dt.strftime("%Y-%m-%d")
-        except ValueError:
-            pass
-            
-    return None
+    first = parse_exam_dates(date_str).first_date(exact=True)
+    return first.strftime("%Y-%m-%d") if first else None
 
 def infer_stream(text):
     text = str(text).lower()
@@ -130,8 +110,45 @@ def update_exams():
     
     with open(JSON_FILE, 'w') as f:
         json.dump(existing_data, f, indent=4)
+    write_exam_index(JSON_FILE)
         
     print(f"Updated {JSON_FILE}. Added {added_count} new exams, updated others.")
 
+def queue_scout_results(results, queue=None):
+    """
+    Queue official dates the scout found that differ from the ones on file. They are
+    only saved once approved in Settings; an unattended run never edits exam_dates.json.
+    """
+    queue = queue or get_scout_review_queue()
+    queued = [queue.add_scan_result(exam, result) for exam, result in results]
+    print(f"Scouted {len(results)} exams, {sum(queued)} new official dates queued for review.")
+
+def make_scheduler():
+    api_key = os.getenv('GEMINI_API_KEY')
+    if not api_key:
+        print("GEMINI_API_KEY not set; skipping the exam scout.")
+        return None
+    return ScoutScheduler(ExamScoutAgent(api_key))
+
+def scout_exams(budget=DEFAULT_BUDGET):
+    """
+    Scan the exams the scout scheduler says are due, nearest exams first.
+    """
+    scheduler = make_scheduler()
+    if scheduler:
+        queue_scout_results(scheduler.run_once(budget))
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refresh exam dates from the Excel sheet and the web scout.")
+    parser.add_argument('--budget', type=int, default=DEFAULT_BUDGET, help="most exams to scout per run")
+    parser.add_argument('--worker', action='store_true',
+                        help="keep running, scouting exams whenever they fall due")
+    args = parser.parse_args()
+
     update_exams()
+    if args.worker:
+        scheduler = make_scheduler()
+        if scheduler:
+            scheduler.run_forever(args.budget, on_results=queue_scout_results)
+    else:
+        scout_exams(args.budget)
@@ -1,5 +1,10 @@
 
 import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.exam_index import write_exam_index
 
 data_path = 'data/exam_dates.json'
 
@@ -46,6 +51,7 @@ try:
 
     with open(data_path, 'w') as f:
         json.dump(data, f, indent=4)
+    write_exam_index(data_path)
 
     print(f"Successfully updated {count} exams with registration dates.")
 
@@ -2,6 +2,10 @@ import pandas as pd
 import json
 import os
 import re
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.exam_index import write_exam_index
 
 def infer_stream(courses_text):
     if not isinstance(courses_text, str):
@@ -55,6 +59,7 @@ def main():
     print(f"Writing {len(exams)} exams to {json_path}...")
     with open(json_path, 'w') as f:
         json.dump(output, f, indent=4)
+    write_exam_index(json_path)
     print("Sync complete.")
 
 if __name__ == "__main__":
@@ -19,6 +19,46 @@ def mock_genai(monkeypatch):
     
     monkeypatch.setattr("utils.study_planner.genai", mock_genai_mod)
 
+@pytest.fixture(autouse=True)
+def isolated_response_cache(tmp_path, monkeypatch):
+    """
+    Keep cached AI responses out of the real cache file and separate per test.
+    """
+    from utils.response_cache import ResponseCache
+    monkeypatch.setattr("utils.response_cache._default_cache", ResponseCache(str(tmp_path / "responses.sqlite3")))
+
+@pytest.fixture(autouse=True)
+def isolated_sync_journal(tmp_path, monkeypatch):
+    """
+    Sync jobs from one test must not be resumed by another.
+    """
+    from utils.sync_journal import SyncJournal
+    monkeypatch.setattr("utils.sync_journal._default_journal", SyncJournal(str(tmp_path / "sync_journal.sqlite3")))
+
+@pytest.fixture(autouse=True)
+def isolated_sync_snapshots(tmp_path, monkeypatch):
+    """
+    Remote list snapshots saved by one test must not stand in for another's.
+    """
+    from utils.sync_snapshots import SnapshotStore
+    monkeypatch.setattr("utils.sync_snapshots._default_store", SnapshotStore(str(tmp_path / "sync_snapshots.sqlite3")))
+
+@pytest.fixture(autouse=True)
+def isolated_scout_cache(tmp_path, monkeypatch):
+    """
+    Scout searches and extractions cached by one test must not leak into another.
+    """
+    from utils.scout_cache import ScoutCache
+    monkeypatch.setattr("utils.scout_cache._default_cache", ScoutCache(str(tmp_path / "scout.sqlite3")))
+
+@pytest.fixture(autouse=True)
+def isolated_scout_review(tmp_path, monkeypatch):
+    """
+    Scout findings queued by one test must not show up as pending in another.
+    """
+    from utils.scout_review import ScoutReviewQueue
+    monkeypatch.setattr("utils.scout_review._default_queue", ScoutReviewQueue(str(tmp_path / "scout.sqlite3")))
+
 @pytest.fixture(autouse=True)
 def cleanup_artifacts():
     """
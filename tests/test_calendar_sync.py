@@ -1,7 +1,13 @@
+import datetime
+import os
+import pickle
+import tempfile
+import threading
 import unittest
 from unittest.mock import MagicMock, patch
 import pandas as pd
-from utils.calendar_sync import sync_to_google_calendar
+import utils.calendar_sync as calendar_sync
+from utils.calendar_sync import sync_to_google_calendar, sync_to_google_tasks, run_batched, RateLimiter, ClientPool
 
 class TestCalendarSync(unittest.TestCase):
     
@@ -59,5 +65,251 @@ class TestCalendarSync(unittest.TestCase):
         self.assertEqual(result['status'], 'error')
         self.assertIn("credentials.json not found", result['message'])
 
+class FakeHttpError(Exception):
+    def __init__(self, status):
+        super().__init__(f"HTTP {status}")
+        self.resp = MagicMock(status=status)
+
+class FakeBatch:
+    """
+    Stand-in for BatchHttpRequest: 'executes' each added request by calling it.
+    """
+    def __init__(self, log, callback):
+        self.log = log
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, request_id):
+        self.requests.append((request_id, request))
+
+    def execute(self):
+        self.log.append([request_id for request_id, _ in self.requests])
+        for request_id, request in self.requests:
+            try:
+                self.callback(request_id, request(), None)
+            except Exception as e:
+                self.callback(request_id, None, e)
+
+class TestRunBatched(unittest.TestCase):
+
+    def setUp(self):
+        self.batches = []
+        self.service = MagicMock()
+        self.service.new_batch_http_request.side_effect = lambda callback: FakeBatch(self.batches, callback)
+
+    def test_groups_requests_into_batches(self):
+        results = run_batched(self.service, lambda n: (lambda: {"id": n}), list(range(120)), batch_size=50)
+        self.assertEqual([len(b) for b in self.batches], [50, 50, 20])
+        self.assertEqual([r[0]["id"] for r in results], list(range(120)))
+
+    def test_only_failed_requests_are_retried(self):
+        attempts = {}
+        def make_request(n):
+            def call():
+                attempts[n] = attempts.get(n, 0) + 1
+                if n == 3 and attempts[n] == 1:
+                    raise FakeHttpError(503)
+                if n == 4:
+                    raise FakeHttpError(400)
+                return {"id": n}
+            return call
+
+        results = run_batched(self.service, make_request, list(range(6)), sleep=lambda s: None)
+
+        # Second round only carries the retryable failure
+        self.assertEqual(self.batches[1], ['3'])
+        self.assertEqual(results[3], ({"id": 3}, None))
+        self.assertIsInstance(results[4][1], FakeHttpError)
+        self.assertEqual(attempts[4], 1)
+
+    @patch('utils.calendar_sync.get_credentials')
+    @patch('utils.calendar_sync.build')
+    def test_sync_reports_per_item_results(self, mock_build, mock_get_creds):
+        mock_build.return_value = self.service
+        calls = []
+        def insert(calendarId, body):
+            calls.append(body['summary'])
+            if 'Atoms' in body['summary']:
+                return MagicMock(side_effect=FakeHttpError(400))
+            return MagicMock(return_value={"id": f"evt{len(calls)}"})
+        self.service.events.return_value.insert.side_effect = insert
+
+        plan_df = pd.DataFrame([
+            {'Date': '2026-01-01', 'Subject': 'Physics', 'Chapter': 'Optics', 'Weightage': 'High', 'Focus': 'Deep Study'},
+            {'Date': '2026-01-02', 'Subject': 'Chem', 'Chapter': 'Atoms', 'Weightage': 'Low', 'Focus': 'Review'}
+        ])
+        result = sync_to_google_calendar(plan_df)
+
+        self.assertEqual(result['status'], 'success')
+        self.assertEqual([r['status'] for r in result['results']], ['created', 'failed'])
+        self.assertEqual(result['results'][0]['id'], 'evt1')
+        self.assertIn("1 failed", result['message'])
+
+class TestTasksSync(unittest.TestCase):
+
+    def setUp(self):
+        calendar_sync._task_list_ids.clear()
+        calendar_sync._rate_limiters.clear()
+        rate = patch.object(calendar_sync, 'TASKS_RATE_PER_SECOND', 100000)
+        rate.start()
+        self.addCleanup(rate.stop)
+        self.batches = []
+        self.service = MagicMock()
+        self.service.new_batch_http_request.side_effect = lambda callback: FakeBatch(self.batches, callback)
+        self.service.tasklists.return_value.list.return_value.execute.return_value = {
+            'items': [{'title': 'SG: NEET', 'id': 'list-1'}]
+        }
+        self.service.tasks.return_value.insert.side_effect = (
+            lambda tasklist, body: MagicMock(return_value={"id": f"{tasklist}/{body['title']}"})
+        )
+        self.plan_df = pd.DataFrame({
+            'Date': ['2026-01-01'] * 120,
+            'Subject': ['Physics'] * 120,
+            'Chapter': [f"Chapter {i}" for i in range(120)],
+            'Focus': ['Review'] * 120
+        })
+
+    @patch('utils.calendar_sync.get_credentials')
+    @patch('utils.calendar_sync.build')
+    def test_tasks_are_batched(self, mock_build, mock_get_creds):
+        mock_build.return_value = self.service
+        result = sync_to_google_tasks(self.plan_df, "SG: NEET", max_workers=1)
+
+        self.assertEqual(result['status'], 'success')
+        self.assertEqual([len(b) for b in self.batches], [50, 50, 20])
+        self.assertEqual(result['results'][0], {"title": "Physics: Chapter 0", "status": "created", "id": "list-1/Physics: Chapter 0"})
+
+    @patch('utils.calendar_sync.get_credentials')
+    @patch('utils.calendar_sync.build')
+    def test_task_list_id_is_cached(self, mock_build, mock_get_creds):
+        mock_build.return_value = self.service
+        sync_to_google_tasks(self.plan_df.iloc[:3], "SG: NEET")
+        sync_to_google_tasks(self.plan_df.iloc[:3], "SG: NEET")
+        self.assertEqual(self.service.tasklists.return_value.list.call_count, 1)
+        self.service.tasklists.return_value.insert.assert_not_called()
+
+    @patch('utils.calendar_sync.get_credentials')
+    @patch('utils.calendar_sync.build')
+    def test_parallel_sync_uses_a_client_per_thread(self, mock_build, mock_get_creds):
+        mock_build.return_value = self.service
+        result = sync_to_google_tasks(self.plan_df, "SG: NEET", max_workers=3)
+        self.assertEqual(sorted(len(b) for b in self.batches), [20, 50, 50])
+        self.assertTrue(all(r['status'] == 'created' for r in result['results']))
+        # Main client plus one per worker thread that sent a batch
+        self.assertGreater(mock_build.call_count, 1)
+
+class FakeCreds:
+    def __init__(self, minutes_left):
+        self.refresh_token = "refresh"
+        self.expiry = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None) + datetime.timedelta(minutes=minutes_left)
+        self.refreshed = 0
+
+    @property
+    def valid(self):
+        return self.expiry > datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
+    def refresh(self, request):
+        self.refreshed += 1
+        self.expiry = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None) + datetime.timedelta(hours=1)
+
+class TestCredentialsCache(unittest.TestCase):
+
+    def setUp(self):
+        cwd = os.getcwd()
+        tmp = tempfile.TemporaryDirectory()
+        os.chdir(tmp.name)
+        self.addCleanup(tmp.cleanup)
+        self.addCleanup(os.chdir, cwd)
+        calendar_sync._creds_cache.update(stamp=None, creds=None)
+        self.addCleanup(calendar_sync._creds_cache.update, stamp=None, creds=None)
+
+    def _write_token(self, creds):
+        with open('token.pickle', 'wb') as token:
+            pickle.dump(creds, token)
+
+    def test_token_file_is_read_once(self):
+        self._write_token(FakeCreds(minutes_left=60))
+        with patch('utils.calendar_sync.pickle.load', wraps=pickle.load) as load:
+            first = calendar_sync.get_credentials()
+            second = calendar_sync.get_credentials()
+        self.assertIs(first, second)
+        self.assertEqual(load.call_count, 1)
+
+    def test_token_is_refreshed_before_expiry(self):
+        self._write_token(FakeCreds(minutes_left=2))
+        creds = calendar_sync.get_credentials()
+        self.assertEqual(creds.refreshed, 1)
+        # The refreshed token is saved and served from memory afterwards
+        self.assertIs(calendar_sync.get_credentials(), creds)
+        self.assertEqual(creds.refreshed, 1)
+        with open('token.pickle', 'rb') as token:
+            self.assertEqual(pickle.load(token).refreshed, 1)
+
+    def test_replaced_token_file_is_reloaded(self):
+        self._write_token(FakeCreds(minutes_left=60))
+        first = calendar_sync.get_credentials()
+        replacement = FakeCreds(minutes_left=90)
+        replacement.refresh_token = "other"
+        self._write_token(replacement)
+        os.utime('token.pickle', ns=(0, 10 ** 9))  # mtime resolution on some filesystems is coarse
+        self.assertEqual(calendar_sync.get_credentials().refresh_token, "other")
+        self.assertIsNot(calendar_sync.get_credentials(), first)
+
+class TestClientPool(unittest.TestCase):
+
+    @patch('utils.calendar_sync.build')
+    def test_clients_are_reused_across_calls(self, mock_build):
+        pool = ClientPool()
+        creds = MagicMock(refresh_token="user-1")
+        with pool.client('tasks', 'v1', creds) as first:
+            pass
+        with pool.client('tasks', 'v1', creds) as second:
+            pass
+        self.assertIs(first, second)
+        self.assertEqual(mock_build.call_count, 1)
+
+    @patch('utils.calendar_sync.build')
+    def test_concurrent_users_of_a_client_get_their_own(self, mock_build):
+        mock_build.side_effect = lambda *args, **kwargs: MagicMock()
+        pool = ClientPool()
+        creds = MagicMock(refresh_token="user-1")
+        with pool.session('tasks', 'v1', creds) as thread_client:
+            mine = thread_client()
+            self.assertIs(thread_client(), mine)
+            other = []
+            worker = threading.Thread(target=lambda: other.append(thread_client()))
+            worker.start()
+            worker.join()
+        self.assertIsNot(other[0], mine)
+        # Both go back to the pool for later calls
+        with pool.session('tasks', 'v1', creds) as thread_client:
+            self.assertIn(thread_client(), (mine, other[0]))
+        self.assertEqual(mock_build.call_count, 2)
+
+    @patch('utils.calendar_sync.build')
+    def test_new_credentials_get_new_clients(self, mock_build):
+        mock_build.side_effect = lambda *args, **kwargs: MagicMock()
+        pool = ClientPool()
+        with pool.client('tasks', 'v1', MagicMock(refresh_token="user-1")) as first:
+            pass
+        with pool.client('tasks', 'v1', MagicMock(refresh_token="user-1")) as second:
+            pass
+        self.assertIsNot(first, second)
+
+class TestRateLimiter(unittest.TestCase):
+
+    def test_waits_for_tokens(self):
+        now = [0.0]
+        waits = []
+        def sleep(seconds):
+            waits.append(seconds)
+            now[0] += seconds
+        limiter = RateLimiter(rate=10, clock=lambda: now[0], sleep=sleep)
+
+        limiter.acquire(10)  # full bucket
+        self.assertEqual(waits, [])
+        limiter.acquire(5)
+        self.assertAlmostEqual(sum(waits), 0.5)
+
 if __name__ == '__main__':
     unittest.main()
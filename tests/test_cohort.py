@@ -0,0 +1,68 @@
+import pytest
+from datetime import datetime, timedelta
+import pandas as pd
+import utils.cohort as cohort
+from utils.cohort import generate_cohort_plans
+from utils.syllabus_repo import get_syllabus_repository
+
+EXAM = "JEE (Main)"
+
+@pytest.fixture
+def exam_date():
+    return (datetime.now() + timedelta(days=60)).strftime('%Y-%m-%d')
+
+def test_cohort_plans_are_long_format(exam_date):
+    profiles = [
+        {"student_id": "s1", "exam": EXAM, "exam_date": exam_date, "daily_hours": 4},
+        {"student_id": "s2", "exam": EXAM, "exam_date": exam_date, "subjects": ["Physics"], "daily_hours": 2},
+    ]
+    plans, errors = generate_cohort_plans(profiles)
+
+    assert errors == {}
+    assert list(plans.columns[:2]) == ['student_id', 'Date']
+    physics = len(get_syllabus_repository().get_exam(EXAM)['Physics'])
+    s2 = plans[plans['student_id'] == 's2']
+    assert set(s2['Subject']) == {"Physics"}
+    assert s2['Chapter'].nunique() == physics
+    assert plans[plans['student_id'] == 's1']['Subject'].nunique() > 1
+
+def test_identical_profiles_are_planned_once(exam_date, monkeypatch):
+    calls = []
+    real_plan_for = cohort._plan_for
+    def counting_plan_for(key):
+        calls.append(key)
+        return real_plan_for(key)
+    monkeypatch.setattr(cohort, "_plan_for", counting_plan_for)
+
+    profiles = [
+        {"student_id": f"s{i}", "exam": EXAM, "exam_date": exam_date, "subjects": ["Chemistry", "Physics"]}
+        for i in range(5)
+    ]
+    # Subject order must not matter
+    profiles[0]['subjects'] = ["Physics", "Chemistry"]
+    plans, errors = generate_cohort_plans(profiles)
+
+    assert len(calls) == 1
+    per_student = plans.groupby('student_id').size()
+    assert len(per_student) == 5
+    assert per_student.nunique() == 1
+
+def test_errors_are_reported_per_student(exam_date):
+    profiles = [
+        {"student_id": "ok", "exam": EXAM, "exam_date": exam_date},
+        {"student_id": "unknown", "exam": "No Such Exam"},
+        {"student_id": "past", "exam": EXAM, "exam_date": "2001-01-01"},
+    ]
+    plans, errors = generate_cohort_plans(profiles)
+    assert set(plans['student_id']) == {"ok"}
+    assert "not found" in errors["unknown"]
+    assert "passed" in errors["past"]
+
+def test_parallel_matches_serial(exam_date):
+    profiles = [
+        {"student_id": f"s{i}", "exam": EXAM, "exam_date": exam_date, "daily_hours": 1 + i % 4}
+        for i in range(8)
+    ]
+    serial, _ = generate_cohort_plans(profiles)
+    parallel, _ = generate_cohort_plans(profiles, max_workers=2, parallel_threshold=1)
+    pd.testing.assert_frame_equal(serial.astype(str), parallel.astype(str))
@@ -0,0 +1,62 @@
+import json
+import os
+from datetime import date, datetime
+from utils.date_parser import parse_exam_dates, EMPTY
+
+def test_sessions_month_first_ranges():
+    parsed = parse_exam_dates("Session 1: Jan 22-29, 2026; Session 2: Apr 01-10, 2026")
+    assert [s.label for s in parsed.sessions] == ["Session 1", "Session 2"]
+    assert parsed.sessions[0].ranges == ((date(2026, 1, 22), date(2026, 1, 29)),)
+    assert len(parsed.sessions[1].dates()) == 10
+    assert parsed.first_date() == datetime(2026, 1, 22)
+
+def test_day_first_and_cross_month_ranges():
+    parsed = parse_exam_dates("Session 1: 15–17 April 2026; Session 2: 24–26 May 2026")
+    assert parsed.all_dates()[0] == date(2026, 4, 15)
+    assert len(parsed.all_dates()) == 6
+
+    parsed = parse_exam_dates("28 April to 03 May 2026")
+    assert parsed.sessions[0].ranges == ((date(2026, 4, 28), date(2026, 5, 3)),)
+
+def test_year_is_inherited_from_later_segment():
+    parsed = parse_exam_dates("Ph 1: April 23-28; Ph 2: June 10-15; Ph 3: July 4-5, 2026")
+    assert [s.start for s in parsed.sessions] == [date(2026, 4, 23), date(2026, 6, 10), date(2026, 7, 4)]
+
+def test_explicit_day_list():
+    parsed = parse_exam_dates("January 21, 22, 23, 24, 28, 2026")
+    session = parsed.sessions[0]
+    assert session.ranges == ()
+    assert session.days == tuple(date(2026, 1, d) for d in (21, 22, 23, 24, 28))
+
+def test_precision_and_tentative_flags():
+    parsed = parse_exam_dates("May 11-31, 2026 (Tentative)")
+    assert parsed.tentative
+    assert parsed.sessions[0].label == ""
+
+    month_only = parse_exam_dates("April 2026 (Phase 1); May 2026 (Phase 2)")
+    assert [s.precision for s in month_only.sessions] == ["month", "month"]
+    assert month_only.sessions[0].label == "Phase 1"
+    assert month_only.all_dates() == ()
+    assert month_only.first_date() == datetime(2026, 4, 1)
+    assert month_only.first_date(exact=True) is None
+
+    year_only = parse_exam_dates("Tentative 2026")
+    assert year_only.tentative
+    assert year_only.first_date() is None
+
+def test_unparseable_inputs():
+    assert parse_exam_dates(None) is EMPTY
+    assert parse_exam_dates(float('nan')) is EMPTY
+    assert parse_exam_dates("Invalid-Date").sessions == ()
+    assert parse_exam_dates("2026-01-01").first_date() == datetime(2026, 1, 1)
+
+def test_results_are_memoized():
+    raw = "17 May 2026"
+    assert parse_exam_dates(raw) is parse_exam_dates(raw)
+
+def test_every_exam_date_on_file_parses():
+    path = os.path.join(os.path.dirname(__file__), '..', 'data', 'exam_dates.json')
+    with open(path, 'r') as f:
+        exams = json.load(f)['exams']
+    for exam in exams:
+        assert parse_exam_dates(exam['exam_date']).sessions, exam['exam_date']
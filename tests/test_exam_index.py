@@ -0,0 +1,85 @@
+import json
+import os
+import pytest
+from utils.exam_index import build_exam_index, index_path_for, load_exam_index, write_exam_index
+
+EXAMS = {
+    "exams": [
+        {
+            "exam_name": "JEE (Main)",
+            "level": "National",
+            "stream": "Engineering",
+            "exam_date": "Session 2: Apr 01-03, 2026; Session 1: Jan 22-23, 2026",
+            "registration_start": "October 31, 2025 (S1); January 31, 2026 (S2)",
+            "registration_end": "November 27, 2025 (S1); March 2026 (S2)"
+        },
+        {
+            "name": "Legacy Exam",
+            "exam_date": "Tentative 2026",
+            "registration_start": None,
+            "registration_end": None
+        }
+    ]
+}
+
+@pytest.fixture
+def exam_file(tmp_path):
+    path = tmp_path / "exam_dates.json"
+    path.write_text(json.dumps(EXAMS))
+    return str(path)
+
+def test_build_index_normalizes_dates():
+    index = build_exam_index(json.dumps(EXAMS).encode())
+    jee = index['exams']['JEE (Main)']
+    assert jee['dates'] == ["2026-01-22", "2026-01-23", "2026-04-01", "2026-04-02", "2026-04-03"]
+    assert [s['label'] for s in jee['sessions']] == ["Session 2", "Session 1"]
+    assert jee['registration'] == {"start": "2025-10-31", "end": "2026-03-31"}
+
+    legacy = index['exams']['Legacy Exam']
+    assert legacy['dates'] == []
+    assert legacy['tentative']
+
+def test_write_and_load_sidecar(exam_file):
+    written = write_exam_index(exam_file)
+    assert os.path.exists(index_path_for(exam_file))
+    assert load_exam_index(exam_file) == written
+
+def test_stale_index_is_rebuilt(exam_file):
+    write_exam_index(exam_file)
+    stale_hash = load_exam_index(exam_file)['source_hash']
+
+    data = json.loads(json.dumps(EXAMS))
+    data['exams'][0]['exam_date'] = "17 May 2026"
+    with open(exam_file, 'w') as f:
+        json.dump(data, f)
+    st = os.stat(exam_file)
+    os.utime(exam_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+    index = load_exam_index(exam_file)
+    assert index['source_hash'] != stale_hash
+    assert index['exams']['JEE (Main)']['dates'] == ["2026-05-17"]
+    # The rebuilt index was persisted for the next reader
+    with open(index_path_for(exam_file), 'r') as f:
+        assert json.load(f)['source_hash'] == index['source_hash']
+
+def test_missing_sidecar_is_built_lazily(exam_file):
+    assert not os.path.exists(index_path_for(exam_file))
+    index = load_exam_index(exam_file)
+    assert "JEE (Main)" in index['exams']
+    assert os.path.exists(index_path_for(exam_file))
+
+def test_failed_write_keeps_the_previous_sidecar(exam_file, monkeypatch):
+    written = write_exam_index(exam_file)
+
+    def interrupted(index, f, **kwargs):
+        f.write('{"version": ')
+        raise OSError("disk full")
+
+    monkeypatch.setattr(json, 'dump', interrupted)
+    with pytest.raises(OSError):
+        write_exam_index(exam_file)
+    monkeypatch.undo()
+
+    with open(index_path_for(exam_file), 'r') as f:
+        assert json.load(f) == written
+    assert sorted(os.listdir(os.path.dirname(exam_file))) == ["exam_dates.index.json", "exam_dates.json"]
@@ -0,0 +1,164 @@
+import json
+import re
+import time
+from unittest.mock import MagicMock
+import pytest
+import utils.exam_scout as exam_scout
+from utils.exam_scout import ExamScoutAgent
+from utils.scout_cache import ScoutCache
+
+
+@pytest.fixture
+def providers(monkeypatch, tmp_path):
+    """
+    DuckDuckGo and Gemini stand-ins. Searches take search_delay[exam] seconds.
+    """
+    search_delay = {}
+    searched = []
+
+    def text(query, max_results=5):
+        exam = query.split(" exam date")[0]
+        searched.append(exam)
+        time.sleep(search_delay.get(exam, 0))
+        return [{"title": f"{exam} notice", "body": f"{exam} on 2026-05-04", "href": f"https://example.org/{exam}"}]
+
+    ddg = MagicMock()
+    ddg.DDGS.return_value.text.side_effect = text
+    monkeypatch.setattr(exam_scout, 'duckduckgo_search', ddg)
+
+    def extracted(exam):
+        return {"found": True, "exam_date": "May 4, 2026", "source_link": "https://example.org",
+                "status": "Official", "summary": exam}
+
+    def generate_content(prompt):
+        batch = re.findall(r'=== Exam: "([^"]+)"', prompt)
+        if batch:
+            return MagicMock(text=batch_reply[0](batch, extracted))
+        return MagicMock(text=json.dumps(extracted(prompt.split('for the exam "')[1].split('"')[0])))
+
+    batch_reply = [lambda names, extracted: "```json\n" + json.dumps([dict(extracted(n), exam_name=n) for n in names]) + "\n```"]
+    model = MagicMock()
+    model.generate_content.side_effect = generate_content
+    genai = MagicMock()
+    genai.GenerativeModel.return_value = model
+    monkeypatch.setattr(exam_scout, 'genai', genai)
+    return {"search_delay": search_delay, "searched": searched, "model": model, "tmp": tmp_path,
+            "batch_reply": batch_reply}
+
+
+def test_scan_exam_extracts_json(providers):
+    result = ExamScoutAgent("key").scan_exam("NEET", "2026-05-03")
+    assert result['found'] and result['summary'] == "NEET"
+
+
+def test_scan_all_runs_exams_concurrently(providers):
+    exams = [{"exam_name": f"Exam {i}", "exam_date": "TBA"} for i in range(12)]
+    for exam in exams:
+        providers['search_delay'][exam['exam_name']] = 0.2
+    agent = ExamScoutAgent("key", search_rate=1000, llm_rate=1000)
+
+    start = time.perf_counter()
+    results = list(agent.scan_all(exams, max_workers=12))
+    elapsed = time.perf_counter() - start
+
+    assert sorted(exam['exam_name'] for exam, _ in results) == sorted(e['exam_name'] for e in exams)
+    assert all(result['summary'] == exam['exam_name'] for exam, result in results)
+    assert elapsed < 1.0  # 12 x 0.2s one after another would be 2.4s
+
+
+def test_scan_all_yields_in_completion_order(providers):
+    providers['search_delay'].update({"Slow": 0.3, "Fast": 0})
+    agent = ExamScoutAgent("key", search_rate=1000, llm_rate=1000)
+    order = [exam['exam_name'] for exam, _ in agent.scan_all([{"exam_name": "Slow"}, {"exam_name": "Fast"}])]
+    assert order == ["Fast", "Slow"]
+
+
+def test_scan_all_is_rate_limited_per_provider(providers):
+    agent = ExamScoutAgent("key", search_rate=1000, llm_rate=1000)
+    agent.search_limiter = MagicMock()
+    agent.llm_limiter = MagicMock()
+    list(agent.scan_all([{"exam_name": f"Exam {i}"} for i in range(5)]))
+    assert agent.search_limiter.acquire.call_count == 5
+    assert agent.llm_limiter.acquire.call_count == 5
+
+
+def test_unchanged_snippets_skip_the_llm(providers):
+    agent = ExamScoutAgent("key")
+    first = agent.scan_exam("NEET", "2026-05-03")
+    assert agent.scan_exam("NEET", "2026-05-03") == first
+    assert providers['model'].generate_content.call_count == 1
+    assert providers['searched'] == ["NEET"]  # the search itself is cached too
+
+
+def test_changed_snippets_are_extracted_again(providers, monkeypatch):
+    clock = [1000.0]
+    agent = ExamScoutAgent("key", cache=ScoutCache(str(providers['tmp'] / "scout.sqlite3"), search_ttl=60,
+                                                   clock=lambda: clock[0]))
+    agent.scan_exam("NEET", "2026-05-03")
+
+    # Past the search TTL the search runs again; same snippets, no new extraction
+    clock[0] += 120
+    agent.scan_exam("NEET", "2026-05-03")
+    assert providers['searched'] == ["NEET", "NEET"]
+    assert providers['model'].generate_content.call_count == 1
+
+    text = exam_scout.duckduckgo_search.DDGS.return_value.text
+    monkeypatch.setattr(text, 'side_effect', lambda query, max_results=5: [
+        {"title": "NEET revised", "body": "NEET postponed to 2026-05-11", "href": "https://example.org/neet"}
+    ])
+    clock[0] += 120
+    agent.scan_exam("NEET", "2026-05-03")
+    assert providers['model'].generate_content.call_count == 2
+
+
+def test_new_date_or_prompt_version_is_extracted_again(providers, monkeypatch):
+    agent = ExamScoutAgent("key")
+    agent.scan_exam("NEET", "2026-05-03")
+    agent.scan_exam("NEET", "2026-05-10")
+    assert providers['model'].generate_content.call_count == 2
+
+    monkeypatch.setattr(exam_scout, 'PROMPT_VERSION', exam_scout.PROMPT_VERSION + 1)
+    agent.scan_exam("NEET", "2026-05-10")
+    assert providers['model'].generate_content.call_count == 3
+
+
+def _batched_scan(agent, n):
+    exams = [{"exam_name": f"Exam {i}", "exam_date": "TBA"} for i in range(n)]
+    return dict((exam['exam_name'], result) for exam, result in agent.scan_all(exams, batched=True))
+
+
+def test_batched_scan_shares_llm_calls(providers):
+    results = _batched_scan(ExamScoutAgent("key", search_rate=1000, llm_rate=1000), 12)
+    assert all(result['summary'] == name for name, result in results.items())
+    assert len(results) == 12
+    # BATCH_MAX_EXAMS per prompt: two calls instead of twelve
+    assert providers['model'].generate_content.call_count == 2
+
+
+def test_batch_size_follows_token_budget(providers, monkeypatch):
+    monkeypatch.setattr(exam_scout, 'BATCH_TOKEN_BUDGET', 450)
+    results = _batched_scan(ExamScoutAgent("key", search_rate=1000, llm_rate=1000), 6)
+    assert len(results) == 6
+    prompts = [call.args[0] for call in providers['model'].generate_content.call_args_list]
+    assert all(exam_scout.estimate_tokens(p) <= 450 for p in prompts)
+    assert 1 < len(prompts) < 6
+
+
+def test_unparseable_batch_falls_back_to_single_calls(providers):
+    providers['batch_reply'][0] = lambda names, extracted: "Sorry, here are the dates: ..."
+    results = _batched_scan(ExamScoutAgent("key", search_rate=1000, llm_rate=1000), 3)
+    assert all(result['summary'] == name for name, result in results.items())
+    assert providers['model'].generate_content.call_count == 1 + 3
+
+
+def test_exam_missing_from_batch_is_asked_alone(providers):
+    providers['batch_reply'][0] = lambda names, extracted: json.dumps(
+        [dict(extracted(n), exam_name=n.upper()) for n in names[1:]]  # names matched loosely
+    )
+    results = _batched_scan(ExamScoutAgent("key", search_rate=1000, llm_rate=1000), 3)
+    assert all(result['summary'] == name for name, result in results.items())
+    assert providers['model'].generate_content.call_count == 2
+
+    # Extractions from the batch are cached per exam like single ones
+    assert _batched_scan(ExamScoutAgent("key", search_rate=1000, llm_rate=1000), 3) == results
+    assert providers['model'].generate_content.call_count == 2
@@ -0,0 +1,88 @@
+import gzip
+import socket
+import pytest
+import utils.ics_feed as ics_feed
+import pandas as pd
+from utils.ics_feed import FeedStore, create_feed_app, feed_id_for, feed_url, feeds_enabled, public_feed_url
+
+pytest.importorskip("starlette")
+from starlette.testclient import TestClient
+
+PLAN = pd.DataFrame({
+    'Date': ['2026-03-01', '2026-03-02'],
+    'Subject': ['Physics', 'Chemistry'],
+    'Chapter': ['Kinematics', 'Atomic Structure'],
+    'Focus': ['Deep Study', 'Review']
+})
+
+@pytest.fixture
+def store():
+    return FeedStore()
+
+@pytest.fixture
+def client(store):
+    return TestClient(create_feed_app(store))
+
+def test_feed_ids_are_per_user_and_exam():
+    assert feed_id_for("a@example.com", "NEET") == feed_id_for("a@example.com", "NEET")
+    assert feed_id_for("a@example.com", "NEET") != feed_id_for("b@example.com", "NEET")
+    assert feed_url("abc", "http://host:1/").endswith("/feeds/abc.ics")
+
+def test_public_feed_url_needs_a_public_base_url():
+    assert public_feed_url("abc", "http://localhost:8765") is None
+    assert public_feed_url("abc", "http://127.0.0.1:8765") is None
+    assert public_feed_url("abc", "") is None
+    assert public_feed_url("abc", "https://feeds.example.com") == "https://feeds.example.com/feeds/abc.ics"
+
+def test_feeds_need_a_public_url_and_a_fixed_secret():
+    assert feeds_enabled("https://feeds.example.com", secret_configured=True)
+    assert not feeds_enabled("https://feeds.example.com", secret_configured=False)
+    assert not feeds_enabled("http://localhost:8765", secret_configured=True)
+
+def test_failed_bind_is_not_retried(monkeypatch, capsys):
+    monkeypatch.setattr(ics_feed, '_server_thread', None)
+    monkeypatch.setattr(ics_feed, '_server_error', None)
+    taken = socket.socket()
+    taken.bind(("127.0.0.1", 0))
+    taken.listen()
+    port = taken.getsockname()[1]
+    try:
+        assert ics_feed.start_feed_server("127.0.0.1", port) is None
+        binds = []
+        monkeypatch.setattr(ics_feed, '_bind', lambda host, port: binds.append(port))
+        assert ics_feed.start_feed_server("127.0.0.1", port) is None
+    finally:
+        taken.close()
+    assert binds == []
+    assert capsys.readouterr().out.count("not started") == 1
+
+def test_serves_feed_with_etag(store, client):
+    etag = store.publish("f1", PLAN, "NEET")
+    response = client.get("/feeds/f1.ics", headers={"Accept-Encoding": "identity"})
+    assert response.status_code == 200
+    assert response.headers['etag'] == etag
+    assert response.headers['content-type'].startswith("text/calendar")
+    assert "SUMMARY:Physics: Kinematics (Deep Study)" in response.text
+
+def test_conditional_get_returns_304(store, client):
+    etag = store.publish("f1", PLAN, "NEET")
+    response = client.get("/feeds/f1.ics", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+    # Republishing the same plan keeps the ETag, so clients keep getting 304
+    assert store.publish("f1", PLAN, "NEET") == etag
+    assert client.get("/feeds/f1.ics", headers={"If-None-Match": f"W/{etag}"}).status_code == 304
+
+    store.publish("f1", PLAN.iloc[:1], "NEET")
+    assert client.get("/feeds/f1.ics", headers={"If-None-Match": etag}).status_code == 200
+
+def test_gzip_is_served_from_cache(store, client):
+    store.publish("f1", PLAN, "NEET")
+    response = client.get("/feeds/f1.ics", headers={"Accept-Encoding": "gzip"})
+    assert response.headers['content-encoding'] == 'gzip'
+    assert response.content == store.get("f1")['body']  # the client decompresses
+    assert gzip.decompress(store.get("f1")['gzip']) == store.get("f1")['body']
+
+def test_unknown_feed_is_404(client):
+    assert client.get("/feeds/missing.ics").status_code == 404
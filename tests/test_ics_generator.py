@@ -30,3 +30,107 @@ def test_generate_ics_empty():
     assert "END:VCALENDAR" in ics_output
     # Should be no events
     assert "BEGIN:VEVENT" not in ics_output
+
+def _unfold(ics_output):
+    return ics_output.replace("\r\n ", "")
+
+def test_generate_ics_escapes_text():
+    df = pd.DataFrame({
+        'Date': ['2026-03-01'],
+        'Subject': ['Chemistry'],
+        'Chapter': ['Acids, Bases; Salts'],
+        'Focus': ['Review']
+    })
+    ics_output = _unfold(generate_ics(df, "Test-Exam"))
+    assert "SUMMARY:Chemistry: Acids\\, Bases\\; Salts (Review)\r\n" in ics_output
+    assert "DESCRIPTION:Study Plan for Test-Exam\\nSubject: Chemistry\\n" in ics_output
+
+def test_generate_ics_folds_long_lines():
+    df = pd.DataFrame({
+        'Date': ['2026-03-01'],
+        'Subject': ['Mathematics'],
+        'Chapter': ['Ρ' * 120],  # two octets per character
+        'Focus': ['Deep Study']
+    })
+    ics_output = generate_ics(df, "Test-Exam")
+    for line in ics_output.split("\r\n"):
+        assert len(line.encode('utf-8')) <= 75
+    assert ("Ρ" * 120) in _unfold(ics_output)
+    assert ics_output.endswith("END:VCALENDAR\r\n")
+
+def test_iter_ics_streams_in_chunks():
+    import io
+    from utils.ics_generator import iter_ics, write_ics
+    df = pd.DataFrame({
+        'Date': pd.date_range('2026-01-01', periods=1200).strftime('%Y-%m-%d'),
+        'Subject': 'Physics',
+        'Chapter': [f"Chapter {i}" for i in range(1200)],
+        'Focus': 'Review'
+    })
+    chunks = list(iter_ics(df, "Test-Exam", chunk_rows=500))
+    # Header, three event chunks, footer
+    assert len(chunks) == 5
+    assert "".join(chunks).count("BEGIN:VEVENT") == 1200
+
+    buffer = io.BytesIO()
+    write_ics(df, "Test-Exam", buffer)
+    assert buffer.getvalue().decode('utf-8').count("END:VEVENT") == 1200
+
+def _plan(rows):
+    return pd.DataFrame(rows, columns=['Date', 'Subject', 'Chapter', 'Focus'])
+
+def _events(ics_output):
+    events = []
+    for block in _unfold(ics_output).split("BEGIN:VEVENT\r\n")[1:]:
+        props = dict(line.split(":", 1) for line in block.split("\r\n") if ":" in line)
+        events.append(props)
+    return events
+
+def test_uids_are_stable_and_unique():
+    from utils.ics_generator import build_ics_feed
+    # Kinematics is split over two days; both sessions need their own identity
+    plan = _plan([
+        ['2026-03-01', 'Physics', 'Kinematics', 'Deep Study'],
+        ['2026-03-02', 'Physics', 'Kinematics', 'Deep Study'],
+        ['2026-03-02', 'Chemistry', 'Kinematics', 'Review'],
+    ])
+    first, manifest, etag = build_ics_feed(plan, "Test-Exam")
+    uids = [e['UID'] for e in _events(first)]
+    assert len(set(uids)) == 3
+
+    # Regenerating from the previous manifest gives the same feed and ETag
+    second, _, second_etag = build_ics_feed(plan, "Test-Exam", previous=manifest)
+    assert [e['UID'] for e in _events(second)] == uids
+    assert second == first
+    assert second_etag == etag
+
+def test_changed_events_bump_sequence_and_removed_are_cancelled():
+    from utils.ics_generator import build_ics_feed, generate_ics
+    plan = _plan([
+        ['2026-03-01', 'Physics', 'Kinematics', 'Deep Study'],
+        ['2026-03-02', 'Physics', 'Units', 'Review'],
+        ['2026-03-03', 'Chemistry', 'Atomic Structure', 'Review'],
+    ])
+    _, manifest, etag = build_ics_feed(plan, "Test-Exam")
+
+    # Units moves a day later, Atomic Structure is dropped
+    replanned = _plan([
+        ['2026-03-01', 'Physics', 'Kinematics', 'Deep Study'],
+        ['2026-03-03', 'Physics', 'Units', 'Review'],
+    ])
+    text, new_manifest, new_etag = build_ics_feed(replanned, "Test-Exam", previous=manifest)
+    events = {e['SUMMARY']: e for e in _events(text)}
+    assert events['Physics: Kinematics (Deep Study)']['SEQUENCE'] == '0'
+    assert events['Physics: Units (Review)']['SEQUENCE'] == '1'
+    assert events['Chemistry: Atomic Structure (Review)']['STATUS'] == 'CANCELLED'
+    assert events['Chemistry: Atomic Structure (Review)']['SEQUENCE'] == '1'
+    assert new_etag != etag
+
+    # Only the delta when asked for changed events
+    delta = generate_ics(replanned, "Test-Exam", previous=manifest, changed_only=True)
+    assert sorted(e['SUMMARY'] for e in _events(delta)) == ['Chemistry: Atomic Structure (Review)', 'Physics: Units (Review)']
+
+    # The cancellation is kept, not bumped again, on the next feed
+    again = _events(generate_ics(replanned, "Test-Exam", previous=new_manifest))
+    cancelled = [e for e in again if e['STATUS'] == 'CANCELLED']
+    assert len(cancelled) == 1 and cancelled[0]['SEQUENCE'] == '1'
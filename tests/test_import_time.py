@@ -0,0 +1,55 @@
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# What the app imports before the login screen can render
+COLD_START = "import utils, utils.study_planner, utils.calendar_sync, utils.exam_scout, utils.plan_cache, utils.ics_generator"
+
+HEAVY_SDKS = ['googleapiclient', 'google_auth_oauthlib', 'google.generativeai', 'duckduckgo_search']
+
+# Our own import time on top of pandas/numpy, which the app needs anyway.
+# Eagerly importing the SDKs above costs ~800ms; the lazy tree is ~50ms.
+BUDGET_MS = 300
+
+
+def _importtime(statement):
+    """
+    Run `python -X importtime` and return [(self_us, depth, module), ...] in report order.
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        match = re.match(r'import time:\s+(\d+) \|\s+\d+ \|( *)(\S+)', line)
+        if match:
+            rows.append((int(match.group(1)), len(match.group(2)), match.group(3)))
+    return rows
+
+
+def _self_time_ms(rows, exclude=('pandas', 'numpy')):
+    # Children are reported before their parent, so walk backwards and skip excluded subtrees
+    total, skipping = 0, []
+    for self_us, depth, name in reversed(rows):
+        while skipping and skipping[-1] >= depth:
+            skipping.pop()
+        if name.split('.')[0] in exclude:
+            skipping.append(depth)
+        elif not skipping:
+            total += self_us
+    return total / 1000
+
+
+def test_cold_start_skips_heavy_sdks():
+    imported = {name for _, _, name in _importtime(COLD_START)}
+    for sdk in HEAVY_SDKS:
+        assert sdk not in imported, f"{sdk} is imported at startup"
+
+
+def test_cold_start_budget():
+    elapsed = _self_time_ms(_importtime(COLD_START))
+    assert elapsed < BUDGET_MS, f"cold start import took {elapsed:.0f}ms (budget {BUDGET_MS}ms)"
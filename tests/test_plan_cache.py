@@ -0,0 +1,71 @@
+import pytest
+from datetime import datetime, timedelta
+import pandas as pd
+import utils.plan_cache as plan_cache
+from utils.plan_cache import PlanCache
+from utils.study_planner import StudyPlannerAgent
+
+EXAM = "JEE (Main)"
+
+@pytest.fixture
+def exam_date():
+    return (datetime.now() + timedelta(days=60)).strftime('%Y-%m-%d')
+
+@pytest.fixture
+def generation(monkeypatch):
+    # Stand-in for the (syllabus hash, exam index hash) pair read from disk
+    state = {"value": ("syllabus-v1", "exams-v1")}
+    monkeypatch.setattr(PlanCache, "_current_generation", lambda self: state["value"])
+    return state
+
+def test_hit_returns_same_plan(exam_date, generation):
+    cache = PlanCache()
+    first = cache.get_plan(StudyPlannerAgent(EXAM, exam_date, subjects=["Physics", "Chemistry"]))
+    agent = StudyPlannerAgent(EXAM, exam_date, subjects=["Chemistry", "Physics"])
+    second = cache.get_plan(agent)
+
+    pd.testing.assert_frame_equal(first, second)
+    assert cache.cache_info() == {"hits": 1, "misses": 1, "size": 1, "maxsize": plan_cache.DEFAULT_MAXSIZE}
+    # The agent looks as if it had planned itself
+    assert agent.strategy_mode == "Short Term (Crunch)"
+
+def test_cached_plan_is_read_only(exam_date, generation):
+    cache = PlanCache()
+    plan = cache.get_plan(StudyPlannerAgent(EXAM, exam_date))
+    with pytest.raises(ValueError):
+        plan.loc[0, 'Hours'] = 99
+    with pytest.raises(ValueError):
+        plan.loc[0, 'Subject'] = plan.loc[1, 'Subject']
+
+    # New columns stay local to the caller's copy
+    plan['Done'] = False
+    assert 'Done' not in cache.get_plan(StudyPlannerAgent(EXAM, exam_date)).columns
+
+def test_inputs_are_part_of_the_key(exam_date, generation):
+    cache = PlanCache()
+    cache.get_plan(StudyPlannerAgent(EXAM, exam_date, daily_hours=4))
+    cache.get_plan(StudyPlannerAgent(EXAM, exam_date, daily_hours=6))
+    cache.get_plan(StudyPlannerAgent(EXAM, exam_date, subjects=["Physics"]))
+    assert cache.cache_info()['misses'] == 3
+
+def test_lru_eviction(exam_date, generation):
+    cache = PlanCache(maxsize=2)
+    for hours in (2, 3, 4):
+        cache.get_plan(StudyPlannerAgent(EXAM, exam_date, daily_hours=hours))
+    assert cache.cache_info()['size'] == 2
+    cache.get_plan(StudyPlannerAgent(EXAM, exam_date, daily_hours=2))
+    assert cache.cache_info()['hits'] == 0
+
+def test_data_change_clears_cache(exam_date, generation):
+    cache = PlanCache()
+    cache.get_plan(StudyPlannerAgent(EXAM, exam_date))
+    generation["value"] = ("syllabus-v1", "exams-v2")
+    cache.get_plan(StudyPlannerAgent(EXAM, exam_date))
+    assert cache.cache_info()['misses'] == 2
+    assert cache.cache_info()['size'] == 1
+
+def test_errors_are_not_cached(generation):
+    cache = PlanCache()
+    result = cache.get_plan(StudyPlannerAgent(EXAM, "2001-01-01"))
+    assert "error" in result
+    assert cache.cache_info()['size'] == 0
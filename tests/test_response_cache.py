@@ -0,0 +1,72 @@
+import threading
+import time
+import pytest
+from utils.response_cache import ResponseCache, response_key
+
+@pytest.fixture
+def clock():
+    return {"now": 1000.0}
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    return ResponseCache(str(tmp_path / "cache.sqlite3"), ttl=60, max_entries=3, clock=lambda: clock["now"])
+
+def test_miss_then_hit(cache):
+    calls = []
+    def compute():
+        calls.append(1)
+        return "brief"
+    assert cache.get_or_compute("model-a", "prompt", compute) == "brief"
+    assert cache.get_or_compute("model-a", "prompt", compute) == "brief"
+    assert len(calls) == 1
+    # The model name is part of the key
+    cache.get_or_compute("model-b", "prompt", compute)
+    assert len(calls) == 2
+
+def test_persists_across_instances(cache, tmp_path, clock):
+    cache.set(response_key("m", "p"), "stored")
+    reopened = ResponseCache(cache.path, clock=lambda: clock["now"])
+    assert reopened.get(response_key("m", "p")) == "stored"
+
+def test_ttl_expiry(cache, clock):
+    cache.set("k", "old")
+    clock["now"] += 61
+    assert cache.get("k") is None
+
+def test_size_eviction_drops_least_recently_used(cache, clock):
+    for key in ("a", "b", "c"):
+        cache.set(key, key)
+        clock["now"] += 1
+    cache.get("a")  # refresh a; b is now the oldest
+    clock["now"] += 1
+    cache.set("d", "d")
+    assert cache.get("b") is None
+    assert [cache.get(k) for k in ("a", "c", "d")] == ["a", "c", "d"]
+
+def test_errors_are_not_cached(cache):
+    def failing():
+        raise RuntimeError("quota exceeded")
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute("m", "p", failing)
+    assert cache.get_or_compute("m", "p", lambda: "ok") == "ok"
+
+def test_concurrent_requests_are_coalesced(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite3"))
+    calls = []
+    release = threading.Event()
+    def slow():
+        calls.append(1)
+        release.wait(5)
+        return "shared"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute("m", "p", slow))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    time.sleep(0.2)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert results == ["shared"] * 8
+    assert len(calls) == 1
@@ -0,0 +1,98 @@
+import random
+from collections import defaultdict
+import pytest
+from utils.scheduler import pack_chapters, to_slots, SLOTS_PER_HOUR
+
+def day_loads(day_offsets, part_hours):
+    loads = defaultdict(float)
+    for day, hours in zip(day_offsets, part_hours):
+        loads[day] += hours
+    return loads
+
+def test_packs_by_hours_within_budget():
+    hours = [3, 2, 1, 1, 1]
+    priorities = [3, 3, 2, 1, 1]
+    days, chapters, parts, effective = pack_chapters(hours, priorities, days=10, daily_hours=4)
+    days, chapters = days.tolist(), chapters.tolist()
+
+    assert effective == 4
+    assert sorted(chapters) == [0, 1, 2, 3, 4]
+    assert all(load <= 4 for load in day_loads(days, parts).values())
+    # First fit: the 3h chapter opens day 0, the 1h chapter fills it
+    assert days[chapters.index(0)] == 0
+    assert days[chapters.index(2)] == 0
+
+def test_highest_weightage_first():
+    hours = [1, 1, 1, 1]
+    priorities = [1, 3, 2, 3]
+    days, chapters, _, _ = pack_chapters(hours, priorities, days=4, daily_hours=1)
+    assert chapters.tolist() == [1, 3, 2, 0]
+    assert days.tolist() == [0, 1, 2, 3]
+
+def test_long_chapter_is_split_across_days():
+    days, chapters, parts, _ = pack_chapters([5], [3], days=5, daily_hours=2)
+    assert chapters.tolist() == [0, 0, 0]
+    assert days.tolist() == [0, 1, 2]
+    assert parts.tolist() == [2, 2, 1]
+
+def test_budget_raised_when_syllabus_does_not_fit():
+    hours = [3] * 6
+    days, chapters, parts, effective = pack_chapters(hours, [1] * 6, days=2, daily_hours=4)
+    assert effective == 9
+    assert sum(parts) == 18
+    assert set(days) == {0, 1}
+
+def test_missing_or_invalid_hours_use_default():
+    assert to_slots(None) == to_slots(1) == SLOTS_PER_HOUR
+    assert to_slots(-2) == SLOTS_PER_HOUR
+    assert to_slots(0.25) == 1
+    _, _, parts, _ = pack_chapters([None, "x", 2], [1, 1, 1], days=3, daily_hours=4)
+    assert sorted(parts.tolist()) == [1, 1, 2]
+
+def first_fit_reference(need, priorities, days, capacity):
+    # Chapter-at-a-time first fit, used to check the grouped implementation
+    order = sorted(range(len(need)), key=lambda i: (-priorities[i], -need[i]))
+    free = [capacity] * days
+    placed = []
+    for idx in order:
+        remaining = need[idx]
+        while remaining:
+            piece = min(remaining, capacity)
+            day = next((d for d in range(days) if free[d] >= piece), None)
+            if day is None:
+                day = next(d for d in range(days) if free[d])
+                piece = free[day]
+            free[day] -= piece
+            placed.append((day, idx, piece))
+            remaining -= piece
+    placed.sort(key=lambda p: p[0])
+    return placed
+
+@pytest.mark.parametrize("seed", range(20))
+def test_matches_chapter_at_a_time_first_fit(seed):
+    rng = random.Random(seed)
+    n = rng.randint(1, 60)
+    hours = [rng.choice([0.5, 1, 1.5, 2, 3, 4, 5, 9]) for _ in range(n)]
+    priorities = [rng.choice([1, 2, 3]) for _ in range(n)]
+    horizon = rng.randint(1, 40)
+    daily = rng.choice([1, 2, 4, 6])
+
+    days, chapters, parts, effective = pack_chapters(hours, priorities, horizon, daily)
+    need = [to_slots(h) for h in hours]
+    expected = first_fit_reference(need, priorities, horizon, int(effective * SLOTS_PER_HOUR))
+    got = [(d, c, int(p * SLOTS_PER_HOUR)) for d, c, p in zip(days.tolist(), chapters.tolist(), parts.tolist())]
+    assert got == expected
+
+def test_empty_inputs():
+    days, chapters, parts, effective = pack_chapters([], [], days=5)
+    assert len(days) == len(chapters) == len(parts) == 0
+    assert effective == 4
+
+@pytest.mark.parametrize("n_chapters,horizon", [(2000, 365), (50, 7)])
+def test_every_hour_is_scheduled(n_chapters, horizon):
+    hours = [(i % 5) + 0.5 for i in range(n_chapters)]
+    priorities = [(i % 3) + 1 for i in range(n_chapters)]
+    days, chapters, parts, effective = pack_chapters(hours, priorities, horizon, daily_hours=6)
+    assert sum(parts) == pytest.approx(sum(hours))
+    assert max(days) < horizon
+    assert all(load <= effective for load in day_loads(days, parts).values())
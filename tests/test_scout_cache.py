@@ -0,0 +1,78 @@
+import sqlite3
+import threading
+from contextlib import closing
+from utils.scout_cache import ScoutCache, extraction_key, normalize_results, results_hash
+
+
+def test_normalized_results_hash_the_same_in_any_order():
+    a = [{"title": "NEET  notice", "body": "Exam on\n4 May", "href": "https://b"},
+         {"title": "NTA", "body": "Dates", "href": "https://a", "extra": 1}]
+    b = [{"title": "NTA", "body": "Dates ", "href": "https://a"},
+         {"title": "NEET notice", "body": "Exam on 4 May", "href": "https://b"}]
+    assert normalize_results(a) == normalize_results(b)
+    assert results_hash(normalize_results(a)) == results_hash(normalize_results(b))
+
+
+def test_layers_expire_separately(tmp_path):
+    clock = [0.0]
+    cache = ScoutCache(str(tmp_path / "scout.sqlite3"), search_ttl=10, extraction_ttl=100, clock=lambda: clock[0])
+    cache.set_search("q", [{"title": "t", "body": "b", "href": "h"}])
+    cache.set_extraction("k", {"found": True})
+
+    clock[0] = 50
+    assert cache.get_search("q") is None
+    assert cache.get_extraction("k") == {"found": True}
+    clock[0] = 150
+    assert cache.get_extraction("k") is None
+
+
+def test_extraction_key_covers_exam_date_and_prompt_version():
+    key = extraction_key("NEET", "2026-05-03", "h1", "1:2026")
+    assert extraction_key("NEET", "2026-05-03", "h1", "1:2026") == key
+    assert extraction_key("NEET", "2026-05-10", "h1", "1:2026") != key
+    assert extraction_key("NEET", "2026-05-03", "h1", "2:2026") != key
+    assert extraction_key("NEET", "2026-05-03", "h1", "1:2027") != key
+    assert extraction_key("NEET", "2026-05-03", "h2", "1:2026") != key
+
+
+def test_unreadable_rows_are_misses(tmp_path):
+    path = str(tmp_path / "scout.sqlite3")
+    cache = ScoutCache(path)
+    cache.set_search("q", [])
+    cache.set_extraction("good", {"found": True})
+    with closing(sqlite3.connect(path)) as conn, conn:
+        conn.execute("INSERT INTO searches (query, results, fetched) VALUES ('broken', '[{', 1e12)")
+        conn.execute("INSERT INTO extractions (key, data, created) VALUES ('corrupt', 'not json', 1e12)")
+        conn.execute("INSERT INTO extractions (key, data, created) VALUES ('legacy-text', '\"May 2026\"', 1e12)")
+        conn.execute("INSERT INTO extractions (key, data, created) VALUES ('no-created', '{}', NULL)")
+
+    assert cache.get_search("broken") is None
+    assert cache.get_extraction("corrupt") is None
+    assert cache.get_extraction("legacy-text") is None
+    assert cache.get_extraction("no-created") is None
+    assert cache.get_extraction("good") == {"found": True}
+
+
+def test_concurrent_writers_share_one_file(tmp_path):
+    # scan_all's workers all write through one cache, on a file nobody has opened yet
+    cache = ScoutCache(str(tmp_path / "scout.sqlite3"))
+    errors = []
+    barrier = threading.Barrier(16)
+
+    def scan(worker):
+        barrier.wait()
+        try:
+            for i in range(20):
+                cache.set_search(f"q{worker}-{i}", [{"title": "t", "body": "b", "href": "h"}])
+                cache.set_extraction(f"k{worker}-{i}", {"found": True, "worker": worker})
+        except sqlite3.OperationalError as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=scan, args=(worker,)) for worker in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert all(cache.get_extraction(f"k{worker}-19") == {"found": True, "worker": worker} for worker in range(16))
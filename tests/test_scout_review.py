@@ -0,0 +1,56 @@
+import os
+from utils.scout_review import ScoutReviewQueue, get_scout_review_queue
+from scripts.nightly_update import JSON_FILE, queue_scout_results
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _queue(tmp_path):
+    return ScoutReviewQueue(str(tmp_path / "scout.sqlite3"))
+
+
+def test_findings_wait_for_a_decision(tmp_path):
+    queue = _queue(tmp_path)
+    queue.add("NEET", "May 4, 2026", "2026-05-03", "https://nta.ac.in", "Official")
+    queue.add("NEET", "May 4, 2026", "2026-05-03", "https://news.example.org", "Official")
+    queue.add("NEET", "May 4, 2026", "2026-05-03", "https://nta.ac.in", "Official")
+
+    pending = queue.pending()
+    assert len(pending) == 1
+    assert pending[0]['Sources'] == 2 and pending[0]['Source'] == "https://nta.ac.in"
+
+    queue.resolve(pending, 'approved')
+    assert queue.pending() == []
+
+
+def test_dismissed_findings_are_not_queued_again(tmp_path):
+    queue = _queue(tmp_path)
+    queue.add("JEE (Main)", "January 21, 2026")
+    queue.resolve(queue.pending(), 'dismissed')
+
+    assert not queue.add("JEE (Main)", "January 21, 2026")
+    assert queue.pending() == []
+    assert queue.add("JEE (Main)", "January 22, 2026")  # a different date is a new finding
+
+
+def test_nightly_scout_only_queues_findings():
+    with open(os.path.join(ROOT, JSON_FILE), 'rb') as f:
+        on_file = f.read()
+    results = [
+        ({"exam_name": "NEET", "exam_date": "2026-05-03"},
+         {"found": True, "status": "Official", "exam_date": "May 4, 2026", "source_link": "https://nta.ac.in"}),
+        ({"exam_name": "KCET", "exam_date": "2026-04-20"},
+         {"found": True, "status": "Tentative", "exam_date": "April 25, 2026"}),
+        ({"exam_name": "CUET", "exam_date": "May 11, 2026"},
+         {"found": True, "status": "Official", "exam_date": "May 11, 2026"}),
+        ({"exam_name": "BITSAT", "exam_date": None}, {"error": "quota"}),
+        ({"exam_name": "MHT-CET", "exam_date": None}, None),
+        ({"exam_name": "VITEEE", "exam_date": None}, "Could not parse response"),
+    ]
+
+    queue_scout_results(results)
+
+    with open(os.path.join(ROOT, JSON_FILE), 'rb') as f:
+        assert f.read() == on_file
+    pending = get_scout_review_queue().pending()
+    assert [(u['Exam'], u['Old Date'], u['New Date']) for u in pending] == [("NEET", "2026-05-03", "May 4, 2026")]
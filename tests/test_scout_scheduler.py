@@ -0,0 +1,104 @@
+import datetime
+import json
+import pytest
+from utils.scout_scheduler import ScoutScheduler, scan_interval, DAY, RETRY_INTERVAL
+
+TODAY = datetime.date(2026, 3, 1)
+NOW = datetime.datetime(2026, 3, 1, 2, 0).timestamp()
+
+
+def _entry(dates=(), tentative=False, registration=None):
+    return {"dates": list(dates), "tentative": tentative, "registration": registration or {}}
+
+
+def test_interval_shrinks_as_the_exam_nears():
+    assert scan_interval(_entry(["2026-03-10"]), TODAY) == 1 * DAY
+    assert scan_interval(_entry(["2026-04-15"]), TODAY) == 2 * DAY
+    assert scan_interval(_entry(["2026-07-01"]), TODAY) == 7 * DAY
+    assert scan_interval(_entry(["2027-01-10"]), TODAY) == 14 * DAY
+    assert scan_interval(_entry(["2027-01-10"], tentative=True), TODAY) == 30 * DAY
+
+
+def test_registration_deadline_counts_as_a_milestone():
+    entry = _entry(["2026-11-20"], registration={"start": "2026-02-01", "end": "2026-03-05"})
+    assert scan_interval(entry, TODAY) == 1 * DAY
+
+
+def test_unknown_and_past_dates():
+    assert scan_interval(_entry(), TODAY) == 3 * DAY
+    assert scan_interval(dict(_entry(), first_date="2026-04-01"), TODAY) == 2 * DAY  # month-only date
+    assert scan_interval(_entry(["2026-01-10"]), TODAY) == 14 * DAY
+
+
+class FakeAgent:
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.scanned = []
+
+    def scan_all(self, exams, batched=False):
+        for exam in exams:
+            self.scanned.append(exam['exam_name'])
+            if exam['exam_name'] in self.fail:
+                yield exam, {"error": "quota"}
+            else:
+                yield exam, {"found": True, "exam_date": exam['exam_date'], "status": "Official"}
+
+
+@pytest.fixture
+def scheduler(tmp_path):
+    exams = [
+        {"exam_name": "Soon", "exam_date": "March 10, 2026"},
+        {"exam_name": "Later", "exam_date": "July 1, 2026"},
+        {"exam_name": "Far", "exam_date": "January 2027 (Tentative)"},
+        {"exam_name": "TBA", "exam_date": "To be announced"},
+    ]
+    path = tmp_path / "exam_dates.json"
+    path.write_text(json.dumps({"exams": exams}))
+    clock = [NOW]
+    agent = FakeAgent()
+    sched = ScoutScheduler(agent, path=str(tmp_path / "scout.sqlite3"), exam_dates_path=str(path),
+                           clock=lambda: clock[0], sleep=lambda s: None)
+    return sched, agent, clock
+
+
+def test_budget_goes_to_the_most_urgent_exams(scheduler):
+    sched, agent, clock = scheduler
+    sched.run_once(budget=2)
+    # The exam nine days out, then the one with no date yet (3-day interval)
+    assert agent.scanned == ["Soon", "TBA"]
+
+    # Next day: the two never-scanned exams are due, and so is the exam eight days out
+    clock[0] += DAY
+    assert sched.due(budget=10) == ["Later", "Far", "Soon"]
+
+
+def test_rescan_frequency_follows_proximity(scheduler):
+    sched, agent, clock = scheduler
+    scanned = []
+    for day in range(30):
+        agent.scanned.clear()
+        sched.run_once(budget=10)
+        scanned.append(set(agent.scanned))
+        clock[0] += DAY
+
+    counts = {name: sum(name in day for day in scanned) for name in ("Soon", "Later", "Far", "TBA")}
+    assert counts["Soon"] > counts["Later"] > counts["Far"]
+    assert counts["Far"] == 1
+    assert counts["TBA"] == 10
+
+
+def test_failed_scans_are_retried_sooner(scheduler):
+    sched, agent, clock = scheduler
+    agent.fail = {"Later"}
+    sched.run_once(budget=10)
+    clock[0] += RETRY_INTERVAL
+    assert sched.due(budget=10) == ["Later"]
+
+
+def test_worker_sleeps_until_the_next_exam_is_due(scheduler):
+    sched, agent, clock = scheduler
+    sleeps, runs = [], []
+    sched.sleep = sleeps.append
+    sched.run_forever(budget=10, on_results=runs.append, max_sleep=DAY, stop=lambda: len(sleeps) >= 1)
+    assert len(runs) == 1 and len(runs[0]) == 4
+    assert sleeps == [DAY]  # "Soon" is next, a day later
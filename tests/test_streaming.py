@@ -0,0 +1,24 @@
+import threading
+import pytest
+from utils.streaming import background_iter
+
+def test_items_arrive_in_order():
+    assert list(background_iter(iter(range(100)))) == list(range(100))
+
+def test_starts_before_consumption():
+    started = threading.Event()
+    def source():
+        started.set()
+        yield "chunk"
+    chunks = background_iter(source())
+    assert started.wait(2)
+    assert list(chunks) == ["chunk"]
+
+def test_errors_reach_the_consumer():
+    def source():
+        yield "partial"
+        raise RuntimeError("stream broke")
+    chunks = background_iter(source())
+    assert next(chunks) == "partial"
+    with pytest.raises(RuntimeError):
+        next(chunks)
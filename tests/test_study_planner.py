@@ -71,6 +71,89 @@ def test_generate_plan_crunch_mode(mock_syllabus_file):
     dates = plan['Date'].unique()
     assert len(dates) >= 1
 
+def test_generate_plan_respects_daily_hours(mock_syllabus_file):
+    future_date = (datetime.now() + timedelta(days=30)).strftime('%Y-%m-%d')
+    agent = StudyPlannerAgent("JEE (Main)", future_date, daily_hours=1)
+    plan = agent.generate_plan()
+
+    # Each mock chapter defaults to 1 hour, so a 1 hour budget gives one chapter per day
+    assert plan['Date'].nunique() == 3
+    assert plan['Hours'].sum() == 3
+    assert plan.iloc[0]['Weightage'] == 'High'
+    assert agent.required_daily_hours == 1
+
+def test_generate_plan_columns(mock_syllabus_file):
+    future_date = (datetime.now() + timedelta(days=30)).strftime('%Y-%m-%d')
+    agent = StudyPlannerAgent("JEE (Main)", future_date, subjects=["Physics"], daily_hours=1)
+    plan = agent.generate_plan()
+
+    assert list(plan['Chapter']) == ["Kinematics", "Units"]
+    assert list(plan['Focus']) == ["Deep Study", "Review"]
+    for col in ['Subject', 'Weightage', 'Focus', 'Day']:
+        assert isinstance(plan[col].dtype, pd.CategoricalDtype)
+
+    # Dates stay 'YYYY-MM-DD' strings and Day matches them
+    for date_str, day in zip(plan['Date'], plan['Day']):
+        assert datetime.strptime(date_str, '%Y-%m-%d').strftime('%A') == day
+
+def _shift_plan(plan, days):
+    # Pretend the plan was generated `days` days ago
+    shifted = plan.copy()
+    shifted['Date'] = (pd.to_datetime(shifted['Date']) - timedelta(days=days)).dt.strftime('%Y-%m-%d')
+    return shifted
+
+def test_replan_keeps_past_rows(mock_syllabus_file):
+    future_date = (datetime.now() + timedelta(days=30)).strftime('%Y-%m-%d')
+    agent = StudyPlannerAgent("JEE (Main)", future_date, daily_hours=1)
+    old = _shift_plan(agent.generate_plan(), 1)
+
+    plan = agent.replan(old, completed=[("Chemistry", "Atomic Structure")])
+
+    today = agent.today.strftime('%Y-%m-%d')
+    past = old[old['Date'] < today]
+    assert list(plan['Chapter'][:len(past)]) == list(past['Chapter'])
+    assert "Atomic Structure" not in set(plan['Chapter'][len(past):])
+    assert (plan['Date'][len(past):] >= today).all()
+
+def test_replan_reschedules_skipped(mock_syllabus_file):
+    future_date = (datetime.now() + timedelta(days=30)).strftime('%Y-%m-%d')
+    agent = StudyPlannerAgent("JEE (Main)", future_date, daily_hours=1)
+    old = _shift_plan(agent.generate_plan(), 1)
+    assert old['Chapter'].iloc[0] == "Kinematics"
+
+    plan = agent.replan(old, skipped=[("Physics", "Kinematics")])
+
+    today = agent.today.strftime('%Y-%m-%d')
+    upcoming = plan[plan['Date'] >= today]
+    assert list(upcoming['Chapter']) == ["Kinematics", "Atomic Structure", "Units"]
+    assert upcoming['Date'].iloc[0] == today
+
+def test_replan_skipped_chapter_appears_once(mock_syllabus_file):
+    future_date = (datetime.now() + timedelta(days=30)).strftime('%Y-%m-%d')
+    agent = StudyPlannerAgent("JEE (Main)", future_date, daily_hours=1)
+    old = _shift_plan(agent.generate_plan(), 1)
+
+    plan = agent.replan(old, skipped=[("Physics", "Kinematics")])
+
+    today = agent.today.strftime('%Y-%m-%d')
+    kinematics = plan[plan['Chapter'] == "Kinematics"]
+    assert len(kinematics) == 1
+    assert (kinematics['Date'] >= today).all()
+    assert plan['Hours'].sum() == pytest.approx(old['Hours'].sum())
+
+def test_plan_changes_returns_changed_tail(mock_syllabus_file):
+    from utils.study_planner import plan_changes
+    future_date = (datetime.now() + timedelta(days=30)).strftime('%Y-%m-%d')
+    agent = StudyPlannerAgent("JEE (Main)", future_date, daily_hours=1)
+    old = _shift_plan(agent.generate_plan(), 1)
+
+    plan = agent.replan(old, completed=[("Chemistry", "Atomic Structure")])
+    changes = plan_changes(old, plan)
+
+    # Kinematics is in the past and untouched; only Units moved
+    assert list(changes['Chapter']) == ["Units"]
+    assert plan_changes(plan, plan).empty
+
 def test_ai_strategy_mocked(mock_syllabus_file):
     # Test that AI strategy uses the mock and doesn't crash
     future_date = (datetime.now() + timedelta(days=30)).strftime('%Y-%m-%d')
@@ -100,3 +183,29 @@ def test_target_year_logic():
     assert agent.exam_date.year == target
     assert agent.exam_date.month == 5
     assert agent.exam_date.day == 1
+
+def test_ai_strategy_is_cached(mock_syllabus_file):
+    from utils import study_planner
+    future_date = (datetime.now() + timedelta(days=30)).strftime('%Y-%m-%d')
+    agent = StudyPlannerAgent("JEE (Main)", future_date)
+    plan = agent.generate_plan()
+
+    first = agent.generate_ai_strategy("fake_key", plan)
+    # Same profile from another student: no second Gemini call
+    other = StudyPlannerAgent("JEE (Main)", future_date)
+    assert other.generate_ai_strategy("other_key", other.generate_plan()) == first
+    assert study_planner.genai.GenerativeModel.return_value.generate_content.call_count == 1
+
+def test_ai_strategy_streams_chunks(mock_syllabus_file):
+    from unittest.mock import MagicMock
+    from utils import study_planner
+    chunks = [MagicMock(text="**Strategic Brief**\n"), MagicMock(text="* Revise daily")]
+    study_planner.genai.GenerativeModel.return_value.generate_content.return_value = chunks
+
+    future_date = (datetime.now() + timedelta(days=30)).strftime('%Y-%m-%d')
+    agent = StudyPlannerAgent("JEE (Main)", future_date)
+    plan = agent.generate_plan()
+
+    assert list(agent.stream_ai_strategy("fake_key", plan)) == ["**Strategic Brief**\n", "* Revise daily"]
+    # The finished stream is cached for the blocking variant too
+    assert agent.generate_ai_strategy("fake_key", plan) == "**Strategic Brief**\n* Revise daily"
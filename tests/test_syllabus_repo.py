@@ -0,0 +1,64 @@
+import json
+import os
+import pytest
+from utils.syllabus_repo import SyllabusRepository, get_syllabus_repository
+from utils.study_planner import StudyPlannerAgent
+
+SYLLABUS = {
+    "Mock Exam": {
+        "Physics": [{"name": "Kinematics", "weightage": "High", "time_required": 2}],
+        "Chemistry": [{"name": "Atoms", "weightage": "Low", "time_required": 1}]
+    }
+}
+
+@pytest.fixture
+def syllabus_path(tmp_path):
+    path = tmp_path / "syllabus.json"
+    path.write_text(json.dumps(SYLLABUS))
+    return path
+
+def test_repository_parses_once(syllabus_path, monkeypatch):
+    repo = SyllabusRepository(str(syllabus_path))
+    assert repo.get_subjects("Mock Exam") == ["Physics", "Chemistry"]
+
+    # Further reads must be served from memory while the file is unchanged
+    def fail_load(*args, **kwargs):
+        raise AssertionError("syllabus re-parsed")
+    monkeypatch.setattr("utils.syllabus_repo.json.loads", fail_load)
+
+    first = repo.get_exam("Mock Exam")
+    assert repo.get_exam("Mock Exam") is first
+    assert repo.get_exam("Unknown") == {}
+
+def test_repository_reloads_on_change(syllabus_path):
+    repo = SyllabusRepository(str(syllabus_path))
+    old_hash = repo.content_hash
+    assert repo.get_subjects("Mock Exam") == ["Physics", "Chemistry"]
+
+    updated = dict(SYLLABUS, **{"Other Exam": {"Biology": []}})
+    syllabus_path.write_text(json.dumps(updated))
+    # Force a distinct mtime even on coarse-grained filesystems
+    st = os.stat(syllabus_path)
+    os.utime(syllabus_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+    assert repo.get_subjects("Other Exam") == ["Biology"]
+    assert repo.content_hash != old_hash
+
+def test_repository_views_are_read_only(syllabus_path):
+    repo = SyllabusRepository(str(syllabus_path))
+    view = repo.get_exam("Mock Exam")
+    with pytest.raises(TypeError):
+        view["Physics"] = []
+    # Chapter dicts can still be copied into plain dicts for planning
+    assert view["Physics"][0].copy() == {"name": "Kinematics", "weightage": "High", "time_required": 2}
+
+def test_repository_missing_file(tmp_path):
+    repo = SyllabusRepository(str(tmp_path / "missing.json"))
+    assert repo.get_exam("Mock Exam") == {}
+    assert repo.content_hash is None
+
+def test_agent_uses_shared_repository():
+    repo = get_syllabus_repository()
+    exam = repo.exam_names()[0]
+    agent = StudyPlannerAgent(exam, "2026-01-01")
+    assert agent.syllabus is repo.get_exam(exam)
@@ -0,0 +1,111 @@
+import os
+import subprocess
+import sys
+import threading
+import pytest
+from utils.sync_journal import SyncInProgress, SyncJournal, job_signature
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _journal(tmp_path):
+    return SyncJournal(str(tmp_path / "journal.sqlite3"))
+
+
+def test_progress_is_checkpointed(tmp_path):
+    journal = _journal(tmp_path)
+    job = journal.start('tasks', 'acct', 'list-1', ['a', 'b', 'c'], signature='sig')
+    assert job['written'] == {} and not job['resumed']
+
+    journal.record(job['id'], [(0, 'r0', None), (1, None, RuntimeError("quota"))])
+    progress = journal.progress(job['id'])
+    assert (progress['total'], progress['done'], progress['failed'], progress['status']) == (3, 1, 1, 'running')
+    assert journal.finish(job['id']) == 'failed'
+
+
+def test_unfinished_job_is_resumed(tmp_path):
+    journal = _journal(tmp_path)
+    job = journal.start('tasks', 'acct', 'list-1', ['a', 'b'], signature='sig')
+    journal.record(job['id'], [(1, 'r1', None)])
+    journal.finish(job['id'])
+
+    again = journal.start('tasks', 'acct', 'list-1', ['a', 'b'], signature='sig')
+    assert again == {"id": job['id'], "written": {1: 'r1'}, "resumed": True}
+    journal.record(again['id'], [(0, 'r0', None)])
+    assert journal.finish(again['id']) == 'done'
+
+    # Done jobs and jobs without a signature are never resumed
+    assert not journal.start('tasks', 'acct', 'list-1', ['a', 'b'], signature='sig')['resumed']
+    assert not journal.start('tasks', 'acct', 'list-1', ['a'])['resumed']
+
+
+def test_running_job_is_not_resumed_twice(tmp_path):
+    path = str(tmp_path / "journal.sqlite3")
+    job = SyncJournal(path).start('tasks', 'acct', 'list-1', ['a', 'b'], signature='sig')
+    SyncJournal(path).finish(job['id'])
+
+    # Two processes (separate journals on one file) retry the same failed sync at once
+    journals = [SyncJournal(path), SyncJournal(path)]
+    barrier = threading.Barrier(len(journals))
+    outcomes = []
+
+    def start(journal):
+        barrier.wait()
+        try:
+            outcomes.append(journal.start('tasks', 'acct', 'list-1', ['a', 'b'], signature='sig'))
+        except SyncInProgress as error:
+            outcomes.append(error)
+
+    threads = [threading.Thread(target=start, args=(journal,)) for journal in journals]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    claimed = [outcome for outcome in outcomes if isinstance(outcome, dict)]
+    assert len(claimed) == 1 and claimed[0]['id'] == job['id'] and claimed[0]['resumed']
+    assert sum(isinstance(outcome, SyncInProgress) for outcome in outcomes) == 1
+
+
+def test_abandoned_running_job_is_taken_over(tmp_path):
+    now = [1000.0]
+    journal = SyncJournal(str(tmp_path / "journal.sqlite3"), lease=60, clock=lambda: now[0])
+    job = journal.start('tasks', 'acct', 'list-1', ['a', 'b'], signature='sig')
+    journal.record(job['id'], [(0, 'r0', None)])
+
+    with pytest.raises(SyncInProgress):
+        journal.start('tasks', 'acct', 'list-1', ['a', 'b'], signature='sig')
+
+    # No checkpoint for longer than the lease: the run that held it is gone
+    now[0] += 120
+    again = journal.start('tasks', 'acct', 'list-1', ['a', 'b'], signature='sig')
+    assert again == {"id": job['id'], "written": {0: 'r0'}, "resumed": True}
+
+
+def test_job_of_an_exited_process_is_taken_over(tmp_path):
+    path = str(tmp_path / "journal.sqlite3")
+    # A run that crashed without finishing its job, well within the lease
+    subprocess.run([sys.executable, "-c",
+                    "import sys; from utils.sync_journal import SyncJournal;"
+                    "SyncJournal(sys.argv[1]).start('tasks', 'acct', 'list-1', ['a'], signature='sig')", path],
+                   check=True, cwd=ROOT)
+
+    again = SyncJournal(path).start('tasks', 'acct', 'list-1', ['a'], signature='sig')
+    assert again['resumed']
+    with pytest.raises(SyncInProgress):
+        SyncJournal(path).start('tasks', 'acct', 'list-1', ['a'], signature='sig')
+
+
+def test_old_finished_jobs_are_pruned(tmp_path):
+    now = [1000.0]
+    journal = SyncJournal(str(tmp_path / "journal.sqlite3"), retention=60, clock=lambda: now[0])
+    job = journal.start('calendar', 'acct', 'primary', ['a'])
+    journal.finish(job['id'])
+    now[0] += 120
+    journal.start('calendar', 'acct', 'primary', ['b'])
+    assert journal.progress(job['id']) is None
+    assert journal.latest('calendar')['total'] == 1
+
+
+def test_signature_depends_on_items():
+    assert job_signature('tasks', 'a', 't', ['h1', 'h2']) != job_signature('tasks', 'a', 't', ['h2', 'h1'])
@@ -0,0 +1,323 @@
+import datetime
+import itertools
+import pytest
+import pandas as pd
+from unittest.mock import MagicMock, patch
+import utils.calendar_sync as calendar_sync
+from utils.calendar_sync import sync_to_google_calendar, sync_to_google_tasks
+from utils.sync_journal import get_sync_journal
+
+PAGE_SIZE = 3  # small pages so listing has to follow nextPageToken
+
+
+class FakeRequest:
+    def __init__(self, fn):
+        self.fn = fn
+
+    def __call__(self):
+        return self.fn()
+
+    def execute(self):
+        return self.fn()
+
+
+class FakeBatch:
+    def __init__(self, callback):
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, request_id):
+        self.requests.append((request_id, request))
+
+    def execute(self):
+        for request_id, request in self.requests:
+            try:
+                response = request()
+            except Exception as e:
+                self.callback(request_id, None, e)
+            else:
+                self.callback(request_id, response, None)
+
+
+class FakeCollection:
+    """
+    In-memory stand-in for events() / tasks(): items keyed by id, counting every write.
+    """
+    def __init__(self, writes):
+        self.items = {}
+        self.writes = writes
+        self.ids = itertools.count(1)
+        self.list_calls = 0
+        self.updated_mins = []
+
+    def _now(self):
+        return datetime.datetime.now(datetime.timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+
+    def list(self, pageToken=None, maxResults=100, updatedMin=None, showDeleted=False,
+             privateExtendedProperty=None, **filters):
+        def run():
+            self.list_calls += 1
+            self.updated_mins.append(updatedMin)
+            items = [
+                item for item in self.items.values()
+                if (showDeleted or not (item.get('deleted') or item.get('status') == 'cancelled'))
+                and (not updatedMin or item['updated'] >= updatedMin)
+                and (not privateExtendedProperty or self._matches(item, privateExtendedProperty))
+            ]
+            start = int(pageToken or 0)
+            page = {"items": items[start:start + PAGE_SIZE]}
+            if start + PAGE_SIZE < len(items):
+                page['nextPageToken'] = str(start + PAGE_SIZE)
+            return page
+        return FakeRequest(run)
+
+    def _matches(self, item, prop):
+        name, value = prop.split('=', 1)
+        return item.get('extendedProperties', {}).get('private', {}).get(name) == value
+
+    def insert(self, body, **ids):
+        def run():
+            self.writes.append('insert')
+            item = dict(body, id=f"id{next(self.ids)}", updated=self._now())
+            self.items[item['id']] = item
+            return item
+        return FakeRequest(run)
+
+    def patch(self, body, eventId=None, task=None, **ids):
+        def run():
+            self.writes.append('patch')
+            item = self.items[eventId or task]
+            item.update(body, updated=self._now())
+            return item
+        return FakeRequest(run)
+
+    def delete(self, eventId=None, task=None, **ids):
+        def run():
+            self.writes.append('delete')
+            item = self.items[eventId or task]
+            item.update(updated=self._now(), status='cancelled', deleted=True)
+            return ""
+        return FakeRequest(run)
+
+
+@pytest.fixture
+def google(monkeypatch):
+    calendar_sync._snapshots.clear()
+    calendar_sync._task_list_ids.clear()
+    calendar_sync._rate_limiters.clear()
+    monkeypatch.setattr(calendar_sync, 'TASKS_RATE_PER_SECOND', 100000)
+    monkeypatch.setattr(calendar_sync, 'get_credentials', lambda: MagicMock(refresh_token="user-1"))
+
+    writes = []
+    events, tasks = FakeCollection(writes), FakeCollection(writes)
+    service = MagicMock()
+    service.events.return_value = events
+    service.tasks.return_value = tasks
+    service.new_batch_http_request.side_effect = lambda callback: FakeBatch(callback)
+    service.tasklists.return_value.list.return_value.execute.return_value = {"items": [{"title": "SG: NEET", "id": "list-1"}]}
+    monkeypatch.setattr(calendar_sync, 'build', lambda *args, **kwargs: service)
+    return {"events": events, "tasks": tasks, "writes": writes}
+
+
+def _plan(n, day0='2026-03-01'):
+    dates = pd.date_range(day0, periods=n).strftime('%Y-%m-%d')
+    return pd.DataFrame({
+        'Date': dates,
+        'Subject': ['Physics'] * n,
+        'Chapter': [f"Chapter {i}" for i in range(n)],
+        'Weightage': ['High'] * n,
+        'Focus': ['Deep Study'] * n
+    })
+
+
+def _live(collection):
+    return [i for i in collection.items.values() if not i.get('deleted')]
+
+
+def test_calendar_reconcile_is_idempotent(google):
+    plan = _plan(10)
+    first = sync_to_google_calendar(plan, reconcile=True, exam_name="NEET")
+    assert first['inserted'] == 10
+
+    del google['writes'][:]
+    second = sync_to_google_calendar(plan, reconcile=True, exam_name="NEET")
+    assert google['writes'] == []
+    assert second['unchanged'] == 10
+    assert len(_live(google['events'])) == 10
+
+
+def test_calendar_replan_sends_only_changes(google):
+    plan = _plan(20)
+    sync_to_google_calendar(plan, reconcile=True, exam_name="NEET")
+    del google['writes'][:]
+
+    replanned = plan.iloc[:19].copy()  # last chapter dropped
+    replanned.loc[3, 'Date'] = '2026-04-30'  # one chapter moved
+    result = sync_to_google_calendar(replanned, reconcile=True, exam_name="NEET")
+
+    assert sorted(google['writes']) == ['delete', 'patch']
+    assert (result['updated'], result['deleted'], result['unchanged']) == (1, 1, 18)
+    moved = [e for e in _live(google['events']) if e['summary'] == '📚 Physics: Chapter 3']
+    assert moved[0]['start']['date'] == '2026-04-30'
+
+
+def test_calendar_reconcile_removes_duplicates(google):
+    plan = _plan(4)
+    # Two clicks on the old append-only sync
+    sync_to_google_calendar(plan, exam_name="NEET")
+    sync_to_google_calendar(plan, exam_name="NEET")
+    assert len(_live(google['events'])) == 8
+
+    result = sync_to_google_calendar(plan, reconcile=True, exam_name="NEET")
+    assert result['deleted'] == 4
+    assert len(_live(google['events'])) == 4
+
+
+def test_event_deleted_in_calendar_is_added_again(google):
+    plan = _plan(3)
+    sync_to_google_calendar(plan, reconcile=True, exam_name="NEET")
+    # Google keeps only the id and status of a cancelled event
+    removed = next(iter(google['events'].items.values()))
+    removed.clear()
+    removed.update(id='id1', status='cancelled', deleted=True, updated=google['events']._now())
+
+    result = sync_to_google_calendar(plan, reconcile=True, exam_name="NEET")
+    assert (result['inserted'], result['unchanged']) == (1, 2)
+    assert len(_live(google['events'])) == 3
+
+
+def test_exams_do_not_touch_each_other(google):
+    sync_to_google_calendar(_plan(3), reconcile=True, exam_name="NEET")
+    sync_to_google_calendar(_plan(2), reconcile=True, exam_name="JEE (Main)")
+    assert len(_live(google['events'])) == 5
+
+
+def test_tasks_reconcile_keeps_completed_tasks(google):
+    plan = _plan(6)
+    sync_to_google_tasks(plan, "SG: NEET", reconcile=True, exam_name="NEET")
+    assert len(_live(google['tasks'])) == 6
+
+    done = next(t for t in _live(google['tasks']) if t['title'] == 'Physics: Chapter 0')
+    done.update(status='completed')
+
+    # Replan without the completed chapter and without Chapter 5
+    replanned = plan.iloc[1:5]
+    del google['writes'][:]
+    result = sync_to_google_tasks(replanned, "SG: NEET", reconcile=True, exam_name="NEET")
+
+    assert google['writes'] == ['delete']
+    assert result['deleted'] == 1
+    assert done['id'] in {t['id'] for t in _live(google['tasks'])}
+
+
+def _complete(collection, day):
+    item = collection.insert({"title": f"Task {day}", "status": "completed",
+                              "completed": f"{day.isoformat()}T10:00:00.000Z"}).execute()
+    item['updated'] = item['completed']
+
+
+def test_streak_reads_every_page(google):
+    today = datetime.date.today()
+    for days_ago in range(8):
+        _complete(google['tasks'], today - datetime.timedelta(days=days_ago))
+    google['tasks'].items['id1'].update(status='needsAction')  # today's task not done yet
+
+    assert calendar_sync.get_google_tasks_streak() == 7
+
+
+def test_streak_fetches_only_updates(google):
+    today = datetime.date.today()
+    for days_ago in range(5):
+        _complete(google['tasks'], today - datetime.timedelta(days=days_ago))
+    assert calendar_sync.get_google_tasks_streak() == 5
+    full_listing = google['tasks'].list_calls
+
+    assert calendar_sync.get_google_tasks_streak() == 5
+    # Nothing changed: one page of (no) updates instead of the whole history
+    assert google['tasks'].list_calls == full_listing + 1
+
+    reopened = next(t for t in google['tasks'].items.values() if t['completed'].startswith(str(today - datetime.timedelta(days=2))))
+    reopened.update(status='needsAction', updated=google['tasks']._now())
+    assert calendar_sync.get_google_tasks_streak() == 2
+
+
+def test_streak_snapshot_survives_a_restart(google):
+    today = datetime.date.today()
+    for days_ago in range(5):
+        _complete(google['tasks'], today - datetime.timedelta(days=days_ago))
+    assert calendar_sync.get_google_tasks_streak() == 5
+
+    # A fresh process: nothing in memory, only what was saved to disk
+    calendar_sync._snapshots.clear()
+    del google['tasks'].updated_mins[:]
+    assert calendar_sync.get_google_tasks_streak() == 5
+    assert len(google['tasks'].updated_mins) == 1 and google['tasks'].updated_mins[0] is not None
+
+
+def test_interrupted_sync_resumes_without_duplicates(google, monkeypatch):
+    events = google['events']
+    insert = events.insert
+    def quota_after_four(body, **ids):
+        request = insert(body, **ids)
+        def run():
+            if len(events.items) >= 4:
+                raise RuntimeError("Quota exceeded")
+            return request()
+        return FakeRequest(run)
+    monkeypatch.setattr(events, 'insert', quota_after_four)
+
+    plan = _plan(7)
+    jobs = []
+    first = sync_to_google_calendar(plan, exam_name="NEET", on_job=jobs.append)
+    assert [r['status'] for r in first['results']].count('created') == 4
+    progress = get_sync_journal().progress(jobs[0])
+    assert (progress['status'], progress['done'], progress['failed']) == ('failed', 4, 3)
+
+    monkeypatch.setattr(events, 'insert', insert)
+    second = sync_to_google_calendar(plan, exam_name="NEET", on_job=jobs.append)
+    assert jobs[1] == jobs[0]
+    assert len(_live(events)) == 7
+    assert all(r['status'] == 'created' for r in second['results'])
+    assert [r['id'] for r in second['results'][:4]] == [r['id'] for r in first['results'][:4]]
+    assert "Resumed" in second['message']
+    assert get_sync_journal().progress(jobs[0])['status'] == 'done'
+
+    # A finished job isn't replayed: syncing again is a new run
+    sync_to_google_calendar(plan, exam_name="NEET")
+    assert len(_live(events)) == 14
+
+
+def _crunch_plan(days, per_day):
+    rows = [
+        {'Date': f"2026-04-{day + 1:02d}", 'Subject': ['Physics', 'Chemistry', 'Biology'][i % 3],
+         'Chapter': f"Chapter {day}.{i}", 'Weightage': 'High' if i == 2 else 'Low', 'Focus': 'Quick Revision'}
+        for day in range(days) for i in range(per_day)
+    ]
+    return pd.DataFrame(rows)
+
+
+def test_per_day_sync_writes_one_event_per_day(google):
+    plan = _crunch_plan(days=4, per_day=5)
+    result = sync_to_google_calendar(plan, reconcile=True, exam_name="NEET", per_day=True)
+    assert result['inserted'] == 4
+    assert google['writes'] == ['insert'] * 4
+
+    day = next(e for e in _live(google['events']) if e['start']['date'] == '2026-04-01')
+    assert day['summary'] == "📚 Physics, Chemistry, Biology (5 sessions)"
+    assert day['description'].splitlines()[0] == "☐ Physics: Chapter 0.0 (Quick Revision, Low)"
+    assert day['colorId'] == '11'  # the day has a High weightage chapter
+
+    # One changed chapter is one patched day; an unchanged plan sends nothing
+    del google['writes'][:]
+    plan.loc[7, 'Chapter'] = "Chapter 1.2 (revised)"
+    sync_to_google_calendar(plan, reconcile=True, exam_name="NEET", per_day=True)
+    sync_to_google_calendar(plan, reconcile=True, exam_name="NEET", per_day=True)
+    assert google['writes'] == ['patch']
+
+
+def test_switching_to_per_day_replaces_chapter_events(google):
+    plan = _crunch_plan(days=2, per_day=3)
+    sync_to_google_calendar(plan, reconcile=True, exam_name="NEET")
+    result = sync_to_google_calendar(plan, reconcile=True, exam_name="NEET", per_day=True)
+    assert (result['inserted'], result['deleted']) == (2, 6)
+    assert len(_live(google['events'])) == 2
@@ -1,6 +1,31 @@
-from .calendar_sync import sync_to_google_calendar, sync_to_google_tasks, get_google_tasks_streak
-from .study_planner import StudyPlannerAgent
-from .ics_generator import generate_ics
-from .exam_scout import ExamScoutAgent
+"""
+Public helpers are resolved on first access (PEP 562), so `import utils` doesn't drag in
+the Google and search SDKs behind sync, AI strategy and the exam scout.
+"""
+import importlib
 
-__all__ = ['sync_to_google_calendar', 'sync_to_google_tasks', 'get_google_tasks_streak', 'StudyPlannerAgent', 'generate_ics', 'ExamScoutAgent']
+_EXPORTS = {
+    'sync_to_google_calendar': '.calendar_sync',
+    'sync_to_google_tasks': '.calendar_sync',
+    'get_google_tasks_streak': '.calendar_sync',
+    'StudyPlannerAgent': '.study_planner',
+    'plan_changes': '.study_planner',
+    'generate_ics': '.ics_generator',
+    'ExamScoutAgent': '.exam_scout',
+    'generate_cohort_plans': '.cohort',
+    'get_plan_cache': '.plan_cache',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,10 +1,17 @@
 import os.path
 import pickle
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
 import datetime
+import hashlib
+import json
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from .ics_generator import event_uid
+from .rate_limit import RateLimiter
+from .sync_journal import get_sync_journal, job_signature
+from .sync_snapshots import get_snapshot_store
 
 # Scopes
 # If modifying these scopes, delete the file token.pickle.
@@ -13,88 +20,679 @@ SCOPES = [
     'https://www.googleapis.com/auth/tasks'
 ]
 
+def build(*args, **kwargs):
+    """
+    googleapiclient.discovery.build, imported on first use.
+    """
+    from googleapiclient.discovery import build as discovery_build
+    return discovery_build(*args, **kwargs)
+
+# Credentials are kept in memory between calls and only re-read when token.pickle changes
+# on disk. Access tokens are refreshed this long before they expire, so a sync that is
+# already running doesn't hit an expired token halfway through.
+TOKEN_REFRESH_MARGIN = datetime.timedelta(minutes=5)
+
+_creds_lock = threading.Lock()
+_creds_cache = {"stamp": None, "creds": None}
+
+def _token_stamp():
+    try:
+        stat = os.stat('token.pickle')
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+def _needs_refresh(creds):
+    if not creds.valid:
+        return True
+    expiry = getattr(creds, 'expiry', None)  # naive UTC, like google-auth's own
+    now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+    return expiry is not None and expiry - now < TOKEN_REFRESH_MARGIN
+
+def _save_credentials(creds):
+    with open('token.pickle', 'wb') as token:
+        pickle.dump(creds, token)
+
 def get_credentials():
     """
     Get valid user credentials from storage or run authentication flow.
     """
-    creds = None
-    # The file token.pickle stores the user's access and refresh tokens
-    if os.path.exists('token.pickle'):
-        with open('token.pickle', 'rb') as token:
-            creds = pickle.load(token)
-            
-    # If there are no (valid) credentials available, let the user log in.
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
+    with _creds_lock:
+        # The file token.pickle stores the user's access and refresh tokens
+        stamp = _token_stamp()
+        creds = _creds_cache['creds'] if stamp is not None and stamp == _creds_cache['stamp'] else None
+        if creds is None and stamp is not None:
+            with open('token.pickle', 'rb') as token:
+                creds = pickle.load(token)
+
+        if creds and creds.refresh_token and _needs_refresh(creds):
+            from google.auth.transport.requests import Request
             creds.refresh(Request())
-        else:
+            _save_credentials(creds)
+        elif not creds or not creds.valid:
+            # If there are no (valid) credentials available, let the user log in.
             # We need credentials.json from the user
             if not os.path.exists('credentials.json'):
                 return None
-            
+
+            from google_auth_oauthlib.flow import InstalledAppFlow
             flow = InstalledAppFlow.from_client_secrets_file(
                 'credentials.json', SCOPES)
             creds = flow.run_local_server(port=0)
-            
-        # Save the credentials for the next run
-        with open('token.pickle', 'wb') as token:
-            pickle.dump(creds, token)
-            
-    return creds
+            # Save the credentials for the next run
+            _save_credentials(creds)
+
+        _creds_cache.update(stamp=_token_stamp(), creds=creds)
+        return creds
+
+class ClientPool:
+    """
+    Built API clients, per user, API and version, kept between calls. Clients (and the
+    HTTP connections they keep alive) aren't thread-safe, so each one is used by a single
+    thread at a time: acquire() hands out an idle client or builds a new one, release()
+    puts it back.
+    """
+
+    def __init__(self, max_idle=8):
+        self.max_idle = max_idle
+        self._lock = threading.Lock()
+        self._idle = {}  # (account key, api, version) -> [(creds, client)]
+
+    def acquire(self, api, version, creds):
+        key = (_account_key(creds), api, version)
+        with self._lock:
+            idle = self._idle.get(key, [])
+            while idle:
+                owner, service = idle.pop()
+                # Clients built for credentials that have since been replaced are dropped
+                if owner is creds:
+                    return service
+        return build(api, version, credentials=creds)
+
+    def release(self, api, version, creds, service):
+        key = (_account_key(creds), api, version)
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle:
+                idle.append((creds, service))
+
+    @contextmanager
+    def client(self, api, version, creds):
+        service = self.acquire(api, version, creds)
+        try:
+            yield service
+        finally:
+            self.release(api, version, creds, service)
+
+    @contextmanager
+    def session(self, api, version, creds):
+        """
+        Yields a function returning the calling thread's client, for work spread over a
+        thread pool. Every client handed out is returned to the pool on exit.
+        """
+        local = threading.local()
+        borrowed = []
+        def thread_client():
+            service = getattr(local, 'service', None)
+            if service is None:
+                service = local.service = self.acquire(api, version, creds)
+                with self._lock:
+                    borrowed.append(service)
+            return service
+        try:
+            yield thread_client
+        finally:
+            for service in borrowed:
+                self.release(api, version, creds, service)
+
+    def clear(self):
+        with self._lock:
+            self._idle.clear()
+
+_client_pool = ClientPool()
+
+def get_client_pool():
+    return _client_pool
+
+# Google's batch endpoint accepts up to 1000 calls, but recommends at most 50 per batch
+BATCH_LIMIT = 50
+MAX_RETRIES = 3
+RETRY_BACKOFF = 1.0  # seconds, doubled on every retry round
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+# Tasks sync: worker threads for large plans, and per-user sub-requests per second
+TASKS_MAX_WORKERS = 4
+TASKS_RATE_PER_SECOND = 50
+
+_cache_lock = threading.Lock()
+_task_list_ids = {}   # (account key, task list title) -> task list id
+_rate_limiters = {}   # account key -> RateLimiter
+
+def _is_retryable(error):
+    """
+    Rate limits and server errors are worth retrying; bad requests are not.
+    """
+    status = getattr(getattr(error, 'resp', None), 'status', None)
+    if status is not None:
+        status = int(status)
+        if status in RETRYABLE_STATUSES:
+            return True
+        return status == 403 and 'ratelimitexceeded' in str(error).lower()
+    # Transport errors (timeouts, dropped connections) have no HTTP status
+    return isinstance(error, (OSError, TimeoutError))
+
+def run_batched(service, make_request, payloads, batch_size=BATCH_LIMIT, max_retries=MAX_RETRIES, sleep=time.sleep,
+                max_workers=1, service_factory=None, rate_limiter=None, on_results=None):
+    """
+    Execute make_request(payload) for every payload through batch HTTP requests.
+    Returns one (response, error) pair per payload, in order. Sub-requests that fail with a
+    retryable error are sent again, on their own, in a later batch with backoff.
+
+    With max_workers > 1, batches are sent from a thread pool. API clients aren't thread-safe,
+    so each worker then uses service_factory() (called in the worker thread) instead of
+    service, and make_request must build its request from that thread's client too.
+    rate_limiter, if given, is charged one token per sub-request before each batch is sent.
+    on_results, if given, is called after every batch with its (index, response, error) triples.
+    """
+    results = [(None, None)] * len(payloads)
+    pending = list(range(len(payloads)))
+
+    for attempt in range(max_retries + 1):
+        retry = []
+        last_round = attempt == max_retries
+
+        def callback(request_id, response, exception):
+            i = int(request_id)
+            results[i] = (response, exception)
+            if exception is not None and not last_round and _is_retryable(exception):
+                retry.append(i)
+
+        def send(group):
+            client = service_factory() if service_factory else service
+            batch = client.new_batch_http_request(callback=callback)
+            for i in group:
+                batch.add(make_request(payloads[i]), request_id=str(i))
+            if rate_limiter is not None:
+                rate_limiter.acquire(len(group))
+            try:
+                batch.execute()
+            except Exception as e:
+                # The whole batch request failed, not individual calls
+                for i in group:
+                    results[i] = (None, e)
+                if not last_round and _is_retryable(e):
+                    retry.extend(group)
+            if on_results is not None:
+                on_results([(i,) + results[i] for i in group])
+
+        groups = [pending[start:start + batch_size] for start in range(0, len(pending), batch_size)]
+        if max_workers > 1 and len(groups) > 1:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(groups))) as executor:
+                list(executor.map(send, groups))
+        else:
+            for group in groups:
+                send(group)
+
+        if not retry:
+            break
+        sleep(RETRY_BACKOFF * (2 ** attempt))
+        pending = sorted(set(retry))
+
+    return results
+
+def _remote_id(response):
+    return response.get('id') if isinstance(response, dict) else None
+
+def _run_journaled(kind, account, target, keys, payloads, signature, service, make_request, on_job=None,
+                   **batch_kwargs):
+    """
+    run_batched as a sync journal job, checkpointed after every batch. With a signature,
+    an unfinished job for the same work is resumed and its written items aren't sent again;
+    they come back as ({"id": remote id}, None). Returns (outcomes, number resumed).
+    on_job, if given, is called with the job id once the job is open, before anything is sent.
+    """
+    journal = get_sync_journal()
+    job = journal.start(kind, account, target, keys, signature)
+    if on_job is not None:
+        on_job(job['id'])
+    written = job['written']
+    todo = [i for i in range(len(payloads)) if i not in written]
+
+    def checkpoint(results):
+        journal.record(job['id'], [(todo[i], _remote_id(response), error) for i, response, error in results])
+
+    try:
+        sent = run_batched(service, make_request, [payloads[i] for i in todo], on_results=checkpoint,
+                           **batch_kwargs) if todo else []
+    finally:
+        # Released even when the run raises, so the next attempt can resume it right away
+        journal.finish(job['id'])
+
+    outcomes = [({"id": written[i]}, None) if i in written else None for i in range(len(payloads))]
+    for i, outcome in zip(todo, sent):
+        outcomes[i] = outcome
+    return outcomes, len(written)
+
+# Reconciliation: items we create carry a stable key and a hash of their content, so a
+# later sync can diff the plan against what's already there and only send the changes.
+SYNC_CLOCK_SKEW = datetime.timedelta(minutes=5)  # overlap between incremental fetches
+TASK_MARKER = re.compile(r"#sg:([0-9a-f]+):([0-9a-f]+)")
+
+_snapshots = {}  # (account, kind, container id, plan tag) -> remote items as of the last sync
+
+def plan_tag(exam_name):
+    return hashlib.sha1((exam_name or '').encode('utf-8')).hexdigest()[:12]
+
+def _content_hash(body):
+    return hashlib.sha1(json.dumps(body, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()[:16]
+
+def _keyed_rows(plan_df, exam_name):
+    """
+    (stable key, row) for every plan row. Keys are the ICS event identities, so the
+    sessions of a chapter split over several days stay distinct.
+    """
+    occurrences = {}
+    for row in plan_df.to_dict('records'):
+        ident = (str(row.get('Subject', '')), str(row.get('Chapter', '')))
+        occurrence = occurrences.get(ident, 0)
+        occurrences[ident] = occurrence + 1
+        yield event_uid(exam_name or '', ident[0], ident[1], occurrence).split('@')[0], row
+
+def _rfc3339(moment):
+    return moment.strftime('%Y-%m-%dT%H:%M:%S.000Z')
+
+def _fetch_snapshot(snapshot_key, list_page, parse_item):
+    """
+    Remote items for one calendar/task list as {"items": {key: entry}, "dupes": {id}}.
+
+    The first sync lists everything; later ones only ask for items updated since the
+    previous sync (updatedMin, with deletions) and merge them into the cached snapshot.
+    list_page(page_token, updated_min) returns one API page; parse_item(item) returns
+    None for items that aren't ours, else {"key", "id", "hash", "locked", "deleted"}.
+    """
+    previous = _snapshots.get(snapshot_key)
+    started = datetime.datetime.now(datetime.timezone.utc)
+    if previous:
+        items, dupes = dict(previous['items']), set(previous['dupes'])
+        updated_min = _rfc3339(previous['synced_at'] - SYNC_CLOCK_SKEW)
+    else:
+        items, dupes, updated_min = {}, set(), None
+    key_by_id = {entry['id']: key for key, entry in items.items()}
+
+    page_token = None
+    while True:
+        page = list_page(page_token, updated_min)
+        for item in page.get('items', []):
+            entry = parse_item(item)
+            if entry is None:
+                continue
+            key = key_by_id.get(entry['id'], entry['key'])
+            if entry['deleted']:
+                dupes.discard(entry['id'])
+                if key in items and items[key]['id'] == entry['id']:
+                    del items[key]
+                continue
+            current = items.get(key)
+            if current is not None and current['id'] != entry['id']:
+                # Same plan item twice (e.g. an earlier non-reconciling sync): keep one
+                dupes.add(entry['id'])
+                continue
+            items[key] = {"id": entry['id'], "hash": entry['hash'], "locked": entry['locked']}
+            key_by_id[entry['id']] = key
+        page_token = page.get('nextPageToken')
+        if not page_token:
+            break
+
+    return {"items": items, "dupes": dupes, "synced_at": started}
+
+def _diff(desired, snapshot):
+    """
+    Operations that turn the remote items into the plan: (op, key, body, hash, remote id).
+    Locked items (completed tasks) are never patched or deleted.
+    """
+    existing = snapshot['items']
+    ops, unchanged = [], 0
+    for key, (body, content_hash) in desired.items():
+        entry = existing.get(key)
+        if entry is None:
+            ops.append(('insert', key, body, content_hash, None))
+        elif entry['locked'] or entry['hash'] == content_hash:
+            unchanged += 1
+        else:
+            ops.append(('patch', key, body, content_hash, entry['id']))
+    for key, entry in existing.items():
+        if key not in desired and not entry['locked']:
+            ops.append(('delete', key, None, None, entry['id']))
+    for remote_id in sorted(snapshot['dupes']):
+        ops.append(('delete', None, None, None, remote_id))
+    return ops, unchanged
+
+def _reconcile(service, snapshot_key, snapshot, desired, make_request, on_job=None, **batch_kwargs):
+    """
+    Apply the diff between desired ({key: (body, hash)}) and snapshot, then remember the
+    resulting remote state for the next sync. Returns a result dict.
+    """
+    ops, unchanged = _diff(desired, snapshot)
+    # Journaled for progress only: a rerun diffs again, so it never resumes an old job
+    account, kind, target, _ = snapshot_key
+    keys = [f"{op}:{key or remote_id}" for op, key, _, _, remote_id in ops]
+    outcomes = _run_journaled(kind, account, target, keys, ops, None, service, make_request, on_job,
+                              **batch_kwargs)[0] if ops else []
+
+    counts = {'insert': 0, 'patch': 0, 'delete': 0}
+    failures = []
+    for (op, key, _, content_hash, remote_id), (response, error) in zip(ops, outcomes):
+        status = getattr(getattr(error, 'resp', None), 'status', None)
+        if error is not None and not (op == 'delete' and status in (404, 410)):
+            failures.append({"op": op, "key": key, "error": str(error)})
+            continue
+        counts[op] += 1
+        if op == 'delete':
+            if key is None:
+                snapshot['dupes'].discard(remote_id)
+            else:
+                snapshot['items'].pop(key, None)
+        else:
+            remote_id = _remote_id(response) or remote_id
+            snapshot['items'][key] = {"id": remote_id, "hash": content_hash, "locked": False}
 
-def sync_to_google_calendar(plan_df, calendar_id='primary'):
+    with _cache_lock:
+        if failures:
+            # Unknown remote state; list everything again next time
+            _snapshots.pop(snapshot_key, None)
+        else:
+            _snapshots[snapshot_key] = snapshot
+
+    message = f"{counts['insert']} added, {counts['patch']} updated, {counts['delete']} removed, {unchanged} unchanged."
+    if failures:
+        message += f" {len(failures)} failed."
+    return {
+        "status": "success",
+        "message": message,
+        "inserted": counts['insert'],
+        "updated": counts['patch'],
+        "deleted": counts['delete'],
+        "unchanged": unchanged,
+        "failures": failures
+    }
+
+def _calendar_event(row):
+    date_str = row['Date'] # YYYY-MM-DD
+    subject = row.get('Subject', 'Study')
+    chapter = row.get('Chapter', 'Topic')
+    weightage = row.get('Weightage', 'Low')
+
+    # Color ID: 11 (Red) for High, 5 (Yellow) for Medium, 9 (Blue) for Low
+    # See https://lukeboyle.com/blog-posts/2016/04/google-calendar-api-color-id
+    color_id = '9'
+    if weightage == 'High': color_id = '11'
+    if weightage == 'Medium': color_id = '5'
+
+    return {
+        'summary': f"📚 {subject}: {chapter}",
+        'description': f"Focus: {row.get('Focus', 'Study')}\nWeightage: {weightage}",
+        'start': {
+            'date': date_str,
+            'timeZone': 'Asia/Kolkata',
+        },
+        'end': {
+            'date': date_str,
+            'timeZone': 'Asia/Kolkata',
+        },
+        'colorId': color_id,
+        'transparency': 'transparent', # Show as 'Available' so it doesn't block meetings
+    }
+
+WEIGHTAGE_RANK = {'High': 0, 'Medium': 1, 'Low': 2}
+
+def _day_event(date_str, rows):
+    """
+    One all-day event for every session on date_str, with a checklist of them in the
+    description. The colour follows the day's highest weightage.
+    """
+    top = min(rows, key=lambda row: WEIGHTAGE_RANK.get(row.get('Weightage', 'Low'), 2))
+    event = _calendar_event(dict(top, Date=date_str))
+    if len(rows) > 1:
+        subjects = list(dict.fromkeys(str(row.get('Subject', 'Study')) for row in rows))
+        event['summary'] = f"📚 {', '.join(subjects)} ({len(rows)} sessions)"
+    event['description'] = "\n".join(
+        f"☐ {row.get('Subject', 'Study')}: {row.get('Chapter', 'Topic')} "
+        f"({row.get('Focus', 'Study')}, {row.get('Weightage', 'Low')})"
+        for row in rows
+    )
+    return event
+
+def _keyed_days(plan_df, exam_name):
+    """
+    (stable key, date, rows) for every plan date, in date order.
+    """
+    days = {}
+    for row in plan_df.to_dict('records'):
+        days.setdefault(str(row['Date']), []).append(row)
+    for date_str in sorted(days):
+        key = hashlib.sha1(f"{exam_name or ''}\0day\0{date_str}".encode('utf-8')).hexdigest()[:24]
+        yield key, date_str, days[date_str]
+
+def _tag_event(event, tag, key):
+    content_hash = _content_hash(event)
+    event['extendedProperties'] = {'private': {'sg_plan': tag, 'sg_key': key, 'sg_hash': content_hash}}
+    return event, content_hash
+
+def _tagged_calendar_event(row, tag, key):
+    return _tag_event(_calendar_event(row), tag, key)
+
+def _tagged_calendar_events(plan_df, exam_name, per_day=False):
+    """
+    [(key, (event, content hash))] for the plan: one event per row, or one per date.
+    """
+    tag = plan_tag(exam_name)
+    if per_day:
+        return [(key, _tag_event(_day_event(date_str, rows), tag, key))
+                for key, date_str, rows in _keyed_days(plan_df, exam_name)]
+    return [(key, _tagged_calendar_event(row, tag, key)) for key, row in _keyed_rows(plan_df, exam_name)]
+
+def _parse_calendar_item(item, tag):
+    private = item.get('extendedProperties', {}).get('private', {})
+    deleted = item.get('status') == 'cancelled'
+    # Deleted events may come back without their properties; they're matched by id
+    if not deleted and private.get('sg_plan') != tag:
+        return None
+    return {"key": private.get('sg_key'), "id": item['id'], "hash": private.get('sg_hash'),
+            "locked": False, "deleted": deleted}
+
+def _reconcile_calendar(service, account, calendar_id, plan_df, exam_name, per_day=False, on_job=None):
+    tag = plan_tag(exam_name)
+    desired = dict(_tagged_calendar_events(plan_df, exam_name, per_day))
+
+    def list_page(page_token, updated_min):
+        params = {"calendarId": calendar_id, "maxResults": 2500}
+        if page_token:
+            params['pageToken'] = page_token
+        if updated_min:
+            # Deleted events lose their properties, so the property filter would hide them:
+            # list every change and let _parse_calendar_item pick ours
+            params.update(updatedMin=updated_min, showDeleted=True)
+        else:
+            params['privateExtendedProperty'] = f"sg_plan={tag}"
+        return service.events().list(**params).execute()
+
+    def make_request(op):
+        action, _, body, _, remote_id = op
+        if action == 'insert':
+            return service.events().insert(calendarId=calendar_id, body=body)
+        if action == 'patch':
+            return service.events().patch(calendarId=calendar_id, eventId=remote_id, body=body)
+        return service.events().delete(calendarId=calendar_id, eventId=remote_id)
+
+    snapshot_key = (account, 'calendar', calendar_id, tag)
+    snapshot = _fetch_snapshot(snapshot_key, list_page, lambda item: _parse_calendar_item(item, tag))
+    result = _reconcile(service, snapshot_key, snapshot, desired, make_request, on_job)
+    result['message'] = "Calendar synced: " + result['message']
+    return result
+
+def sync_to_google_calendar(plan_df, calendar_id='primary', reconcile=False, exam_name=None, per_day=False,
+                            on_job=None):
     """
     Sync items from plan_df to Google Calendar as All-Day Events.
+    Events are inserted through batch requests; 'results' has one entry per event.
+
+    With reconcile=True the calendar is brought in line with the plan instead: events from
+    an earlier sync of the same exam are diffed by their stable key, and only the needed
+    inserts, patches and deletes are sent. Safe to run any number of times.
+
+    With per_day=True the plan's sessions are collapsed into one event per date, with a
+    checklist of the day's chapters; a changed day is then a single patch.
+
+    on_job, if given, is called with the sync journal id of the run, for reading its progress.
     """
     creds = get_credentials()
     if not creds:
         return {"status": "error", "message": "credentials.json not found or auth failed."}
 
     try:
-        service = build('calendar', 'v3', credentials=creds)
-        
-        count = 0
-        for _, row in plan_df.iterrows():
-            date_str = row['Date'] # YYYY-MM-DD
-            subject = row.get('Subject', 'Study')
-            chapter = row.get('Chapter', 'Topic')
-            weightage = row.get('Weightage', 'Low')
-            
-            # Color ID: 11 (Red) for High, 5 (Yellow) for Medium, 9 (Blue) for Low
-            # See https://lukeboyle.com/blog-posts/2016/04/google-calendar-api-color-id
-            color_id = '9' 
-            if weightage == 'High': color_id = '11'
-            if weightage == 'Medium': color_id = '5'
-            
-            event = {
-                'summary': f"📚 {subject}: {chapter}",
-                'description': f"Focus: {row.get('Focus', 'Study')}\nWeightage: {weightage}",
-                'start': {
-                    'date': date_str,
-                    'timeZone': 'Asia/Kolkata',
-                },
-                'end': {
-                    'date': date_str,
-                    'timeZone': 'Asia/Kolkata', 
-                },
-                'colorId': color_id,
-                'transparency': 'transparent', # Show as 'Available' so it doesn't block meetings
-            }
+        with _client_pool.client('calendar', 'v3', creds) as service:
+            if reconcile:
+                return _reconcile_calendar(service, _account_key(creds), calendar_id, plan_df, exam_name, per_day,
+                                           on_job)
 
-            try:
-                service.events().insert(calendarId=calendar_id, body=event).execute()
-                count += 1
-            except Exception as loop_e:
-                print(f"Failed to add event for {date_str}: {loop_e}")
-                
-        return {"status": "success", "message": f"Successfully added {count} events to Calendar."}
+            account = _account_key(creds)
+            keyed = _tagged_calendar_events(plan_df, exam_name, per_day)
+            events = [event for _, (event, _) in keyed]
+
+            # A run that stopped halfway picks up where it left off instead of adding duplicates
+            signature = job_signature('calendar', account, calendar_id, [content_hash for _, (_, content_hash) in keyed])
+            outcomes, resumed = _run_journaled(
+                'calendar', account, calendar_id, [key for key, _ in keyed], events, signature,
+                service,
+                lambda event: service.events().insert(calendarId=calendar_id, body=event),
+                on_job
+            )
+
+            results = []
+            count = 0
+            for event, (response, error) in zip(events, outcomes):
+                if error is not None:
+                    print(f"Failed to add event for {event['start']['date']}: {error}")
+                    results.append({"date": event['start']['date'], "summary": event['summary'], "status": "failed", "error": str(error)})
+                else:
+                    count += 1
+                    results.append({"date": event['start']['date'], "summary": event['summary'], "status": "created",
+                                    "id": (response or {}).get('id')})
+
+            message = f"Successfully added {count} events to Calendar."
+            if resumed:
+                message += f" Resumed an interrupted sync; {resumed} were already added."
+            if count < len(events):
+                message += f" {len(events) - count} failed."
+            return {"status": "success", "message": message, "results": results}
 
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
-def sync_to_google_tasks(plan_df, task_list_name="StrikeGoal Plan"):
+def _account_key(creds):
+    """
+    Stable per-user key for caches and rate limits, without keeping the token itself.
+    """
+    identity = getattr(creds, 'refresh_token', None) or getattr(creds, 'client_id', None) or str(id(creds))
+    return hashlib.sha256(str(identity).encode('utf-8')).hexdigest()[:16]
+
+def _rate_limiter_for(account):
+    with _cache_lock:
+        limiter = _rate_limiters.get(account)
+        if limiter is None:
+            limiter = _rate_limiters[account] = RateLimiter(TASKS_RATE_PER_SECOND)
+        return limiter
+
+def _find_task_list(service, account, title, refresh=False):
+    """
+    Id of the task list named title, from the per-user title->id cache when possible.
+    A cache miss lists every task list once (all pages) and refreshes the whole map.
+    """
+    key = (account, title)
+    if not refresh and key in _task_list_ids:
+        return _task_list_ids[key]
+
+    titles = {}
+    page_token = None
+    while True:
+        page = service.tasklists().list(maxResults=100, pageToken=page_token).execute()
+        for tl in page.get('items', []):
+            titles.setdefault(tl['title'], tl['id'])
+        page_token = page.get('nextPageToken')
+        if not page_token:
+            break
+
+    with _cache_lock:
+        for name in [k for k in _task_list_ids if k[0] == account]:
+            del _task_list_ids[name]
+        for name, list_id in titles.items():
+            _task_list_ids[(account, name)] = list_id
+    return titles.get(title)
+
+def _task_body(row):
+    # ISO 8601 timestamp for due date (RFC 3339)
+    # Google Tasks due date is T00:00:00.000Z
+    return {
+        'title': f"{row.get('Subject', '')}: {row.get('Chapter', '')}",
+        'notes': f"Focus: {row.get('Focus', 'Study')}",
+        'due': f"{row['Date']}T00:00:00.000Z"
+    }
+
+def _tagged_task(row, key):
+    body = _task_body(row)
+    content_hash = _content_hash(body)
+    # Tasks have no hidden properties; the key and hash ride at the end of the notes
+    body['notes'] += f"\n\n#sg:{key}:{content_hash}"
+    return body, content_hash
+
+def _parse_task_item(item):
+    if item.get('deleted'):
+        return {"key": None, "id": item['id'], "hash": None, "locked": False, "deleted": True}
+    marker = TASK_MARKER.search(item.get('notes') or '')
+    if not marker:
+        return None
+    # Completed tasks are the student's history (and their streak); never touch them
+    return {"key": marker.group(1), "id": item['id'], "hash": marker.group(2),
+            "locked": item.get('status') == 'completed', "deleted": False}
+
+def _reconcile_tasks(service, account, list_id, keyed_rows, thread_service, task_list_name, batch_options,
+                     on_job=None):
+    desired = {key: _tagged_task(row, key) for key, row in keyed_rows}
+
+    def list_page(page_token, updated_min):
+        params = {"tasklist": list_id, "showCompleted": True, "showHidden": True, "maxResults": 100}
+        if page_token:
+            params['pageToken'] = page_token
+        if updated_min:
+            params.update(updatedMin=updated_min, showDeleted=True)
+        return service.tasks().list(**params).execute()
+
+    def make_request(op):
+        action, _, body, _, remote_id = op
+        tasks = thread_service().tasks()
+        if action == 'insert':
+            return tasks.insert(tasklist=list_id, body=body)
+        if action == 'patch':
+            return tasks.patch(tasklist=list_id, task=remote_id, body=body)
+        return tasks.delete(tasklist=list_id, task=remote_id)
+
+    snapshot_key = (account, 'tasks', list_id, None)
+    snapshot = _fetch_snapshot(snapshot_key, list_page, _parse_task_item)
+    result = _reconcile(service, snapshot_key, snapshot, desired, make_request, on_job, **batch_options)
+    result['message'] = f"'{task_list_name}' synced: " + result['message']
+    return result
+
+def sync_to_google_tasks(plan_df, task_list_name="StrikeGoal Plan", max_workers=TASKS_MAX_WORKERS,
+                         reconcile=False, exam_name=None, on_job=None):
     """
     Sync items from plan_df to a Google Task list.
+    Tasks are inserted through batch requests, sent from a small thread pool for large plans
+    and rate limited per user; 'results' has one entry per plan row.
+
+    With reconcile=True the list is brought in line with the plan instead: only new, changed
+    and dropped tasks are sent, and completed tasks are left alone.
+
+    on_job, if given, is called with the sync journal id of the run, for reading its progress.
     """
     creds = get_credentials()
     if not creds:
@@ -107,111 +705,156 @@ def sync_to_google_tasks(plan_df, task_list_name="StrikeGoal Plan"):
         return {"status": "error", "message": "Authentication failed. Please check your Google API credentials."}
 
     try:
-        service = build('tasks', 'v1', credentials=creds)
-
-        # 1. Create or Find Task List
-        tasklists = service.tasklists().list().execute()
-        target_list_id = None
-        
-        for tl in tasklists.get('items', []):
-            if tl['title'] == task_list_name:
-                target_list_id = tl['id']
-                break
-        
-        if not target_list_id:
-            new_list = service.tasklists().insert(body={'title': task_list_name}).execute()
-            target_list_id = new_list['id']
-
-        # 2. Add Tasks
-        count = 0
-        total = len(plan_df)
-        
-        for _, row in plan_df.iterrows():
-            date_str = row['Date'] # String 'YYYY-MM-DD'
-            subject = row.get('Subject', '')
-            chapter = row.get('Chapter', '')
-            
-            # ISO 8601 timestamp for due date (RFC 3339)
-            # Google Tasks due date is T00:00:00.000Z
-            due_date = f"{date_str}T00:00:00.000Z"
-            
-            task_body = {
-                'title': f"{subject}: {chapter}",
-                'notes': f"Focus: {row.get('Focus', 'Study')}",
-                'due': due_date
-            }
-            
-            service.tasks().insert(tasklist=target_list_id, body=task_body).execute()
-            count += 1
-            
-        return {"status": "success", "message": f"Successfully added {count} tasks to '{task_list_name}'"}
+        # One pooled client per worker thread; this thread's client is reused when serial
+        with _client_pool.session('tasks', 'v1', creds) as thread_service:
+            service = thread_service()
+            account = _account_key(creds)
+
+            # 1. Create or Find Task List
+            target_list_id = _find_task_list(service, account, task_list_name)
+            if not target_list_id:
+                new_list = service.tasklists().insert(body={'title': task_list_name}).execute()
+                target_list_id = new_list['id']
+                with _cache_lock:
+                    _task_list_ids[(account, task_list_name)] = target_list_id
+
+            keyed_rows = list(_keyed_rows(plan_df, exam_name or task_list_name))
+            batch_options = dict(
+                max_workers=max_workers if len(keyed_rows) > BATCH_LIMIT else 1,
+                service_factory=thread_service,
+                rate_limiter=_rate_limiter_for(account)
+            )
+
+            if reconcile:
+                return _reconcile_tasks(service, account, target_list_id, keyed_rows, thread_service,
+                                        task_list_name, batch_options, on_job)
+
+            # 2. Add Tasks
+            tagged = [_tagged_task(row, key) for key, row in keyed_rows]
+            bodies = [body for body, _ in tagged]
+
+            signature = job_signature('tasks', account, target_list_id, [content_hash for _, content_hash in tagged])
+            outcomes, resumed = _run_journaled(
+                'tasks', account, target_list_id, [key for key, _ in keyed_rows], bodies, signature,
+                service,
+                lambda body: thread_service().tasks().insert(tasklist=target_list_id, body=body),
+                on_job, **batch_options
+            )
+
+            # A cached list id that no longer exists (list deleted in Google Tasks)
+            if bodies and not resumed and all(getattr(getattr(e, 'resp', None), 'status', None) == 404 for _, e in outcomes):
+                with _cache_lock:
+                    _task_list_ids.pop((account, task_list_name), None)
+
+            results = []
+            count = 0
+            for body, (response, error) in zip(bodies, outcomes):
+                if error is not None:
+                    results.append({"title": body['title'], "status": "failed", "error": str(error)})
+                else:
+                    count += 1
+                    results.append({"title": body['title'], "status": "created", "id": (response or {}).get('id')})
+
+            message = f"Successfully added {count} tasks to '{task_list_name}'"
+            if resumed:
+                message += f" (resumed an interrupted sync; {resumed} were already added)"
+            if count < len(bodies):
+                message += f" ({len(bodies) - count} failed)"
+            return {"status": "success", "message": message, "results": results}
 
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
-def get_google_tasks_streak(prefix="SG:"):
+def _parse_completed_task(item):
+    # The completion date stands in for the content hash; anything not completed
+    # (reopened or deleted since the last fetch) drops out of the snapshot
+    completed = item.get('status') == 'completed' and 'completed' in item and not item.get('deleted')
+    return {"key": item['id'], "id": item['id'], "hash": item['completed'][:10] if completed else None,
+            "locked": False, "deleted": not completed}
+
+def _completed_dates(service, account, list_id):
+    """
+    Completion dates of every completed task in a list. Only the first call for a list
+    pages through all of it; later ones fetch what changed since (see _fetch_snapshot).
+    The snapshot is also kept on disk, so that holds across restarts and workers too.
+    """
+    def list_page(page_token, updated_min):
+        params = {"tasklist": list_id, "showCompleted": True, "showHidden": True, "maxResults": 100}
+        if page_token:
+            params['pageToken'] = page_token
+        if updated_min:
+            params.update(updatedMin=updated_min, showDeleted=True)
+        return service.tasks().list(**params).execute()
+
+    snapshot_key = (account, 'streak', list_id, None)
+    store = get_snapshot_store()
+    with _cache_lock:
+        if snapshot_key not in _snapshots:
+            stored = store.get(snapshot_key)
+            if stored is not None:
+                _snapshots[snapshot_key] = stored
+    snapshot = _fetch_snapshot(snapshot_key, list_page, _parse_completed_task)
+    with _cache_lock:
+        _snapshots[snapshot_key] = snapshot
+    store.put(snapshot_key, snapshot)
+    return {entry['hash'] for entry in snapshot['items'].values()}
+
+def _streak(dates, today):
+    """
+    Consecutive days with a completed task, ending today (or yesterday, if nothing has
+    been completed yet today).
+    """
+    current_check = today if today in dates else today - datetime.timedelta(days=1)
+    streak = 0
+    while current_check in dates:
+        streak += 1
+        current_check -= datetime.timedelta(days=1)
+    return streak
+
+def get_google_tasks_streak(prefix="SG:", max_workers=TASKS_MAX_WORKERS):
     """
     Calculate the current study streak (consecutive days with completed tasks).
     Look for task lists starting with 'prefix' (default 'SG:' for StrikeGoal).
+    Lists are read concurrently, and after the first call only tasks updated since
+    the previous one are fetched.
     """
     creds = get_credentials()
     if not creds:
         return 0 # No credentials, no streak
-        
+
     try:
-        service = build('tasks', 'v1', credentials=creds)
-        
-        # 1. Find relevant task lists
-        tasklists = service.tasklists().list().execute()
-        relevant_list_ids = []
-        for tl in tasklists.get('items', []):
-            if tl['title'].startswith(prefix):
-                relevant_list_ids.append(tl['id'])
-                
-        if not relevant_list_ids:
-            return 0
-            
-        # 2. Fetch completed tasks from all lists
-        completed_dates = set()
-        for list_id in relevant_list_ids:
-            # We want completed tasks. showCompleted=True, showHidden=True
-            results = service.tasks().list(
-                tasklist=list_id, 
-                showCompleted=True, 
-                showHidden=True,
-                maxResults=100
-            ).execute()
-            
-            tasks = results.get('items', [])
-            for task in tasks:
-                if task['status'] == 'completed' and 'completed' in task:
-                    # Parse timestamp (YYYY-MM-DD...)
-                    comp_date_str = task['completed'][:10]
-                    completed_dates.add(comp_date_str)
-                    
+        with _client_pool.session('tasks', 'v1', creds) as thread_service:
+            service = thread_service()
+            account = _account_key(creds)
+
+            # 1. Find relevant task lists
+            relevant_list_ids = []
+            page_token = None
+            while True:
+                page = service.tasklists().list(maxResults=100, pageToken=page_token).execute()
+                for tl in page.get('items', []):
+                    if tl['title'].startswith(prefix):
+                        relevant_list_ids.append(tl['id'])
+                page_token = page.get('nextPageToken')
+                if not page_token:
+                    break
+
+            if not relevant_list_ids:
+                return 0
+
+            # 2. Completed dates from all lists
+            fetch = lambda list_id: _completed_dates(thread_service(), account, list_id)
+            if max_workers > 1 and len(relevant_list_ids) > 1:
+                with ThreadPoolExecutor(max_workers=min(max_workers, len(relevant_list_ids))) as executor:
+                    per_list = list(executor.map(fetch, relevant_list_ids))
+            else:
+                per_list = [fetch(list_id) for list_id in relevant_list_ids]
+
         # 3. Calculate Streak
-        if not completed_dates:
-            return 0
-            
-        sorted_dates = sorted([datetime.datetime.strptime(d, "%Y-%m-%d").date() for d in completed_dates], reverse=True)
-        today = datetime.date.today()
-        yesterday = today - datetime.timedelta(days=1)
-        
-        if sorted_dates[0] < yesterday:
-            return 0
-            
-        streak = 0
-        current_check = today
-        if sorted_dates[0] != today:
-             current_check = yesterday
-             
-        date_set = set(sorted_dates)
-        while current_check in date_set:
-            streak += 1
-            current_check -= datetime.timedelta(days=1)
-            
-        return streak
-        
+        completed_dates = set().union(*per_list)
+        dates = {datetime.datetime.strptime(d, "%Y-%m-%d").date() for d in completed_dates}
+        return _streak(dates, datetime.date.today())
+
     except Exception as e:
         print(f"Error calculating streak: {e}")
         return 0
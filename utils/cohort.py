@@ -0,0 +1,116 @@
+"""
+Batch study-plan generation for a cohort of students.
+
+Identical profiles are planned once. Small batches run in-process against the shared
+syllabus repository and exam index; large ones fan out over a ProcessPoolExecutor whose
+workers each parse the syllabus and index once up front.
+"""
+from concurrent.futures import ProcessPoolExecutor
+import os
+import numpy as np
+import pandas as pd
+from .exam_index import load_exam_index
+from .scheduler import DEFAULT_DAILY_HOURS
+from .study_planner import StudyPlannerAgent
+from .syllabus_repo import get_syllabus_repository
+
+# Unique profiles needed before planning is spread over worker processes
+PARALLEL_THRESHOLD = 200
+
+
+def _profile_key(profile):
+    return (
+        profile['exam'],
+        tuple(sorted(profile.get('subjects') or [])),
+        profile.get('target_year'),
+        profile.get('daily_hours') or DEFAULT_DAILY_HOURS,
+        profile.get('exam_date')
+    )
+
+
+def _plan_for(key):
+    exam, subjects, target_year, daily_hours, exam_date = key
+    if exam_date is None:
+        entry = load_exam_index()['exams'].get(exam)
+        if not entry:
+            return {"error": f"Exam '{exam}' not found."}
+        exam_date = entry['exam_date']
+
+    agent = StudyPlannerAgent(
+        exam_name=exam,
+        exam_date=exam_date,
+        subjects=list(subjects),
+        target_year=target_year,
+        daily_hours=daily_hours
+    )
+    return agent.generate_plan()
+
+
+def _plan_chunk(keys):
+    return [_plan_for(key) for key in keys]
+
+
+def _warm_worker():
+    # Parse syllabus.json and the exam index once per worker process
+    get_syllabus_repository().exam_names()
+    load_exam_index()
+
+
+def generate_cohort_plans(profiles, max_workers=None, parallel_threshold=PARALLEL_THRESHOLD, as_arrow=False):
+    """
+    Generate study plans for many students.
+
+    profiles: iterable of dicts with 'student_id' and 'exam', plus optional 'subjects',
+              'target_year', 'daily_hours' and 'exam_date' (defaults to the exam's date on file).
+
+    Returns (plans, errors): plans is one long-format DataFrame (or pyarrow Table when
+    as_arrow=True) with a leading student_id column; errors maps student_id to a message
+    for students whose plan could not be generated.
+    """
+    profiles = list(profiles)
+    keys = [_profile_key(p) for p in profiles]
+    unique_keys = list(dict.fromkeys(keys))
+
+    if len(unique_keys) >= parallel_threshold and (max_workers or os.cpu_count() or 1) > 1:
+        workers = max_workers or os.cpu_count()
+        chunk_size = -(-len(unique_keys) // (workers * 4))
+        chunks = [unique_keys[i:i + chunk_size] for i in range(0, len(unique_keys), chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_warm_worker) as executor:
+            results = [plan for chunk in executor.map(_plan_chunk, chunks) for plan in chunk]
+    else:
+        results = _plan_chunk(unique_keys)
+
+    plans, plan_no = [], {}
+    for key, result in zip(unique_keys, results):
+        if isinstance(result, pd.DataFrame):
+            plan_no[key] = len(plans)
+            plans.append(result)
+        else:
+            plan_no[key] = result
+
+    errors = {}
+    student_ids, student_plans = [], []
+    for profile, key in zip(profiles, keys):
+        ref = plan_no[key]
+        if isinstance(ref, dict):
+            errors[profile['student_id']] = ref.get('error', 'Unknown error')
+        else:
+            student_ids.append(profile['student_id'])
+            student_plans.append(ref)
+
+    if plans:
+        # Stack each distinct plan once, then gather rows per student by position
+        lengths = np.array([len(p) for p in plans])
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        stacked = pd.concat(plans, ignore_index=True)
+        picked = np.array(student_plans, dtype=np.int64)
+        positions = np.concatenate([np.arange(starts[p], starts[p] + lengths[p]) for p in picked])
+        result_df = stacked.take(positions).reset_index(drop=True)
+        result_df.insert(0, 'student_id', np.repeat(np.array(student_ids, dtype=object), lengths[picked]))
+    else:
+        result_df = pd.DataFrame(columns=['student_id', 'Date', 'Day', 'Subject', 'Chapter', 'Weightage', 'Focus', 'Hours'])
+
+    if as_arrow:
+        import pyarrow as pa
+        return pa.Table.from_pandas(result_df, preserve_index=False), errors
+    return result_df, errors
@@ -0,0 +1,273 @@
+"""
+Exam date parsing engine.
+
+Exam dates arrive as free text ("Session 1: Jan 22-29, 2026; Session 2: Apr 01-10, 2026",
+"28 April to 03 May 2026", "May 2026 (Tentative)", ...). parse_exam_dates() turns such a
+string into a structured ParsedDates result. All grammars are compiled once at import time
+and results are memoized per raw string, so Streamlit reruns pay for a parse only once.
+"""
+import calendar
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+_MONTHS = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12,
+}
+
+_MON = (r'(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?'
+        r'|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)(?![a-z])\.?')
+_DASH = r'\s*(?:-|–|—|to)\s*'
+_YEAR = r'(?P<y>\d{4})'
+
+# Grammars, tried in order against each ';'-separated segment. Year is optional in the
+# month-first forms because lists like "Ph 1: April 23-28; Ph 3: July 4-5, 2026" only
+# state it once.
+_GRAMMARS = [
+    ('iso', re.compile(r'\b(?P<y>\d{4})-(?P<m>\d{1,2})-(?P<d>\d{1,2})\b')),
+    # 28 April to 03 May 2026
+    ('cross_range', re.compile(
+        rf'\b(?P<d1>\d{{1,2}})\s+(?P<m1>{_MON}){_DASH}(?P<d2>\d{{1,2}})\s+(?P<m2>{_MON}),?\s+{_YEAR}', re.I)),
+    # 21-30 January 2026
+    ('day_range', re.compile(
+        rf'\b(?P<d1>\d{{1,2}}){_DASH}(?P<d2>\d{{1,2}})\s+(?P<m>{_MON}),?\s+{_YEAR}', re.I)),
+    # Jan 22-29, 2026
+    ('month_range', re.compile(
+        rf'\b(?P<m>{_MON})\s+(?P<d1>\d{{1,2}}){_DASH}(?P<d2>\d{{1,2}})\b(?:,?\s+{_YEAR})?', re.I)),
+    # January 21, 22, 23, 28, 2026
+    ('day_list', re.compile(
+        rf'\b(?P<m>{_MON})\s+(?P<days>\d{{1,2}}(?:\s*(?:,|&|and)\s*\d{{1,2}}\b)+)(?:\s*,?\s*(?:\.\.\.)?\s*{_YEAR})?', re.I)),
+    # 21 December 2025
+    ('day_month', re.compile(rf'\b(?P<d>\d{{1,2}})\s+(?P<m>{_MON}),?\s+{_YEAR}', re.I)),
+    # November 30, 2025
+    ('month_day', re.compile(rf'\b(?P<m>{_MON})\s+(?P<d>\d{{1,2}})\b(?:,?\s+{_YEAR})?', re.I)),
+    # March to June 2026
+    ('month_span', re.compile(rf'\b(?P<m1>{_MON}){_DASH}(?P<m2>{_MON}),?\s+{_YEAR}', re.I)),
+    # May 2026
+    ('month_year', re.compile(rf'\b(?P<m>{_MON}),?\s+{_YEAR}', re.I)),
+    # Tentative 2026
+    ('year', re.compile(r'\b(?P<y>\d{4})\b')),
+]
+
+_PAREN = re.compile(r'\(([^)]*)\)')
+_LABEL = re.compile(r'^\s*([^:\d]*?[A-Za-z][^:]*?)\s*:')
+_YEAR_ANY = re.compile(r'\b(\d{4})\b')
+_TENTATIVE = re.compile(r'\b(?:tentative|expected|approx(?:imate(?:ly)?)?|tba|tbd)\b', re.I)
+_DAY_NUM = re.compile(r'\d{1,2}')
+
+DAY, MONTH, YEAR = 'day', 'month', 'year'
+
+
+@dataclass(frozen=True)
+class DateSession:
+    """
+    One ';'-separated part of an exam date string.
+
+    ranges     -- inclusive (start, end) date pairs found in the text
+    days       -- explicitly listed days ("January 21, 22, 23, 2026")
+    precision  -- 'day', 'month' (e.g. "May 2026") or 'year' ("Tentative 2026")
+    """
+    label: str
+    ranges: tuple
+    days: tuple
+    precision: str
+    tentative: bool
+
+    @property
+    def start(self):
+        candidates = [r[0] for r in self.ranges] + list(self.days)
+        return min(candidates) if candidates else None
+
+    @property
+    def end(self):
+        candidates = [r[1] for r in self.ranges] + list(self.days)
+        return max(candidates) if candidates else None
+
+    def dates(self):
+        """
+        Concrete calendar days for this session, sorted. Empty unless precision is 'day'.
+        """
+        if self.precision != DAY:
+            return ()
+        found = set(self.days)
+        for start, end in self.ranges:
+            for offset in range((end - start).days + 1):
+                found.add(start + timedelta(days=offset))
+        return tuple(sorted(found))
+
+
+@dataclass(frozen=True)
+class ParsedDates:
+    raw: str
+    sessions: tuple
+
+    @property
+    def tentative(self):
+        return any(s.tentative for s in self.sessions)
+
+    def first_date(self, exact=False):
+        """
+        Earliest date mentioned, as a datetime. Month-precision sessions count as the 1st
+        of the month unless exact=True; year-only sessions never count.
+        """
+        allowed = (DAY,) if exact else (DAY, MONTH)
+        starts = [s.start for s in self.sessions if s.precision in allowed and s.start]
+        if not starts:
+            return None
+        first = min(starts)
+        return datetime(first.year, first.month, first.day)
+
+    def last_date(self, exact=False):
+        """
+        Latest date mentioned, as a datetime. Month-precision sessions count as the last day
+        of the month unless exact=True; year-only sessions never count.
+        """
+        allowed = (DAY,) if exact else (DAY, MONTH)
+        ends = [s.end for s in self.sessions if s.precision in allowed and s.end]
+        if not ends:
+            return None
+        last = max(ends)
+        return datetime(last.year, last.month, last.day)
+
+    def all_dates(self):
+        """
+        Sorted concrete days across all sessions.
+        """
+        found = set()
+        for session in self.sessions:
+            found.update(session.dates())
+        return tuple(sorted(found))
+
+
+EMPTY = ParsedDates(raw='', sessions=())
+
+
+def _month(token):
+    return _MONTHS[token.strip('.').lower()[:3]]
+
+
+def _day(y, m, d):
+    try:
+        return date(int(y), int(m), int(d))
+    except ValueError:
+        return None
+
+
+def _month_bounds(y, m):
+    return date(y, m, 1), date(y, m, calendar.monthrange(y, m)[1])
+
+
+def _match_segment(text, year):
+    """
+    Try each grammar against one segment. `year` is the fallback for forms that omit it.
+    Returns (kind, ranges, days, precision) or None.
+    """
+    for kind, pattern in _GRAMMARS:
+        match = pattern.search(text)
+        if not match:
+            continue
+        g = match.groupdict()
+        y = int(g['y']) if g.get('y') else year
+        if y is None:
+            continue
+
+        if kind == 'iso':
+            d = _day(y, g['m'], g['d'])
+            if d:
+                return kind, ((d, d),), (), DAY
+        elif kind == 'cross_range':
+            start, end = _day(y, _month(g['m1']), g['d1']), _day(y, _month(g['m2']), g['d2'])
+            if start and end:
+                if end < start:
+                    start = _day(y - 1, _month(g['m1']), g['d1']) or start
+                return kind, ((start, end),), (), DAY
+        elif kind in ('day_range', 'month_range'):
+            m = _month(g['m'])
+            start, end = _day(y, m, g['d1']), _day(y, m, g['d2'])
+            if start and end and start <= end:
+                return kind, ((start, end),), (), DAY
+        elif kind == 'day_list':
+            m = _month(g['m'])
+            days = tuple(d for d in (_day(y, m, n) for n in _DAY_NUM.findall(g['days'])) if d)
+            if days:
+                return kind, (), tuple(sorted(set(days))), DAY
+        elif kind in ('day_month', 'month_day'):
+            d = _day(y, _month(g['m']), g['d'])
+            if d:
+                return kind, ((d, d),), (), DAY
+        elif kind == 'month_span':
+            start = _month_bounds(y, _month(g['m1']))[0]
+            end = _month_bounds(y, _month(g['m2']))[1]
+            if start <= end:
+                return kind, ((start, end),), (), MONTH
+        elif kind == 'month_year':
+            return kind, (_month_bounds(y, _month(g['m'])),), (), MONTH
+        elif kind == 'year':
+            return kind, ((date(y, 1, 1), date(y, 12, 31)),), (), YEAR
+    return None
+
+
+@lru_cache(maxsize=2048)
+def _parse(raw):
+    segments = []
+    for part in raw.split(';'):
+        part = part.strip()
+        if not part:
+            continue
+
+        notes = _PAREN.findall(part)
+        text = _PAREN.sub(' ', part)
+        tentative = bool(_TENTATIVE.search(part))
+
+        label = ''
+        label_match = _LABEL.match(text)
+        if label_match:
+            label = label_match.group(1).strip()
+            text = text[label_match.end():]
+        else:
+            notes = [n.strip() for n in notes if n.strip() and not _TENTATIVE.fullmatch(n.strip())]
+            if notes:
+                label = notes[0]
+
+        years = _YEAR_ANY.findall(text)
+        segments.append([label, text, tentative, int(years[-1]) if years else None])
+
+    # Segments without a year borrow the next stated one ("April 23-28; ...; July 4-5, 2026"),
+    # falling back to the previous one.
+    next_year = None
+    for seg in reversed(segments):
+        if seg[3] is None:
+            seg[3] = next_year
+        else:
+            next_year = seg[3]
+    prev_year = None
+    for seg in segments:
+        if seg[3] is None:
+            seg[3] = prev_year
+        else:
+            prev_year = seg[3]
+
+    sessions = []
+    for label, text, tentative, year in segments:
+        result = _match_segment(text, year)
+        if result is None:
+            continue
+        _, ranges, days, precision = result
+        sessions.append(DateSession(label, ranges, days, precision, tentative))
+
+    return ParsedDates(raw=raw, sessions=tuple(sessions))
+
+
+def parse_exam_dates(raw):
+    """
+    Parse a free-text exam date into ParsedDates. Non-strings and blanks give EMPTY.
+    """
+    if not isinstance(raw, str) or not raw.strip():
+        return EMPTY
+    return _parse(raw)
+
+
+def parse_cache_info():
+    return _parse.cache_info()
@@ -0,0 +1,147 @@
+"""
+Normalized exam date index, stored next to exam_dates.json.
+
+Ingestion (scout updates, nightly/sync/populate scripts) writes the index whenever it
+rewrites exam_dates.json. Each exam entry holds its sorted concrete session dates and
+registration window as ISO strings, so the app only has to load and slice it. The index
+records a SHA-256 of the exam_dates.json it was built from; readers rebuild it lazily
+when that hash no longer matches.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from .date_parser import parse_exam_dates
+
+DEFAULT_EXAM_DATES_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'exam_dates.json')
+INDEX_VERSION = 1
+
+_lock = threading.Lock()
+_memo = {}  # index path -> ((mtime_ns, size) of exam_dates.json, index)
+
+
+def index_path_for(json_path):
+    root, _ = os.path.splitext(json_path)
+    return root + '.index.json'
+
+
+def _iso(value):
+    return value.strftime('%Y-%m-%d') if value else None
+
+
+def build_exam_index(raw):
+    """
+    Build the index dict from the raw bytes of exam_dates.json.
+    """
+    data = json.loads(raw)
+    exams = {}
+    for exam in data.get('exams', []):
+        name = exam.get('exam_name') or exam.get('name')
+        if not name:
+            continue
+
+        parsed = parse_exam_dates(exam.get('exam_date'))
+        sessions = []
+        for session in parsed.sessions:
+            days = session.dates()
+            if days:
+                sessions.append({
+                    "label": session.label,
+                    "dates": [_iso(d) for d in days],
+                    "tentative": session.tentative
+                })
+
+        exams[name] = {
+            "exam_date": exam.get('exam_date'),
+            "level": exam.get('level', ''),
+            "stream": exam.get('stream', ''),
+            "dates": [_iso(d) for d in parsed.all_dates()],
+            "first_date": _iso(parsed.first_date()),
+            "tentative": parsed.tentative,
+            "sessions": sessions,
+            "registration": {
+                "start": _iso(parse_exam_dates(exam.get('registration_start')).first_date()),
+                "end": _iso(parse_exam_dates(exam.get('registration_end')).last_date())
+            }
+        }
+
+    return {
+        "version": INDEX_VERSION,
+        "source_hash": hashlib.sha256(raw).hexdigest(),
+        "exams": exams
+    }
+
+
+def _write_sidecar(index_path, index):
+    # Written to a temp file and renamed over the sidecar, so a reader sees either the
+    # old index or the new one, never a half-written file
+    fd, tmp_path = tempfile.mkstemp(prefix='.exam_index.', suffix='.tmp', dir=os.path.dirname(index_path) or '.')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(index, f, indent=4)
+        os.replace(tmp_path, index_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def write_exam_index(json_path=DEFAULT_EXAM_DATES_PATH):
+    """
+    Rebuild the sidecar index for json_path and write it to disk. Returns the index.
+    """
+    with open(json_path, 'rb') as f:
+        raw = f.read()
+    index = build_exam_index(raw)
+    _write_sidecar(index_path_for(json_path), index)
+    return index
+
+
+def _read_sidecar(index_path, source_hash):
+    try:
+        with open(index_path, 'r') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if index.get('version') != INDEX_VERSION or index.get('source_hash') != source_hash:
+        return None
+    return index
+
+
+def load_exam_index(json_path=DEFAULT_EXAM_DATES_PATH):
+    """
+    Return the index for json_path, rebuilding the sidecar if it is missing or stale.
+    Kept in memory until exam_dates.json changes on disk.
+    """
+    index_path = index_path_for(json_path)
+    try:
+        st = os.stat(json_path)
+    except OSError:
+        return {"version": INDEX_VERSION, "source_hash": None, "exams": {}}
+    stamp = (st.st_mtime_ns, st.st_size)
+
+    cached = _memo.get(index_path)
+    if cached and cached[0] == stamp:
+        return cached[1]
+
+    with _lock:
+        cached = _memo.get(index_path)
+        if cached and cached[0] == stamp:
+            return cached[1]
+
+        with open(json_path, 'rb') as f:
+            raw = f.read()
+        index = _read_sidecar(index_path, hashlib.sha256(raw).hexdigest())
+        if index is None:
+            index = build_exam_index(raw)
+            try:
+                _write_sidecar(index_path, index)
+            except OSError as e:
+                # Read-only deployments still get the in-memory index
+                print(f"Could not write exam index: {e}")
+
+        _memo[index_path] = (stamp, index)
+        return index
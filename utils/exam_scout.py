@@ -1,48 +1,114 @@
-from duckduckgo_search import DDGS
-import google.generativeai as genai
 import json
 import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from .exam_index import write_exam_index
+from .lazy import LazyModule
+from .rate_limit import RateLimiter
+from .scout_cache import get_scout_cache, normalize_results, results_hash, extraction_key
+
+# Search and LLM SDKs are only imported when a scan actually runs
+duckduckgo_search = LazyModule('duckduckgo_search')
+genai = LazyModule('google.generativeai')
+
+# Full-catalogue scans: exams scanned at once, and requests per second to each provider
+SCOUT_MAX_WORKERS = 8
+SEARCH_RATE_PER_SECOND = 2
+LLM_RATE_PER_SECOND = 4
+# DuckDuckGo throttles bursts, so searches are evenly spaced from the first one: a scan of
+# n uncached exams takes at least (n - SEARCH_BURST) / SEARCH_RATE_PER_SECOND seconds
+SEARCH_BURST = 1
+
+# Batched extraction: prompt size per Gemini call (estimated tokens) and exams per call
+BATCH_TOKEN_BUDGET = 6000
+BATCH_MAX_EXAMS = 10
+
+# Part of every cached extraction's key: bump it when the extraction prompts change so
+# answers to the old prompt aren't reused
+PROMPT_VERSION = 1
+
+EXTRACTION_RULES = """Identify the OFFICIAL Exam Date for the upcoming session (likely {this_year} or {next_year}).
+            If there are multiple specific dates (e.g., "21, 22, 23..."), list ALL of them explicitly. Do NOT summarize as a range (e.g., "21-30") if gaps exist."""
+
+def estimate_tokens(text):
+    # Roughly four characters per token for English prompts
+    return len(text) // 4 + 1
+
+def _format_snippets(results):
+    return "\n\n".join([f"Source: {r['title']}\nSnippet: {r['body']}\nLink: {r['href']}" for r in results])
+
+def _name_key(exam_name):
+    return " ".join(str(exam_name).split()).casefold()
+
+def _prompt_version():
+    # The rules name the target years, so a new year asks again too
+    return f"{PROMPT_VERSION}:{datetime.datetime.now().year}"
+
+def _parse_json(text):
+    return json.loads(text.replace("```json", "").replace("```", "").strip())
 
 class ExamScoutAgent:
-    def __init__(self, api_key):
+    def __init__(self, api_key, search_rate=SEARCH_RATE_PER_SECOND, llm_rate=LLM_RATE_PER_SECOND, cache=None):
         self.api_key = api_key
+        self.cache = cache
         if api_key:
             genai.configure(api_key=api_key)
             self.model = genai.GenerativeModel('gemini-2.0-flash')
+        # Shared by every scan from this agent, whichever thread it runs on
+        self.search_limiter = RateLimiter(search_rate, burst=SEARCH_BURST)
+        self.llm_limiter = RateLimiter(llm_rate, burst=SCOUT_MAX_WORKERS)
 
-    def scan_exam(self, exam_name, current_date=None):
+    def _prepare(self, exam_name, current_date):
         """
-        Search for updates for a specific exam.
-        Returns a dict with found info or None.
+        Search step of a scan. Returns a job dict; its "result" is already set when no
+        LLM call is needed (no results, cached extraction, or an error).
         """
-        if not self.api_key:
-            return {"error": "API Key missing"}
-
         print(f"Scouting for: {exam_name}")
         current_year = datetime.datetime.now().year
         # Search for current year exams too, especially early in the year
         query = f"{exam_name} exam date {current_year} {current_year + 1} official notification"
-        
+        job = {"exam_name": exam_name, "current_date": current_date, "result": None}
+
+        cache = self.cache or get_scout_cache()
         try:
             # 1. Search Web
-            results = DDGS().text(query, max_results=5)
+            results = cache.get_search(query)
+            if results is None:
+                self.search_limiter.acquire()
+                results = normalize_results(duckduckgo_search.DDGS().text(query, max_results=5))
+                if results:
+                    cache.set_search(query, results)
             if not results:
-                return {"status": "no_results", "message": "No recent news found."}
-                
-            snippets = "\n\n".join([f"Source: {r['title']}\nSnippet: {r['body']}\nLink: {r['href']}" for r in results])
-            
+                job['result'] = {"status": "no_results", "message": "No recent news found."}
+                return job
+
+            job.update(snippets=_format_snippets(results), snippet_hash=results_hash(results))
+            job['key'] = extraction_key(exam_name, current_date, job['snippet_hash'], _prompt_version())
+            job['result'] = cache.get_extraction(job['key'])
+        except Exception as e:
+            job['result'] = {"error": str(e)}
+        return job
+
+    def _remember(self, job, data):
+        (self.cache or get_scout_cache()).set_extraction(job['key'], data, job['exam_name'], job['snippet_hash'])
+        return data
+
+    def _extract(self, job):
+        """
+        Extraction step for one exam: a single Gemini call over its search results.
+        """
+        current_year = datetime.datetime.now().year
+        try:
             # 2. Extract with Gemini
             prompt = f"""
-            You are an Exam Data Scout. Analyze these search results for the exam "{exam_name}".
+            You are an Exam Data Scout. Analyze these search results for the exam "{job['exam_name']}".
             Current Date: {datetime.datetime.now().strftime('%Y-%m-%d')}
-            Current Data on file: {current_date if current_date else "Unknown"}
+            Current Data on file: {job['current_date'] if job['current_date'] else "Unknown"}
             
             Search Results:
-            {snippets}
+            {job['snippets']}
             
             Task:
-            Identify the OFFICIAL Exam Date for the upcoming session (likely {current_year} or {current_year + 1}).
-            If there are multiple specific dates (e.g., "21, 22, 23..."), list ALL of them explicitly. Do NOT summarize as a range (e.g., "21-30") if gaps exist.
+            {EXTRACTION_RULES.format(this_year=current_year, next_year=current_year + 1)}
             
             Output JSON only:
             {{
@@ -54,16 +120,159 @@ class ExamScoutAgent:
             }}
             """
             
+            self.llm_limiter.acquire()
             response = self.model.generate_content(prompt)
-            # clean json
-            text = response.text.replace("```json", "").replace("```", "").strip()
-            data = json.loads(text)
-            
-            return data
+            return self._remember(job, _parse_json(response.text))
             
         except Exception as e:
             return {"error": str(e)}
 
+    def _batch_prompt(self, jobs):
+        current_year = datetime.datetime.now().year
+        sections = "\n\n".join(
+            f"""=== Exam: "{job['exam_name']}" ===
+            Current Data on file: {job['current_date'] if job['current_date'] else "Unknown"}
+            Search Results:
+            {job['snippets']}"""
+            for job in jobs
+        )
+        return f"""
+            You are an Exam Data Scout. Analyze the search results below, given separately for each of {len(jobs)} exams.
+            Current Date: {datetime.datetime.now().strftime('%Y-%m-%d')}
+
+            {sections}
+
+            Task:
+            For EACH exam, using only that exam's search results:
+            {EXTRACTION_RULES.format(this_year=current_year, next_year=current_year + 1)}
+
+            Output a JSON array only, with exactly one object per exam:
+            [
+                {{
+                    "exam_name": "The exam name exactly as given above",
+                    "found": true/false,
+                    "exam_date": "Exact string from source (e.g., 'January 21, 22, 23, 24, 28, 2026')",
+                    "source_link": "URL of most reliable source",
+                    "status": "Official" or "Tentative" or "predicted",
+                    "summary": "One sentence summary"
+                }}
+            ]
+            """
+
+    def _extract_batch(self, jobs):
+        """
+        Extraction step for several exams in one Gemini call. Exams the reply doesn't
+        cover (or all of them, if it can't be parsed) fall back to their own calls.
+        Returns [(job, result)].
+        """
+        if len(jobs) == 1:
+            return [(jobs[0], self._extract(jobs[0]))]
+
+        by_name = {}
+        try:
+            self.llm_limiter.acquire()
+            data = _parse_json(self.model.generate_content(self._batch_prompt(jobs)).text)
+            for item in data if isinstance(data, list) else []:
+                if isinstance(item, dict) and 'exam_name' in item:
+                    by_name.setdefault(_name_key(item.pop('exam_name')), item)
+        except Exception as e:
+            print(f"Batched extraction failed, falling back to one call per exam: {e}")
+
+        out = []
+        for job in jobs:
+            item = by_name.get(_name_key(job['exam_name']))
+            out.append((job, self._remember(job, item) if item is not None else self._extract(job)))
+        return out
+
+    def scan_exam(self, exam_name, current_date=None):
+        """
+        Search for updates for a specific exam.
+        Returns a dict with found info or None.
+        Recent searches come from the scout cache, and Gemini is only asked again when
+        the search results differ from the ones it last extracted from.
+        """
+        if not self.api_key:
+            return {"error": "API Key missing"}
+
+        job = self._prepare(exam_name, current_date)
+        if job['result'] is not None:
+            return job['result']
+        return self._extract(job)
+
+    def scan_all(self, exams, max_workers=SCOUT_MAX_WORKERS, batched=False):
+        """
+        Scan many exams concurrently. exams are exam_dates.json entries; yields
+        (exam, result) pairs as each scan finishes, in completion order.
+
+        With batched=True, exams that need an LLM call are packed into shared Gemini
+        prompts of up to BATCH_TOKEN_BUDGET estimated tokens (BATCH_MAX_EXAMS exams).
+        That makes fewer Gemini calls but is not faster: results wait for their whole batch,
+        so it suits unattended runs rather than a scan someone is watching.
+        """
+        exams = list(exams)
+        if not exams:
+            return
+        if batched and self.api_key:
+            yield from self._scan_all_batched(exams, max_workers)
+            return
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(exams))) as executor:
+            futures = {
+                executor.submit(self.scan_exam, exam.get('exam_name') or exam.get('name'), exam.get('exam_date')): exam
+                for exam in exams
+            }
+            try:
+                for future in as_completed(futures):
+                    yield futures[future], future.result()
+            finally:
+                # A caller that stops early doesn't wait for scans that haven't started
+                for future in futures:
+                    future.cancel()
+
+    def _scan_all_batched(self, exams, max_workers):
+        # Batches get their own pool, so they don't queue behind the remaining searches
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(exams))) as executor, \
+                ThreadPoolExecutor(max_workers=max(1, max_workers // 2)) as extractors:
+            # future -> ("search", exam) or ("batch", [(exam, job)])
+            running = {
+                executor.submit(self._prepare, exam.get('exam_name') or exam.get('name'), exam.get('exam_date')):
+                    ("search", exam)
+                for exam in exams
+            }
+            batch = []
+
+            def submit(batch):
+                jobs = [job for _, job in batch]
+                running[extractors.submit(self._extract_batch, jobs)] = ("batch", batch)
+
+            try:
+                while running:
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        kind, payload = running.pop(future)
+                        if kind == "batch":
+                            exam_for = {id(job): exam for exam, job in payload}
+                            for job, result in future.result():
+                                yield exam_for[id(job)], result
+                            continue
+
+                        job = future.result()
+                        if job['result'] is not None:
+                            yield payload, job['result']
+                            continue
+                        if batch and (len(batch) >= BATCH_MAX_EXAMS or estimate_tokens(
+                                self._batch_prompt([j for _, j in batch] + [job])) > BATCH_TOKEN_BUDGET):
+                            submit(batch)
+                            batch = []
+                        batch.append((payload, job))
+
+                    # The last, partly filled batch goes once every search is done
+                    if batch and all(kind == "batch" for kind, _ in running.values()):
+                        submit(batch)
+                        batch = []
+            finally:
+                for future in running:
+                    future.cancel()
+
 def update_exam_database(updates_list):
     """
     Update the JSON database with new info.
@@ -94,6 +303,7 @@ def update_exam_database(updates_list):
         
         with open(data_path, 'w') as f:
             json.dump(data, f, indent=4)
+        write_exam_index(data_path)
             
         return True, f"Updated {updated_count} exams successfully."
     except Exception as e:
@@ -0,0 +1,187 @@
+"""
+Subscribable calendar feeds for study plans.
+
+The Streamlit app publishes each student's plan into a FeedStore; a small Starlette app
+served by uvicorn on a background thread exposes it at /feeds/<feed_id>.ics. Feeds are
+rendered through the ICS generator once per publish and kept in memory as plain and
+gzipped bytes with their ETag, so a calendar client's poll is a dict lookup and, most of
+the time, a 304.
+"""
+import gzip
+import hashlib
+import hmac
+import os
+import secrets
+import socket
+import threading
+from urllib.parse import urlsplit
+from .ics_generator import build_ics_feed
+
+DEFAULT_HOST = os.getenv("ICS_FEED_HOST", "127.0.0.1")
+DEFAULT_PORT = int(os.getenv("ICS_FEED_PORT", "8765"))
+FEED_BASE_URL = os.getenv("ICS_FEED_BASE_URL", f"http://localhost:{DEFAULT_PORT}")
+# Hosts no calendar app outside this machine can reach
+LOCAL_HOSTS = {'', 'localhost', '0.0.0.0', '::1'}
+
+# Feed ids are unguessable; without a configured secret they last as long as the process,
+# which is also how long the in-memory feeds last.
+_FEED_SECRET = os.getenv("ICS_FEED_SECRET") or secrets.token_hex(32)
+_FEED_SECRET_CONFIGURED = bool(os.getenv("ICS_FEED_SECRET"))
+
+
+def feed_id_for(user_email, exam_name):
+    message = f"{user_email}\0{exam_name}".encode('utf-8')
+    return hmac.new(_FEED_SECRET.encode('utf-8'), message, hashlib.sha256).hexdigest()[:32]
+
+
+def feed_url(feed_id, base_url=FEED_BASE_URL):
+    return f"{base_url.rstrip('/')}/feeds/{feed_id}.ics"
+
+
+def _is_public(base_url):
+    host = urlsplit(base_url or '').hostname or ''
+    return not (host in LOCAL_HOSTS or host.startswith('127.'))
+
+
+def public_feed_url(feed_id, base_url=FEED_BASE_URL):
+    """
+    feed_url for feed_id, or None while base_url points at this machine (ICS_FEED_BASE_URL
+    not set to a public address), since a subscription link would not work from anywhere else.
+    """
+    return feed_url(feed_id, base_url) if _is_public(base_url) else None
+
+
+def feeds_enabled(base_url=FEED_BASE_URL, secret_configured=None):
+    """
+    Whether to serve feeds at all: only with a public ICS_FEED_BASE_URL and a fixed
+    ICS_FEED_SECRET, so the links handed out are reachable and survive a restart.
+    """
+    if secret_configured is None:
+        secret_configured = _FEED_SECRET_CONFIGURED
+    return secret_configured and _is_public(base_url)
+
+
+class FeedStore:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._feeds = {}  # feed_id -> {"body", "gzip", "etag", "manifest"}
+
+    def publish(self, feed_id, plan_df, exam_name):
+        """
+        Render plan_df as the feed for feed_id and return its ETag. Events keep their
+        SEQUENCE across publishes unless they changed.
+        """
+        previous = self._feeds.get(feed_id)
+        text, manifest, etag = build_ics_feed(plan_df, exam_name, previous=previous and previous['manifest'])
+        if previous and previous['etag'] == etag:
+            return etag
+
+        body = text.encode('utf-8')
+        entry = {"body": body, "gzip": gzip.compress(body, compresslevel=6), "etag": etag, "manifest": manifest}
+        with self._lock:
+            self._feeds[feed_id] = entry
+        return etag
+
+    def get(self, feed_id):
+        return self._feeds.get(feed_id)
+
+    def remove(self, feed_id):
+        with self._lock:
+            self._feeds.pop(feed_id, None)
+
+
+def _etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    # Weak comparison (RFC 9110 13.1.2): W/ prefixes are ignored
+    candidates = [tag.strip() for tag in if_none_match.split(',')]
+    return any(tag.removeprefix('W/') == etag for tag in candidates)
+
+
+def _accepts_gzip(accept_encoding):
+    for coding in (accept_encoding or '').split(','):
+        name, _, params = coding.strip().partition(';')
+        if name.strip().lower() == 'gzip':
+            return params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000')
+    return False
+
+
+def create_feed_app(store):
+    """
+    Starlette app serving GET/HEAD /feeds/{feed_id}.ics from store.
+    """
+    from starlette.applications import Starlette
+    from starlette.responses import Response
+    from starlette.routing import Route
+
+    async def feed(request):
+        entry = store.get(request.path_params['feed_id'])
+        if entry is None:
+            return Response("Feed not found", status_code=404, media_type="text/plain")
+
+        headers = {"ETag": entry['etag'], "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        if _etag_matches(request.headers.get('if-none-match'), entry['etag']):
+            return Response(status_code=304, headers=headers)
+
+        body = entry['body']
+        if _accepts_gzip(request.headers.get('accept-encoding')):
+            body = entry['gzip']
+            headers['Content-Encoding'] = 'gzip'
+        return Response(body, media_type="text/calendar; charset=utf-8", headers=headers)
+
+    return Starlette(routes=[Route("/feeds/{feed_id}.ics", feed, methods=["GET", "HEAD"])])
+
+
+_default_store = FeedStore()
+_server_lock = threading.Lock()
+_server_thread = None
+_server_error = None  # why the server could not start; it is not retried
+
+
+def get_feed_store():
+    return _default_store
+
+
+def _bind(host, port):
+    family = socket.AF_INET6 if ':' in host else socket.AF_INET
+    sock = socket.socket(family=family)
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((host, port))
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def start_feed_server(host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """
+    Serve the default store with uvicorn on a daemon thread, and return the thread.
+    Safe to call on every Streamlit rerun; only the first call starts the server. If the
+    port can't be bound the error is logged once and every later call returns None.
+    """
+    global _server_thread, _server_error
+    with _server_lock:
+        if _server_thread is not None and _server_thread.is_alive():
+            return _server_thread
+        if _server_error is not None:
+            return None
+
+        # Bound here rather than by uvicorn, which calls sys.exit() on a failed bind
+        # and would only take the daemon thread down with it
+        try:
+            sock = _bind(host, port)
+        except OSError as e:
+            _server_error = e
+            print(f"Calendar feed server not started on {host}:{port}: {e}")
+            return None
+
+        import uvicorn
+        config = uvicorn.Config(create_feed_app(_default_store), log_level="warning")
+        server = uvicorn.Server(config)
+        _server_thread = threading.Thread(target=server.run, kwargs={"sockets": [sock]},
+                                          name="ics-feed-server", daemon=True)
+        _server_thread.start()
+        return _server_thread
@@ -1,57 +1,214 @@
-from datetime import datetime
+"""
+iCalendar (RFC 5545) export of study plans.
+
+iter_ics yields the calendar in chunks of a few hundred events, so a plan with tens of
+thousands of rows never has to exist as one big list of lines. Text values are escaped
+and long lines folded at 75 octets as the RFC requires.
+
+Events get stable UIDs from (exam, subject, chapter, occurrence). Given the manifest of
+the previous feed, only changed events get a new SEQUENCE/DTSTAMP and removed ones are
+sent as CANCELLED, so calendar clients apply a small delta instead of re-importing.
+"""
+from datetime import datetime, timezone
+import hashlib
+import io
 import pandas as pd
 
-def generate_ics(plan_df, exam_name):
+CRLF = "\r\n"
+FOLD_OCTETS = 75
+CHUNK_ROWS = 500
+
+
+def escape_text(value):
     """
-    Generate an iCalendar (.ics) string from the study plan DataFrame.
+    Escape a TEXT property value (RFC 5545 3.3.11).
+    """
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def fold_line(line):
+    """
+    Fold a content line into CRLF-terminated pieces of at most 75 octets,
+    without splitting a UTF-8 character.
+    """
+    if line.isascii():
+        if len(line) <= FOLD_OCTETS:
+            return line + CRLF
+        # Continuation lines start with a space, which counts towards the limit
+        pieces = [line[:FOLD_OCTETS]]
+        pieces.extend(line[i:i + FOLD_OCTETS - 1] for i in range(FOLD_OCTETS, len(line), FOLD_OCTETS - 1))
+        return (CRLF + " ").join(pieces) + CRLF
+
+    raw = line.encode('utf-8')
+    pieces = []
+    start, limit = 0, FOLD_OCTETS
+    while len(raw) - start > limit:
+        cut = start + limit
+        while raw[cut] & 0xC0 == 0x80:  # don't cut inside a multi-byte character
+            cut -= 1
+        pieces.append(raw[start:cut].decode('utf-8'))
+        start, limit = cut, FOLD_OCTETS - 1
+    pieces.append(raw[start:].decode('utf-8'))
+    return (CRLF + " ").join(pieces) + CRLF
+
+
+def _column(chunk, name, default):
+    if name in chunk:
+        return chunk[name].astype(str).to_numpy()
+    return [default] * len(chunk)
+
+
+def event_uid(exam_name, subject, chapter, occurrence):
     """
-    ics_content = [
-        "BEGIN:VCALENDAR",
-        "VERSION:2.0",
-        "PRODID:-//StrikeGoal//StudyPlanner//EN",
-        f"X-WR-CALNAME:StrikeGoal - {exam_name}",
-        "CALSCALE:GREGORIAN",
-        "METHOD:PUBLISH"
+    Stable UID for the nth (0-based) scheduled session of a chapter in an exam's plan.
+    """
+    identity = f"{exam_name}\0{subject}\0{chapter}\0{occurrence}"
+    return hashlib.sha1(identity.encode('utf-8')).hexdigest()[:24] + "@strikegoal.app"
+
+
+def _event(uid, dt_start, summary, description, dtstamp, sequence, status):
+    return [
+        "BEGIN:VEVENT" + CRLF,
+        f"DTSTAMP:{dtstamp}" + CRLF,
+        f"DTSTART;VALUE=DATE:{dt_start}" + CRLF,
+        fold_line(f"SUMMARY:{escape_text(summary)}"),
+        fold_line(f"DESCRIPTION:{escape_text(description)}") if description else "",
+        f"UID:{uid}" + CRLF,
+        f"SEQUENCE:{sequence}" + CRLF,
+        f"STATUS:{status}" + CRLF,
+        "END:VEVENT" + CRLF
     ]
-    
-    timestamp = datetime.now().strftime("%Y%m%dT%H%M%SZ")
-    
-    for _, row in plan_df.iterrows():
-        try:
-            # Parse Date
-            if isinstance(row['Date'], str):
-                date_str = row['Date']
-            else:
-                date_str = row['Date'].strftime('%Y-%m-%d')
-                
-            start_date = datetime.strptime(date_str, '%Y-%m-%d')
-            # All day event: Value=DATE
-            dt_start = start_date.strftime("%Y%m%d")
-            
-            # End date is exclusive in ICS for all-day events, so add 1 day
-            # But simpler: just use DTSTART;VALUE=DATE
-            
-            subject = row.get('Subject', 'Study')
-            chapter = row.get('Chapter', 'Topic')
-            focus = row.get('Focus', 'Study')
-            
-            title = f"{subject}: {chapter} ({focus})"
-            desc = f"Study Plan for {exam_name}\\nSubject: {subject}\\nTopic: {chapter}\\nFocus: {focus}"
-            
-            event = [
-                "BEGIN:VEVENT",
-                f"DTSTAMP:{timestamp}",
-                f"DTSTART;VALUE=DATE:{dt_start}",
-                f"SUMMARY:{title}",
-                f"DESCRIPTION:{desc}",
-                f"UID:{dt_start}-{subject.replace(' ', '')}-{chapter.replace(' ', '')}@strikegoal.app",
-                "STATUS:CONFIRMED",
-                "END:VEVENT"
-            ]
-            ics_content.extend(event)
-        except Exception as e:
-            print(f"Error creating event for row {row}: {e}")
+
+
+def _event_lines(chunk, exam_name, timestamp, occurrences, previous, manifest, changed_only):
+    # Rows whose date can't be read are skipped
+    dates = pd.to_datetime(chunk['Date'], format='%Y-%m-%d', errors='coerce') if 'Date' in chunk else pd.Series(pd.NaT, index=chunk.index)
+    day_labels = dates.dt.strftime("%Y%m%d").to_numpy()
+    valid = dates.notna().to_numpy()
+
+    subjects = _column(chunk, 'Subject', 'Study')
+    chapters = _column(chunk, 'Chapter', 'Topic')
+    focuses = _column(chunk, 'Focus', 'Study')
+
+    out = []
+    for ok, dt_start, subject, chapter, focus in zip(valid, day_labels, subjects, chapters, focuses):
+        if not ok:
             continue
+        occurrence = occurrences.get((subject, chapter), 0)
+        occurrences[(subject, chapter)] = occurrence + 1
+        uid = event_uid(exam_name, subject, chapter, occurrence)
+
+        title = f"{subject}: {chapter} ({focus})"
+        desc = f"Study Plan for {exam_name}\nSubject: {subject}\nTopic: {chapter}\nFocus: {focus}"
+        content = hashlib.sha1(f"{dt_start}\0{title}\0{desc}".encode('utf-8')).hexdigest()[:16]
+
+        # Unchanged events keep their SEQUENCE and DTSTAMP, so the feed text stays the same
+        before = previous.get(uid)
+        if before is None:
+            sequence, dtstamp, changed = 0, timestamp, True
+        elif before['hash'] == content and before['status'] == 'CONFIRMED':
+            sequence, dtstamp, changed = before['sequence'], before['dtstamp'], False
+        else:
+            sequence, dtstamp, changed = before['sequence'] + 1, timestamp, True
+
+        if manifest is not None:
+            manifest[uid] = {"hash": content, "sequence": sequence, "dtstamp": dtstamp,
+                             "dtstart": dt_start, "summary": title, "status": "CONFIRMED"}
+        if changed or not changed_only:
+            out.extend(_event(uid, dt_start, title, desc, dtstamp, sequence, "CONFIRMED"))
+    return out
+
+
+def _cancelled_lines(previous, manifest, timestamp, changed_only):
+    # Events from the previous feed that are no longer in the plan
+    out = []
+    for uid, before in previous.items():
+        if uid in manifest:
+            continue
+        if before['status'] == 'CANCELLED':
+            entry, changed = before, False
+        else:
+            entry = dict(before, sequence=before['sequence'] + 1, dtstamp=timestamp, status='CANCELLED')
+            changed = True
+        manifest[uid] = entry
+        if changed or not changed_only:
+            out.extend(_event(uid, entry['dtstart'], entry['summary'], None,
+                              entry['dtstamp'], entry['sequence'], 'CANCELLED'))
+    return out
+
+
+def iter_ics(plan_df, exam_name, chunk_rows=CHUNK_ROWS, previous=None, manifest=None, changed_only=False):
+    """
+    Yield the iCalendar text for a study plan as a series of string chunks.
+
+    previous     -- manifest of the last feed sent for this exam; unchanged events keep
+                    their SEQUENCE/DTSTAMP, changed ones get SEQUENCE + 1, and events that
+                    are gone are sent as CANCELLED
+    manifest     -- dict filled with {uid: event state} for this feed, to pass as
+                    `previous` next time
+    changed_only -- leave out events that are identical to the previous feed
+    """
+    previous = previous or {}
+    if manifest is None and previous:
+        manifest = {}
+
+    yield "".join([
+        "BEGIN:VCALENDAR" + CRLF,
+        "VERSION:2.0" + CRLF,
+        "PRODID:-//StrikeGoal//StudyPlanner//EN" + CRLF,
+        fold_line(f"X-WR-CALNAME:{escape_text(f'StrikeGoal - {exam_name}')}"),
+        "CALSCALE:GREGORIAN" + CRLF,
+        "METHOD:PUBLISH" + CRLF
+    ])
+
+    timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    occurrences = {}
+    for start in range(0, len(plan_df), chunk_rows):
+        chunk = plan_df.iloc[start:start + chunk_rows]
+        lines = _event_lines(chunk, exam_name, timestamp, occurrences, previous, manifest, changed_only)
+        if lines:
+            yield "".join(lines)
+
+    if previous:
+        lines = _cancelled_lines(previous, manifest, timestamp, changed_only)
+        if lines:
+            yield "".join(lines)
+
+    yield "END:VCALENDAR" + CRLF
+
+
+def write_ics(plan_df, exam_name, fp, **kwargs):
+    """
+    Stream the calendar into an open file (text or binary mode).
+    """
+    binary = not isinstance(fp, io.TextIOBase)
+    for chunk in iter_ics(plan_df, exam_name, **kwargs):
+        fp.write(chunk.encode('utf-8') if binary else chunk)
+
+
+def generate_ics(plan_df, exam_name, **kwargs):
+    """
+    Generate an iCalendar (.ics) string from the study plan DataFrame.
+    """
+    return "".join(iter_ics(plan_df, exam_name, **kwargs))
+
+
+def build_ics_feed(plan_df, exam_name, previous=None):
+    """
+    Full feed for a plan. Returns (ics_text, manifest, etag); the ETag only changes
+    when some event in the feed does.
+    """
+    manifest = {}
+    text = generate_ics(plan_df, exam_name, previous=previous, manifest=manifest)
+    return text, manifest, feed_etag(text)
+
 
-    ics_content.append("END:VCALENDAR")
-    return "\r\n".join(ics_content)
+def feed_etag(ics_text):
+    return '"' + hashlib.sha256(ics_text.encode('utf-8')).hexdigest()[:32] + '"'
@@ -0,0 +1,27 @@
+"""
+Deferred imports for the heavy Google and search SDKs, so importing the app (and
+rendering the login screen) doesn't pay for them until a feature actually needs one.
+"""
+import importlib
+
+
+class LazyModule:
+    """
+    Stand-in for a module that is imported on first attribute access.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
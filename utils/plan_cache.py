@@ -0,0 +1,127 @@
+"""
+Bounded LRU cache of generated study plans.
+
+Plans are keyed by the normalized planner inputs: exam, sorted subjects, the resolved
+exam date, today's date, daily study hours and a hash of the syllabus the agent planned
+from. Cached frames are built on read-only arrays and handed out as shallow copies, so
+callers can add or replace columns but any in-place edit raises instead of corrupting the
+shared entry. The whole cache is dropped when syllabus.json or exam_dates.json changes.
+"""
+from collections import OrderedDict
+import hashlib
+import json
+import threading
+import pandas as pd
+from .exam_index import load_exam_index
+from .syllabus_repo import get_syllabus_repository
+
+DEFAULT_MAXSIZE = 256
+
+
+def _syllabus_hash(agent):
+    repo = get_syllabus_repository()
+    if agent.syllabus is repo.get_exam(agent.exam_name):
+        return repo.content_hash
+    # Syllabus didn't come from the shared repository; hash what the agent has
+    blob = json.dumps(agent.syllabus, sort_keys=True, default=dict)
+    return hashlib.sha256(blob.encode('utf-8')).hexdigest()
+
+
+def plan_key(agent):
+    """
+    Cache key for the plan StudyPlannerAgent.generate_plan() would produce.
+    """
+    return (
+        agent.exam_name,
+        tuple(sorted(agent.subjects)),
+        agent.exam_date.strftime('%Y-%m-%d') if agent.exam_date else None,
+        agent.today.strftime('%Y-%m-%d'),
+        float(agent.daily_hours),
+        _syllabus_hash(agent)
+    )
+
+
+def freeze_plan(plan):
+    """
+    Copy of plan whose column arrays are read-only.
+    """
+    columns = {}
+    for name in plan.columns:
+        column = plan[name]
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            codes = column.cat.codes.to_numpy(copy=True)
+            codes.flags.writeable = False
+            values = pd.Categorical.from_codes(codes, dtype=column.dtype)
+        else:
+            values = column.to_numpy(copy=True)
+            values.flags.writeable = False
+        columns[name] = values
+    # copy=False keeps one array per column instead of consolidating into writable blocks
+    return pd.DataFrame(columns, index=plan.index, copy=False)
+
+
+class PlanCache:
+    def __init__(self, maxsize=DEFAULT_MAXSIZE):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (frozen plan, strategy_mode, required_daily_hours)
+        self._generation = None
+        self.hits = 0
+        self.misses = 0
+
+    def _current_generation(self):
+        # Syllabus and exam dates on disk; any change to either drops every entry
+        return (get_syllabus_repository().content_hash, load_exam_index().get('source_hash'))
+
+    def _check_generation(self):
+        generation = self._current_generation()
+        if generation != self._generation:
+            self._entries.clear()
+            self._generation = generation
+
+    def get_plan(self, agent):
+        """
+        agent.generate_plan(), served from the cache when the same inputs were planned before.
+        Errors are returned as-is and never cached.
+        """
+        key = plan_key(agent)
+        with self._lock:
+            self._check_generation()
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        if entry is None:
+            plan = agent.generate_plan()
+            if not isinstance(plan, pd.DataFrame):
+                return plan
+            entry = (freeze_plan(plan), agent.strategy_mode, agent.required_daily_hours)
+            with self._lock:
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+
+        # The agent ends up in the same state as after generate_plan()
+        plan, agent.strategy_mode, agent.required_daily_hours = entry
+        return plan.copy(deep=False)
+
+    def cache_info(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries), "maxsize": self.maxsize}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+_default_cache = PlanCache()
+
+
+def get_plan_cache():
+    return _default_cache
@@ -0,0 +1,34 @@
+"""
+Client-side rate limiting for the external APIs the app calls.
+"""
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Token bucket shared by every thread calling one API (or one user's quota of it).
+    """
+
+    def __init__(self, rate, burst=None, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.capacity = burst or rate
+        self.tokens = self.capacity
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self, n=1):
+        # Batches larger than the bucket are let through once it is full
+        n = min(n, self.capacity)
+        while True:
+            with self._lock:
+                now = self.clock()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= n:
+                    self.tokens -= n
+                    return
+                wait = (n - self.tokens) / self.rate
+            self.sleep(wait)
@@ -0,0 +1,171 @@
+"""
+Persistent cache for LLM responses.
+
+Responses are stored in SQLite keyed by SHA-256 of (model name, prompt), so students
+with the same profile share one Gemini call across sessions and restarts. Entries
+expire after a TTL, and the least recently used ones are evicted once the cache grows
+past max_entries. Identical requests that arrive while a call is in flight wait for that
+call instead of making their own.
+"""
+from concurrent.futures import Future
+from contextlib import closing
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_CACHE_PATH = os.getenv(
+    "AI_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), '.cache', 'ai_responses.sqlite3')
+)
+DEFAULT_TTL = 7 * 24 * 3600  # seconds
+DEFAULT_MAX_ENTRIES = 2000
+
+
+def response_key(model_name, prompt):
+    return hashlib.sha256(f"{model_name}\0{prompt}".encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES, clock=time.time):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._in_flight = {}  # key -> Future shared by every caller waiting on that key
+        self._ready = False
+
+    def _connect(self):
+        if not self._ready:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        if not self._ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, model TEXT, response TEXT, created REAL, accessed REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses(accessed)")
+            conn.commit()
+            self._ready = True
+        return conn
+
+    def get(self, key):
+        """
+        Cached response for key, or None if missing or expired.
+        """
+        now = self.clock()
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute("SELECT response, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            return row[0]
+
+    def set(self, key, response, model_name=None):
+        now = self.clock()
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, model_name, response, now, now)
+            )
+            conn.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+            # Least recently used entries beyond the size limit
+            conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                " SELECT key FROM responses ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+    def get_or_compute(self, model_name, prompt, compute):
+        """
+        Return the cached response for (model_name, prompt), calling compute() on a miss.
+        Concurrent callers with the same key share a single compute() call. Exceptions
+        from compute() reach every waiting caller and nothing is cached.
+        """
+        key = response_key(model_name, prompt)
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._in_flight[key] = future
+
+        if not leader:
+            return future.result()
+
+        try:
+            # Another process (or a call that just finished) may have filled it meanwhile
+            response = self.get(key)
+            if response is None:
+                response = compute()
+                self.set(key, response, model_name)
+            future.set_result(response)
+            return response
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def stream(self, model_name, prompt, produce):
+        """
+        Streaming form of get_or_compute: produce() returns an iterator of text chunks,
+        which are yielded as they arrive and cached as one response once complete.
+        Hits, and callers that joined an in-flight request, get the whole response as one chunk.
+        """
+        key = response_key(model_name, prompt)
+        cached = self.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._in_flight[key] = future
+
+        if not leader:
+            yield future.result()
+            return
+
+        try:
+            parts = []
+            for chunk in produce():
+                parts.append(chunk)
+                yield chunk
+            response = "".join(parts)
+            self.set(key, response, model_name)
+            future.set_result(response)
+        except GeneratorExit:
+            future.set_exception(RuntimeError("Streaming request was abandoned"))
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def clear(self):
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM responses")
+
+
+_default_cache = ResponseCache()
+
+
+def get_response_cache():
+    return _default_cache
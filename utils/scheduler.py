@@ -0,0 +1,180 @@
+"""
+Hours-aware scheduling engine for study plans.
+
+Chapters are packed into study days by their `time_required` hours against a daily
+study-hours budget: highest weightage first, then longest first (first-fit decreasing),
+so every chapter lands on the earliest day that still has room for it. Chapters longer
+than a day's budget, or that no longer fit anywhere whole, are split across days.
+
+Chapters of equal (priority, size) are placed as one group: partly-used days, kept as
+runs of consecutive days with the same free slots, are filled in day order, then whole
+runs of untouched days are assigned arithmetically. This gives exactly the same
+placement as placing chapters one by one, but the Python-level work grows with the
+number of distinct chapter sizes rather than the number of chapters or days.
+"""
+import math
+import numpy as np
+
+DEFAULT_DAILY_HOURS = 4
+DEFAULT_CHAPTER_HOURS = 1
+SLOTS_PER_HOUR = 2  # capacity is tracked in half-hour slots
+
+
+def to_slots(hours):
+    try:
+        hours = float(hours)
+    except (TypeError, ValueError):
+        hours = DEFAULT_CHAPTER_HOURS
+    if not hours > 0:
+        hours = DEFAULT_CHAPTER_HOURS
+    return max(1, int(math.ceil(hours * SLOTS_PER_HOUR)))
+
+
+def _slots_array(hours):
+    try:
+        values = np.asarray(hours, dtype=float)
+    except (TypeError, ValueError):
+        return np.array([to_slots(h) for h in hours], dtype=np.int64)
+    values = np.where(values > 0, values, DEFAULT_CHAPTER_HOURS)  # also replaces NaN
+    return np.maximum(1, np.ceil(values * SLOTS_PER_HOUR)).astype(np.int64)
+
+
+def _stable_argsort(keys):
+    # NumPy radix-sorts 16-bit integers for kind='stable', far faster than the
+    # comparison sort wider keys get
+    keys = np.asarray(keys, dtype=np.int64)
+    if len(keys) and keys.min() >= np.iinfo(np.int16).min and keys.max() <= np.iinfo(np.int16).max:
+        keys = keys.astype(np.int16)
+    return np.argsort(keys, kind='stable')
+
+
+def _placement_order(need, priorities):
+    """
+    Chapter indices by descending priority, then descending size, ties in input order.
+    """
+    if priorities.dtype.kind in 'iub':
+        # Both keys are small integers: rank them into one key and sort once
+        low = int(priorities.min())
+        return _stable_argsort(-((priorities.astype(np.int64) - low) * (int(need.max()) + 1) + need))
+    return np.lexsort((-need, -priorities))
+
+
+def pack_chapters(hours, priorities, days, daily_hours=DEFAULT_DAILY_HOURS):
+    """
+    Pack chapters into `days` study days.
+
+    hours       -- hours needed per chapter
+    priorities  -- priority score per chapter (higher is scheduled earlier)
+    days        -- number of study days available (>= 1)
+    daily_hours -- study budget per day; raised automatically when the syllabus
+                   cannot fit in the horizon at that budget
+
+    Returns (day_offsets, chapter_indices, part_hours, effective_daily_hours). The first
+    three are parallel NumPy arrays with one entry per scheduled piece, ordered by day and
+    then by priority; a chapter that was split appears once per day it spans.
+    """
+    if len(hours) == 0 or days <= 0:
+        empty = np.array([], dtype=np.int64)
+        return empty, empty, np.array([], dtype=float), daily_hours
+
+    need = _slots_array(hours)
+    priorities = np.asarray(priorities)
+    capacity = to_slots(daily_hours)
+    total = int(need.sum())
+    if total > capacity * days:
+        # Crunch: every chapter must still be covered before the exam
+        capacity = -(-total // days)
+
+    # Highest priority first, then largest first
+    order = _placement_order(need, priorities)
+    sorted_need = need[order]
+    sorted_prio = priorities[order]
+    breaks = np.flatnonzero((np.diff(sorted_need) != 0) | (np.diff(sorted_prio) != 0)) + 1
+    bounds = [0] + breaks.tolist() + [len(order)]
+
+    # Placements are recorded as runs (first day, chapters per day, count, first position
+    # in `order`, slots each) and expanded with NumPy once at the end. Started days with
+    # room left are kept as segments [first day, number of days, free slots each] in day
+    # order; a run of untouched days leaves at most two segments behind, so the loop
+    # below does Python work per group of chapters, not per chapter or per day.
+    runs = []
+    segments = []
+    next_empty = 0
+
+    for lo, hi, size in zip(bounds[:-1], bounds[1:], sorted_need[bounds[:-1]].tolist()):
+        k = hi - lo
+        i = 0
+
+        if size < capacity:
+            # 1. Earliest partly-used days that still take whole chapters
+            s = 0
+            while s < len(segments) and i < k:
+                first, count, free = segments[s]
+                per_day = free // size
+                if not per_day:
+                    s += 1
+                    continue
+                take = min(k - i, count * per_day)
+                runs.append((first, per_day, take, lo + i, size))
+                i += take
+                full, extra = divmod(take, per_day)
+                pieces = []
+                if full:
+                    pieces.append([first, full, free - per_day * size])
+                if extra:
+                    pieces.append([first + full, 1, free - extra * size])
+                if full + (extra > 0) < count:
+                    pieces.append([first + full + (extra > 0), count - full - (extra > 0), free])
+                pieces = [piece for piece in pieces if piece[2]]
+                segments[s:s + 1] = pieces
+                s += len(pieces)
+
+            # 2. Runs of untouched days, `per_day` chapters each
+            if i < k and next_empty < days:
+                per_day = capacity // size
+                take = min(k - i, (days - next_empty) * per_day)
+                used = -(-take // per_day)
+                runs.append((next_empty, per_day, take, lo + i, size))
+                leftover = capacity - per_day * size
+                if leftover and used > 1:
+                    segments.append([next_empty, used - 1, leftover])
+                last_free = capacity - (take - (used - 1) * per_day) * size
+                if last_free:
+                    segments.append([next_empty + used - 1, 1, last_free])
+                next_empty += used
+                i += take
+
+        # 3. Chapters that cannot go anywhere whole: a day's worth at a time into
+        #    untouched days, and the rest into the remaining gaps in day order.
+        for position in range(lo + i, hi):
+            remaining = size
+            while remaining:
+                if remaining >= capacity and next_empty < days:
+                    runs.append((next_empty, 1, 1, position, capacity))
+                    next_empty += 1
+                    remaining -= capacity
+                    continue
+                s = next((s for s, segment in enumerate(segments) if segment[2] >= remaining), None)
+                if s is None and next_empty < days:
+                    segments.append([next_empty, 1, capacity])
+                    next_empty += 1
+                    s = len(segments) - 1
+                elif s is None:
+                    s = 0  # nothing has room for the rest: fill the earliest gaps in turn
+                first, count, free = segments[s]
+                piece = min(remaining, free)
+                rest = [[first, 1, free - piece]] if free > piece else []
+                if count > 1:
+                    rest.append([first + 1, count - 1, free])
+                segments[s:s + 1] = rest
+                runs.append((first, 1, 1, position, piece))
+                remaining -= piece
+
+    first, per_day, takes, positions, slots = (np.array(column, dtype=np.int64) for column in zip(*runs))
+    starts = np.cumsum(takes) - takes
+    step = np.arange(int(takes.sum())) - np.repeat(starts, takes)
+    day_offsets = np.repeat(first, takes) + step // np.repeat(per_day, takes)
+    rank = _stable_argsort(day_offsets)
+    chapter_indices = order[np.repeat(positions, takes) + step][rank].astype(np.int64)
+    part_hours = np.repeat(slots, takes)[rank] / SLOTS_PER_HOUR
+    return day_offsets[rank], chapter_indices, part_hours, capacity / SLOTS_PER_HOUR
@@ -0,0 +1,125 @@
+"""
+Persistent cache for the exam scout.
+
+Two layers in one SQLite file: the normalized DuckDuckGo results per search query, and
+the JSON Gemini extracted from a given set of results. Extractions are keyed by a hash
+of the results they were made from (with the exam's date on file and the prompt version),
+so when a night's search returns the same snippets as before the LLM call is skipped.
+Each layer has its own TTL; rows that can't be read are treated as missing.
+"""
+from contextlib import closing
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+DEFAULT_SCOUT_CACHE_PATH = os.getenv(
+    "SCOUT_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), '.cache', 'scout.sqlite3')
+)
+DEFAULT_SEARCH_TTL = 12 * 3600           # seconds; searches older than this are run again
+DEFAULT_EXTRACTION_TTL = 14 * 24 * 3600  # seconds; unchanged snippets reuse the extraction this long
+
+
+def normalize_results(results):
+    """
+    Search results as [{"title", "body", "href"}] with whitespace collapsed, in a stable
+    order, so identical sources hash the same however the search engine ordered them.
+    """
+    normalized = [
+        {field: " ".join(str(r.get(field) or '').split()) for field in ('title', 'body', 'href')}
+        for r in results or []
+    ]
+    return sorted(normalized, key=lambda r: (r['href'], r['title'], r['body']))
+
+
+def results_hash(results):
+    return hashlib.sha256(json.dumps(results, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def extraction_key(exam_name, current_date, snippet_hash, prompt_version=''):
+    blob = f"{prompt_version}\0{exam_name}\0{current_date}\0{snippet_hash}"
+    return hashlib.sha256(blob.encode('utf-8')).hexdigest()
+
+
+def _load(text, kind):
+    # Rows written by an older version or damaged on disk are a miss, not an error
+    try:
+        value = json.loads(text)
+    except (TypeError, ValueError):
+        return None
+    return value if isinstance(value, kind) else None
+
+
+class ScoutCache:
+    def __init__(self, path=DEFAULT_SCOUT_CACHE_PATH, search_ttl=DEFAULT_SEARCH_TTL,
+                 extraction_ttl=DEFAULT_EXTRACTION_TTL, clock=time.time):
+        self.path = path
+        self.search_ttl = search_ttl
+        self.extraction_ttl = extraction_ttl
+        self.clock = clock
+        self._ready = False
+
+    def _connect(self):
+        if not self._ready:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        if not self._ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS searches ("
+                " query TEXT PRIMARY KEY, results TEXT, fetched REAL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS extractions ("
+                " key TEXT PRIMARY KEY, exam TEXT, snippet_hash TEXT, data TEXT, created REAL)"
+            )
+            conn.commit()
+            self._ready = True
+        return conn
+
+    def get_search(self, query):
+        """
+        Cached normalized results for query, or None if missing or older than search_ttl.
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT results, fetched FROM searches WHERE query = ?", (query,)).fetchone()
+        if row is None or row[1] is None or self.clock() - row[1] > self.search_ttl:
+            return None
+        return _load(row[0], list)
+
+    def set_search(self, query, results):
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO searches (query, results, fetched) VALUES (?, ?, ?)",
+                (query, json.dumps(results, ensure_ascii=False), self.clock())
+            )
+
+    def get_extraction(self, key):
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT data, created FROM extractions WHERE key = ?", (key,)).fetchone()
+        if row is None or row[1] is None or self.clock() - row[1] > self.extraction_ttl:
+            return None
+        return _load(row[0], dict)
+
+    def set_extraction(self, key, data, exam_name=None, snippet_hash=None):
+        now = self.clock()
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO extractions (key, exam, snippet_hash, data, created) VALUES (?, ?, ?, ?, ?)",
+                (key, exam_name, snippet_hash, json.dumps(data, ensure_ascii=False), now)
+            )
+            conn.execute("DELETE FROM extractions WHERE created < ?", (now - self.extraction_ttl,))
+
+    def clear(self):
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM searches")
+            conn.execute("DELETE FROM extractions")
+
+
+_default_cache = ScoutCache()
+
+
+def get_scout_cache():
+    return _default_cache
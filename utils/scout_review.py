@@ -0,0 +1,118 @@
+"""
+Review queue for exam dates the scout finds.
+
+Nothing the scout extracts is written to exam_dates.json on its own: findings are queued
+here (in the scout's SQLite file) and only saved once someone approves them in Settings.
+A finding is one (exam, new date) pair; seeing it again from another source adds that
+source instead of a second entry, so reviewers can see how many sources agree. Dismissed
+findings stay dismissed when later scans report them again.
+"""
+from contextlib import closing
+import json
+import os
+import sqlite3
+import time
+from .scout_cache import DEFAULT_SCOUT_CACHE_PATH
+
+
+class ScoutReviewQueue:
+    def __init__(self, path=DEFAULT_SCOUT_CACHE_PATH, clock=time.time):
+        self.path = path
+        self.clock = clock
+        self._ready = False
+
+    def _connect(self):
+        if not self._ready:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        if not self._ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS scout_findings ("
+                " exam TEXT, new_date TEXT, old_date TEXT, status TEXT, sources TEXT,"
+                " first_seen REAL, last_seen REAL, decision TEXT, PRIMARY KEY (exam, new_date))"
+            )
+            conn.commit()
+            self._ready = True
+        return conn
+
+    def add(self, exam_name, new_date, old_date=None, source=None, status=None):
+        """
+        Queue a finding for review. Returns False if it was already dismissed.
+        """
+        now = self.clock()
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute(
+                "SELECT sources, decision FROM scout_findings WHERE exam = ? AND new_date = ?", (exam_name, new_date)
+            ).fetchone()
+            if row is not None and row[1] == 'dismissed':
+                return False
+            sources = json.loads(row[0]) if row else []
+            if source and source not in sources:
+                sources.append(source)
+            conn.execute(
+                "INSERT OR REPLACE INTO scout_findings"
+                " (exam, new_date, old_date, status, sources, first_seen, last_seen, decision)"
+                " VALUES (?, ?, ?, ?, ?, COALESCE((SELECT first_seen FROM scout_findings"
+                " WHERE exam = ? AND new_date = ?), ?), ?, NULL)",
+                (exam_name, new_date, old_date, status, json.dumps(sources), exam_name, new_date, now, now)
+            )
+            return True
+
+    def add_scan_result(self, exam, result):
+        """
+        Queue what a scout scan of exam (an exam_dates.json entry) found, if it is an
+        official date that differs from the one on file. Every scan, from Settings or the
+        nightly scout, goes through here. Returns True if a finding was queued.
+        """
+        if not isinstance(result, dict) or not result.get('found') or result.get('status') != 'Official':
+            return False
+        new_date = result.get('exam_date')
+        if not new_date or new_date == exam.get('exam_date'):
+            return False
+        return self.add(exam['exam_name'], new_date, exam.get('exam_date'), result.get('source_link'),
+                        result.get('status'))
+
+    def pending(self):
+        """
+        Findings waiting for a decision, oldest first, as the rows update_exam_database
+        takes ("Exam", "New Date", "Source") plus "Old Date", "Status" and "Sources".
+        """
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT exam, new_date, old_date, status, sources FROM scout_findings"
+                " WHERE decision IS NULL ORDER BY first_seen, exam"
+            ).fetchall()
+        findings = []
+        for exam, new_date, old_date, status, sources in rows:
+            sources = json.loads(sources)
+            findings.append({"Exam": exam, "Old Date": old_date, "New Date": new_date,
+                             "Source": sources[0] if sources else None, "Status": status,
+                             "Sources": len(sources)})
+        return findings
+
+    def resolve(self, findings, decision):
+        """
+        Record a decision ('approved' or 'dismissed') for findings from pending().
+        Approved findings are dropped; the date on file now matches them.
+        """
+        keys = [(finding['Exam'], finding['New Date']) for finding in findings]
+        with closing(self._connect()) as conn, conn:
+            if decision == 'approved':
+                conn.executemany("DELETE FROM scout_findings WHERE exam = ? AND new_date = ?", keys)
+            else:
+                conn.executemany(
+                    "UPDATE scout_findings SET decision = ? WHERE exam = ? AND new_date = ?",
+                    [(decision, exam, new_date) for exam, new_date in keys]
+                )
+
+    def clear(self):
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM scout_findings")
+
+
+_default_queue = ScoutReviewQueue()
+
+
+def get_scout_review_queue():
+    return _default_queue
@@ -0,0 +1,165 @@
+"""
+Priority-driven scheduling for the exam scout.
+
+Every exam has a next-due scan time, and a run scans the most overdue exams first, up to
+a budget. How often an exam is rescanned depends on how close its next milestone is (an
+exam day, or the registration window opening or closing): daily in the last fortnight,
+weekly when it is months out, and rarely for tentative dates far in the future. The
+schedule lives in the scout's SQLite file, so nightly runs and a long-running worker
+share it.
+"""
+from contextlib import closing
+import datetime
+import heapq
+import os
+import sqlite3
+import time
+from .exam_index import DEFAULT_EXAM_DATES_PATH, load_exam_index
+from .scout_cache import DEFAULT_SCOUT_CACHE_PATH
+
+DAY = 24 * 3600
+# (next milestone at most this many days away, rescan every this many days), nearest first
+SCAN_TIERS = [(14, 1), (60, 2), (180, 7)]
+FAR_INTERVAL_DAYS = 14
+TENTATIVE_FAR_INTERVAL_DAYS = 30
+UNKNOWN_DATE_INTERVAL_DAYS = 3  # nothing usable on file yet; look for it fairly often
+PAST_INTERVAL_DAYS = 14         # every date has passed; watch for the next cycle's notice
+RETRY_INTERVAL = 6 * 3600       # seconds; failed scans are retried sooner than scheduled
+DEFAULT_BUDGET = 15             # exams per run
+
+
+def _exam_days(entry):
+    # Month-only dates ("February 2026") have no concrete days; their first day stands in
+    return list(entry.get('dates') or []) or [day for day in [entry.get('first_date')] if day]
+
+def next_milestone(entry, today):
+    """
+    Earliest exam day or registration date on or after today, from an exam index entry.
+    """
+    registration = entry.get('registration') or {}
+    candidates = _exam_days(entry) + [registration.get('start'), registration.get('end')]
+    upcoming = [
+        datetime.date.fromisoformat(value) for value in candidates
+        if value and datetime.date.fromisoformat(value) >= today
+    ]
+    return min(upcoming) if upcoming else None
+
+
+def scan_interval(entry, today):
+    """
+    Seconds until an exam should be scanned again.
+    """
+    if not _exam_days(entry):
+        return UNKNOWN_DATE_INTERVAL_DAYS * DAY
+    milestone = next_milestone(entry, today)
+    if milestone is None:
+        return PAST_INTERVAL_DAYS * DAY
+
+    days_left = (milestone - today).days
+    for max_days, interval_days in SCAN_TIERS:
+        if days_left <= max_days:
+            return interval_days * DAY
+    return (TENTATIVE_FAR_INTERVAL_DAYS if entry.get('tentative') else FAR_INTERVAL_DAYS) * DAY
+
+
+class ScoutScheduler:
+    def __init__(self, agent, path=DEFAULT_SCOUT_CACHE_PATH, exam_dates_path=DEFAULT_EXAM_DATES_PATH,
+                 clock=time.time, sleep=time.sleep):
+        self.agent = agent
+        self.path = path
+        self.exam_dates_path = exam_dates_path
+        self.clock = clock
+        self.sleep = sleep
+        self._ready = False
+
+    def _connect(self):
+        if not self._ready:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        if not self._ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS scout_schedule ("
+                " exam TEXT PRIMARY KEY, next_due REAL, last_scanned REAL, last_status TEXT)"
+            )
+            conn.commit()
+            self._ready = True
+        return conn
+
+    def _today(self):
+        return datetime.date.fromtimestamp(self.clock())
+
+    def queue(self):
+        """
+        Heap of (next due time, rescan interval, exam name) for every exam on file.
+        Exams never scanned are due now; among equally due exams, the more urgent
+        (shorter interval) come first.
+        """
+        exams = load_exam_index(self.exam_dates_path)['exams']
+        with closing(self._connect()) as conn:
+            next_due = dict(conn.execute("SELECT exam, next_due FROM scout_schedule").fetchall())
+        today = self._today()
+        heap = [(next_due.get(name, 0.0), scan_interval(entry, today), name) for name, entry in exams.items()]
+        heapq.heapify(heap)
+        return heap
+
+    def due(self, budget=DEFAULT_BUDGET):
+        """
+        Names of up to budget exams whose scan is due, most overdue first.
+        """
+        now = self.clock()
+        heap = self.queue()
+        names = []
+        while heap and len(names) < budget and heap[0][0] <= now:
+            names.append(heapq.heappop(heap)[2])
+        return names
+
+    def next_due_in(self):
+        """
+        Seconds until the next scan is due (0 if one is due now), or None with no exams.
+        """
+        heap = self.queue()
+        return max(0.0, heap[0][0] - self.clock()) if heap else None
+
+    def record(self, exam_name, result):
+        """
+        Schedule an exam's next scan after a scan that returned result.
+        """
+        now = self.clock()
+        entry = load_exam_index(self.exam_dates_path)['exams'].get(exam_name, {})
+        interval = scan_interval(entry, self._today())
+        failed = not isinstance(result, dict) or 'error' in result
+        if failed:
+            interval = min(interval, RETRY_INTERVAL)
+        status = 'error' if failed else ('found' if result.get('found') else result.get('status', 'not_found'))
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO scout_schedule (exam, next_due, last_scanned, last_status) VALUES (?, ?, ?, ?)",
+                (exam_name, now + interval, now, status)
+            )
+
+    def run_once(self, budget=DEFAULT_BUDGET, batched=True):
+        """
+        Scan the exams that are due (at most budget) and reschedule them.
+        Returns [(exam, result)] in completion order; exam is {"exam_name", "exam_date"}.
+        """
+        exams = load_exam_index(self.exam_dates_path)['exams']
+        targets = [{"exam_name": name, "exam_date": exams[name].get('exam_date')} for name in self.due(budget)]
+        results = []
+        for exam, result in self.agent.scan_all(targets, batched=batched):
+            self.record(exam['exam_name'], result)
+            results.append((exam, result))
+        return results
+
+    def run_forever(self, budget=DEFAULT_BUDGET, on_results=None, min_sleep=60, max_sleep=3600, stop=None):
+        """
+        Worker loop: scan whatever is due, then sleep until the next exam is due.
+        on_results(results) is called after every run that scanned something; stop() ends
+        the loop when it returns True.
+        """
+        while not (stop and stop()):
+            results = self.run_once(budget)
+            if results and on_results:
+                on_results(results)
+            wait = self.next_due_in()
+            self.sleep(min(max_sleep, max(min_sleep, wait if wait is not None else max_sleep)))
@@ -0,0 +1,38 @@
+"""
+Run a slow iterator (e.g. a streamed LLM response) on a background thread, so its
+network wait overlaps with whatever the caller renders before consuming it.
+"""
+import queue
+import threading
+
+_DONE = object()
+
+
+def background_iter(iterable):
+    """
+    Start consuming iterable on a daemon thread right away and return a generator
+    that yields its items in order. Exceptions are re-raised in the consumer.
+    """
+    items = queue.Queue()
+
+    def pump():
+        try:
+            for item in iterable:
+                items.put((item, None))
+        except Exception as e:
+            items.put((_DONE, e))
+        else:
+            items.put((_DONE, None))
+
+    threading.Thread(target=pump, daemon=True).start()
+
+    def consume():
+        while True:
+            item, error = items.get()
+            if item is _DONE:
+                if error is not None:
+                    raise error
+                return
+            yield item
+
+    return consume()
@@ -1,16 +1,55 @@
-import json
+import calendar
+from functools import lru_cache
 import pandas as pd
 from datetime import datetime, timedelta
 import os
-import re
 from dateutil import parser as date_parser
-import google.generativeai as genai
+from .syllabus_repo import get_exam_syllabus, get_syllabus_repository, build_chapter_table, WEIGHT_MAP
+from .date_parser import parse_exam_dates
+from .scheduler import pack_chapters, DEFAULT_DAILY_HOURS, DEFAULT_CHAPTER_HOURS
+from .lazy import LazyModule
+from .response_cache import get_response_cache
+
+# Only imported when an AI strategy is first requested
+genai = LazyModule('google.generativeai')
+
+WEEKDAY_NAMES = list(calendar.day_name)
+
+
+@lru_cache(maxsize=64)
+def _calendar_columns(start, days):
+    """
+    'YYYY-MM-DD' labels and weekday codes (Monday=0) for `days` days from `start`.
+    Shared by every plan generated for the same day and horizon.
+    """
+    dates = pd.date_range(start, periods=days, freq='D')
+    return dates.strftime("%Y-%m-%d").to_numpy(), dates.dayofweek.to_numpy()
+
+
+PLAN_ROW_KEY = ['Date', 'Subject', 'Chapter', 'Hours']
+
+
+def plan_changes(old_plan, new_plan):
+    """
+    Rows of new_plan that aren't in old_plan as-is (same date, chapter and hours).
+    After a replan this is the changed tail that Tasks sync and ICS export need to push.
+    """
+    if old_plan is None or old_plan.empty:
+        return new_plan
+    key = [c for c in PLAN_ROW_KEY if c in old_plan.columns and c in new_plan.columns]
+    old_keys = pd.MultiIndex.from_frame(old_plan[key].astype(str))
+    new_keys = pd.MultiIndex.from_frame(new_plan[key].astype(str))
+    return new_plan[~new_keys.isin(old_keys)].reset_index(drop=True)
+
 
 class StudyPlannerAgent:
-    def __init__(self, exam_name, exam_date, subjects=None, target_year=None):
+    def __init__(self, exam_name, exam_date, subjects=None, target_year=None, daily_hours=DEFAULT_DAILY_HOURS):
         self.exam_name = exam_name
         self.raw_date_str = exam_date
         self.subjects = subjects or []
+        self.daily_hours = daily_hours
+        # Daily load the plan actually needs; above daily_hours when the syllabus doesn't fit
+        self.required_daily_hours = daily_hours
         self.today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
         
         # Parse and Project Date
@@ -37,55 +76,12 @@ class StudyPlannerAgent:
         if not date_str or "Not in source" in date_str:
             return None
 
-        # 1. Try simple strict parse first
-        try:
-            return datetime.strptime(date_str, '%Y-%m-%d')
-        except ValueError:
-            pass
-            
-        # 2. Pattern 1: Day ... Month Year (e.g., "21-30 January 2026", "21 Jan 2026")
-        match = re.search(r'(\d{1,2})(?:[-–\s]+\d{1,2})?\s+([A-Za-z]+)\s+(\d{4})', date_str)
-        if match:
-            d, m, y = match.groups()
-            try:
-                # Try full month name
-                return datetime.strptime(f"{d} {m} {y}", "%d %B %Y")
-            except ValueError:
-                try:
-                    # Try abbreviated month name
-                    return datetime.strptime(f"{d} {m} {y}", "%d %b %Y")
-                except ValueError:
-                    pass
-
-        # 3. Pattern 2: Month ... Year (e.g., "May 2026")
-        match = re.search(r'([A-Za-z]+).*?(\d{4})', date_str)
-        if match:
-            m, y = match.groups()
-            try:
-                # Default to 1st of the month
-                return datetime.strptime(f"1 {m} {y}", "%d %B %Y")
-            except ValueError:
-                try:
-                    return datetime.strptime(f"1 {m} {y}", "%d %b %Y")
-                except ValueError:
-                    pass
-        
-        return None
+        return parse_exam_dates(date_str).first_date()
 
     def _load_syllabus(self):
         try:
-            # Assuming syllabus.json is in the data folder relative to project root
-            base_path = os.path.dirname(os.path.dirname(__file__))
-            data_path = os.path.join(base_path, 'data', 'syllabus.json')
-            
-            if not os.path.exists(data_path):
-                # Fallback: empty syllabus or maybe load a default one
-                return {}
-                
-            with open(data_path, 'r') as f:
-                data = json.load(f)
-            
-            return data.get(self.exam_name, {})
+            # Served from the shared in-memory copy of data/syllabus.json
+            return get_exam_syllabus(self.exam_name)
         except Exception as e:
             print(f"Error loading syllabus: {e}")
             return {}
@@ -101,106 +97,119 @@ class StudyPlannerAgent:
         if days_remaining <= 0:
             return {"error": "Exam date has already passed!"}
 
-        # Flatten all chapters into a single list
-        all_chapters = []
-        
         # Determine Strategy
         if days_remaining > 180:
             self.strategy_mode = "Long Term (Detailed)"
-            allowed_weightages = ['High', 'Medium', 'Low']
         else:
+            # In crunch mode we still cover everything the user asked for; weightage
+            # ordering pushes low priority chapters to the end.
             self.strategy_mode = "Short Term (Crunch)"
-            # valid_weightages logic: In crunch mode, we prioritize High, but we MUST cover everything 
-            # if the user asked for it. 
-            # For now, let's include EVERYTHING but sort by weightage so low priority stuff 
-            # gets pushed to the end or doubled up.
-            allowed_weightages = ['High', 'Medium', 'Low'] 
-            
-        for subject, chapters in self.syllabus.items():
-            if self.subjects and subject not in self.subjects:
-                continue
-                
-            for chapter in chapters:
-                weightage = chapter.get('weightage', 'Low')
-                
-                # Add metadata
-                chapter_data = chapter.copy()
-                chapter_data['subject'] = subject
-                
-                # Weightage score for sorting
-                weight_map = {'High': 3, 'Medium': 2, 'Low': 1}
-                w_score = weight_map.get(weightage, 1)
-                
-                chapter_data['priority_score'] = w_score
-                all_chapters.append(chapter_data)
-        
-        # Sort by priority (descending) so high weightage comes first
-        all_chapters.sort(key=lambda x: x['priority_score'], reverse=True)
+
+        chapters = self._chapter_table()
+        if self.subjects:
+            chapters = chapters[chapters['Subject'].isin(self.subjects)]
         
-        if not all_chapters:
+        if chapters.empty:
              return {"error": "No chapters found for the selected subjects."}
 
-        schedule = []
-        current_date = self.today
-        
-        # Scheduling Logic: "Crunch Mode"
-        # We must fit `len(all_chapters)` into `days_remaining`.
-        # Ensure at least 1 chapter per day.
-        
-        # Calculate chapters needed per day (ceil)
-        import math
-        chapters_per_day = math.ceil(len(all_chapters) / days_remaining)
-        
-        chapter_idx = 0
-        while chapter_idx < len(all_chapters):
-            # If we passed exam date, we must double up on the last day or just keep adding to the list 
-            # (which implies >1 chapter/day effectively, but let's try to keep dates valid)
-            
-            if current_date >= self.exam_date:
-                # Fallback: Schedule everything remaining on the last possible study day (yesterday)
-                # or just cap it. Let's stack them on the last day - 1
-                current_date = self.exam_date - timedelta(days=1)
-                if current_date < self.today:
-                    current_date = self.today # Should not happen if days_remaining > 0
-
-            # Schedule N chapters for this day
-            for _ in range(chapters_per_day):
-                if chapter_idx >= len(all_chapters):
-                    break
-                    
-                daily_task = all_chapters[chapter_idx]
-                schedule.append({
-                    "Date": current_date.strftime("%Y-%m-%d"),
-                    "Day": current_date.strftime("%A"),
-                    "Subject": daily_task['subject'],
-                    "Chapter": daily_task['name'],
-                    "Weightage": daily_task.get('weightage', 'Low'),
-                    "Focus": "Deep Study" if daily_task.get('weightage') == 'High' else "Review"
-                })
-                chapter_idx += 1
-            
-            # Move to next day
-            current_date += timedelta(days=1)
+        return self._schedule(chapters, days_remaining)
 
-        return pd.DataFrame(schedule)
+    def _schedule(self, chapters, days_remaining):
+        """
+        Lay a chapter table out over `days_remaining` days starting today.
+        """
+        # Scheduling Logic: pack chapters into days by their time_required hours,
+        # highest weightage first, against the student's daily study hours.
+        # If the syllabus doesn't fit, the daily load is raised so everything is covered.
+        day_offsets, chapter_indices, part_hours, self.required_daily_hours = pack_chapters(
+            chapters['Hours'].to_numpy(),
+            chapters['Priority'].to_numpy(),
+            days_remaining,
+            self.daily_hours
+        )
 
-    def generate_ai_strategy(self, api_key, plan_df):
+        # Assemble the plan column by column: dates are formatted once per calendar day
+        # and gathered by day offset; chapter columns are gathered by chapter index.
+        date_labels, weekdays = _calendar_columns(self.today, days_remaining)
+        return pd.DataFrame({
+            "Date": date_labels[day_offsets],
+            "Day": pd.Categorical.from_codes(weekdays[day_offsets], categories=WEEKDAY_NAMES),
+            "Subject": chapters['Subject'].array.take(chapter_indices),
+            "Chapter": chapters['Chapter'].to_numpy()[chapter_indices],
+            "Weightage": chapters['Weightage'].array.take(chapter_indices),
+            "Focus": chapters['Focus'].array.take(chapter_indices),
+            "Hours": part_hours
+        })
+
+    def replan(self, existing_plan, completed=(), skipped=()):
         """
-        Generate a personalized strategy using Google Gemini.
+        Recompute the remaining part of an existing plan from today onward.
+
+        completed -- (Subject, Chapter) pairs the student has finished; dropped from the plan
+        skipped   -- (Subject, Chapter) pairs from past days the student didn't get to;
+                     moved off those days and put back into the pool with all their
+                     scheduled hours
+
+        Rows dated before today are kept as they are, except skipped ones. Everything
+        else still to do is packed again from today with the same rules as generate_plan,
+        so a skipped chapter appears once, in the rescheduled part.
         """
-        try:
-            genai.configure(api_key=api_key)
-            # Use a more available model or make it configurable
-            # gemini-1.5-flash is often the new standard for fast tasks
-            model_name = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
-            model = genai.GenerativeModel(model_name)
-            
-            # Construct Prompt
-            days = plan_df['Date'].nunique() if not plan_df.empty else 0
-            topics = len(plan_df)
-            focus_subjects = ", ".join(self.subjects) if self.subjects else "All Subjects"
-            
-            prompt = f"""
+        if not self.exam_date:
+            return {"error": f"Could not determine a valid exam date from: '{self.raw_date_str}'"}
+
+        days_remaining = (self.exam_date - self.today).days
+        if days_remaining <= 0:
+            return {"error": "Exam date has already passed!"}
+
+        plan = existing_plan.reset_index(drop=True)
+        if plan.empty:
+            return self.generate_plan()
+
+        keys = pd.MultiIndex.from_arrays([plan['Subject'].astype(str), plan['Chapter'].astype(str)])
+        is_past = pd.to_datetime(plan['Date']).to_numpy() < pd.Timestamp(self.today).to_datetime64()
+        done = keys.isin(list(completed))
+        missed = keys.isin(list(skipped))
+
+        past = plan[is_past & ~missed]
+        pending = plan[(~is_past | missed) & ~done]
+        if pending.empty:
+            return past.reset_index(drop=True)
+
+        # One pool entry per chapter, with the hours of all its pending pieces
+        hours = pending['Hours'] if 'Hours' in pending else DEFAULT_CHAPTER_HOURS
+        pool = pending.assign(
+            Subject=pending['Subject'].astype(str),
+            Weightage=pending['Weightage'].astype(str),
+            Focus=pending['Focus'].astype(str),
+            Hours=hours
+        ).groupby(['Subject', 'Chapter'], sort=False).agg(
+            Weightage=('Weightage', 'first'),
+            Focus=('Focus', 'first'),
+            Hours=('Hours', 'sum')
+        ).reset_index()
+        pool['Priority'] = pool['Weightage'].map(WEIGHT_MAP).fillna(1).astype(int)
+
+        suffix = self._schedule(pool, days_remaining)
+        result = pd.concat([past, suffix], ignore_index=True)
+        for column in ('Subject', 'Weightage', 'Focus'):
+            result[column] = result[column].astype('category')
+        return result
+
+    def _chapter_table(self):
+        """
+        One row per chapter with Subject/Chapter/Weightage/Focus/Hours/Priority columns.
+        """
+        repo = get_syllabus_repository()
+        if self.syllabus is repo.get_exam(self.exam_name):
+            return repo.chapter_table(self.exam_name)
+        return build_chapter_table(self.syllabus)
+
+    def _strategy_prompt(self, plan_df):
+        days = plan_df['Date'].nunique() if not plan_df.empty else 0
+        topics = len(plan_df)
+        focus_subjects = ", ".join(self.subjects) if self.subjects else "All Subjects"
+
+        return f"""
             You are an expert Exam Strategy Coach for Indian Entrance Exams (JEE/NEET).
             
             Student Profile:
@@ -223,8 +232,42 @@ class StudyPlannerAgent:
             
             **Expert Tip:** [Tip]
             """
-            
-            response = model.generate_content(prompt)
-            return response.text
+
+    def generate_ai_strategy(self, api_key, plan_df):
+        """
+        Generate a personalized strategy using Google Gemini.
+        Identical prompts are answered from the shared response cache.
+        """
+        try:
+            # Use a more available model or make it configurable
+            # gemini-1.5-flash is often the new standard for fast tasks
+            model_name = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
+            prompt = self._strategy_prompt(plan_df)
+
+            def ask_gemini():
+                genai.configure(api_key=api_key)
+                model = genai.GenerativeModel(model_name)
+                return model.generate_content(prompt).text
+
+            return get_response_cache().get_or_compute(model_name, prompt, ask_gemini)
         except Exception as e:
             return f"⚠️ **AI Coach Unavailable**: {str(e)}"
+
+    def stream_ai_strategy(self, api_key, plan_df):
+        """
+        Same strategy as generate_ai_strategy, yielded as text chunks while Gemini produces them.
+        """
+        try:
+            model_name = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
+            prompt = self._strategy_prompt(plan_df)
+
+            def stream_gemini():
+                genai.configure(api_key=api_key)
+                model = genai.GenerativeModel(model_name)
+                for chunk in model.generate_content(prompt, stream=True):
+                    if chunk.text:
+                        yield chunk.text
+
+            yield from get_response_cache().stream(model_name, prompt, stream_gemini)
+        except Exception as e:
+            yield f"⚠️ **AI Coach Unavailable**: {str(e)}"
@@ -0,0 +1,142 @@
+import hashlib
+import json
+import os
+import threading
+from types import MappingProxyType
+import numpy as np
+import pandas as pd
+from .scheduler import DEFAULT_CHAPTER_HOURS
+
+DEFAULT_SYLLABUS_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'syllabus.json')
+
+WEIGHT_MAP = {'High': 3, 'Medium': 2, 'Low': 1}
+
+
+def _freeze(value):
+    """
+    Recursively wrap parsed JSON in read-only containers so a single parsed
+    copy can be shared safely between every session in the process.
+    """
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def build_chapter_table(exam_syllabus):
+    """
+    Flatten {subject: [chapter, ...]} into one row per chapter with
+    Subject, Chapter, Weightage, Focus, Hours and Priority columns.
+    """
+    rows = [
+        (subject, chapter.get('name'), chapter.get('weightage', 'Low'), chapter.get('time_required', DEFAULT_CHAPTER_HOURS))
+        for subject, chapters in exam_syllabus.items()
+        for chapter in chapters
+    ]
+    table = pd.DataFrame(rows, columns=['Subject', 'Chapter', 'Weightage', 'Hours'])
+    table['Hours'] = pd.to_numeric(table['Hours'], errors='coerce').fillna(DEFAULT_CHAPTER_HOURS)
+    # Weight mapping applied once over the whole table
+    table['Priority'] = table['Weightage'].map(WEIGHT_MAP).fillna(1).astype(int)
+    table['Focus'] = pd.Categorical(
+        np.where(table['Weightage'] == 'High', 'Deep Study', 'Review'),
+        categories=['Deep Study', 'Review']
+    )
+    table['Subject'] = table['Subject'].astype('category')
+    table['Weightage'] = table['Weightage'].astype('category')
+    return table
+
+
+class SyllabusRepository:
+    """
+    Process-wide view of syllabus.json.
+
+    The file is parsed once and kept in memory as read-only per-exam views.
+    Every access does a cheap os.stat(); the file is only re-parsed when its
+    mtime or size changes.
+    """
+
+    def __init__(self, path=DEFAULT_SYLLABUS_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        # (stamp, exams, content_hash, derived) - swapped as one tuple so readers never see
+        # a torn state; `derived` caches per-exam tables built from this version of the file
+        self._state = (None, MappingProxyType({}), None, {})
+
+    def _stamp(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _current(self):
+        stamp = self._stamp()
+        state = self._state
+        if stamp == state[0]:
+            return state
+
+        with self._lock:
+            state = self._state
+            if stamp == state[0]:
+                return state
+
+            if stamp is None:
+                state = (None, MappingProxyType({}), None, {})
+            else:
+                try:
+                    with open(self.path, 'rb') as f:
+                        raw = f.read()
+                    state = (stamp, _freeze(json.loads(raw)), hashlib.sha256(raw).hexdigest(), {})
+                except Exception as e:
+                    print(f"Error loading syllabus: {e}")
+                    state = (stamp, MappingProxyType({}), None, {})
+
+            self._state = state
+            return state
+
+    def get_exam(self, exam_name):
+        """
+        Return the read-only {subject: (chapter, ...)} view for an exam, or {} if unknown.
+        """
+        return self._current()[1].get(exam_name, {})
+
+    def chapter_table(self, exam_name):
+        """
+        Flattened chapter table for an exam (see build_chapter_table), built once per file version.
+        Callers must treat it as read-only.
+        """
+        _, exams, _, derived = self._current()
+        table = derived.get(exam_name)
+        if table is None:
+            table = build_chapter_table(exams.get(exam_name, {}))
+            derived[exam_name] = table
+        return table
+
+    def get_subjects(self, exam_name):
+        return list(self.get_exam(exam_name).keys())
+
+    def exam_names(self):
+        return list(self._current()[1].keys())
+
+    @property
+    def content_hash(self):
+        """
+        SHA-256 of the syllabus file as currently loaded (None if it is missing).
+        """
+        return self._current()[2]
+
+
+_default_repo = SyllabusRepository()
+
+
+def get_syllabus_repository():
+    return _default_repo
+
+
+def get_exam_syllabus(exam_name):
+    return _default_repo.get_exam(exam_name)
+
+
+def get_subjects(exam_name):
+    return _default_repo.get_subjects(exam_name)
@@ -0,0 +1,209 @@
+"""
+On-disk journal of Google Calendar/Tasks sync jobs.
+
+A job is one sync run: the items it has to write, in order, and for each one whether it
+has been written and the remote id it got. Results are recorded batch by batch as they
+come back, so a run that stops halfway (quota, network, a closed tab) leaves a
+checkpoint. Running the same sync again resumes the unfinished job instead of starting
+over: items that were already written are not sent again. A job is claimed by the run
+working on it and kept alive by its checkpoints; another run of the same work only takes
+it over once that lease has lapsed, or straight away when the process holding it on this
+machine has exited. Progress can be read from the journal while a job runs.
+"""
+from contextlib import closing
+import hashlib
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+DEFAULT_JOURNAL_PATH = os.getenv(
+    "SYNC_JOURNAL_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), '.cache', 'sync_journal.sqlite3')
+)
+DEFAULT_RETENTION = 30 * 24 * 3600  # seconds; jobs untouched for this long are dropped
+DEFAULT_LEASE = 2 * 60              # seconds; a running job with no checkpoint for this long was abandoned
+
+
+class SyncInProgress(RuntimeError):
+    """
+    The same sync is already running elsewhere (another tab or process).
+    """
+
+
+def _owner():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _owner_exited(owner):
+    """
+    True when owner (from _owner) is a process on this machine that is no longer running.
+    """
+    host, _, pid = (owner or '').rpartition(':')
+    if host != socket.gethostname() or not pid.isdigit():
+        return False
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return True
+    except OSError:
+        pass  # exists, but belongs to another user
+    return False
+
+
+def job_signature(kind, account, target, item_hashes):
+    """
+    Identity of a sync run's work: the same items for the same destination.
+    """
+    blob = "\0".join([kind, account, target] + list(item_hashes))
+    return hashlib.sha256(blob.encode('utf-8')).hexdigest()
+
+
+class SyncJournal:
+    def __init__(self, path=DEFAULT_JOURNAL_PATH, retention=DEFAULT_RETENTION, lease=DEFAULT_LEASE,
+                 clock=time.time):
+        self.path = path
+        self.retention = retention
+        self.lease = lease
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._ready = False
+
+    def _connect(self):
+        if not self._ready:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        if not self._ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT, account TEXT, target TEXT,"
+                " signature TEXT, status TEXT, total INTEGER, created REAL, updated REAL, owner TEXT)"
+            )
+            if 'owner' not in [column[1] for column in conn.execute("PRAGMA table_info(jobs)")]:
+                conn.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")  # journals from before owners were kept
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS items ("
+                " job_id INTEGER, idx INTEGER, key TEXT, status TEXT, remote_id TEXT, error TEXT,"
+                " PRIMARY KEY (job_id, idx))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_signature ON jobs(signature, status)")
+            conn.commit()
+            self._ready = True
+        return conn
+
+    def start(self, kind, account, target, keys, signature=None):
+        """
+        Open a job for keys (one per item, in order) and return
+        {"id": job id, "written": {index: remote id}, "resumed": bool}.
+
+        With a signature, an unfinished job with the same signature is resumed and
+        "written" holds the items it already wrote. Jobs without one are never resumed.
+        Raises SyncInProgress while that job is still held by a live run.
+        """
+        now = self.clock()
+        with self._lock, closing(self._connect()) as conn, conn:
+            # Taken up front so looking for the job and claiming it can't interleave with another process
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "DELETE FROM items WHERE job_id IN (SELECT id FROM jobs WHERE updated < ?)", (now - self.retention,)
+            )
+            conn.execute("DELETE FROM jobs WHERE updated < ?", (now - self.retention,))
+
+            if signature is not None:
+                row = conn.execute(
+                    "SELECT id, status, updated, owner FROM jobs WHERE signature = ? AND status != 'done'"
+                    " ORDER BY id DESC LIMIT 1",
+                    (signature,)
+                ).fetchone()
+                if row is not None:
+                    job_id, status, updated, owner = row
+                    if status == 'running' and updated >= now - self.lease and not _owner_exited(owner):
+                        raise SyncInProgress("This sync is already running; try again once it has finished.")
+                    conn.execute("UPDATE jobs SET status = 'running', updated = ?, owner = ? WHERE id = ?",
+                                 (now, _owner(), job_id))
+                    written = conn.execute(
+                        "SELECT idx, remote_id FROM items WHERE job_id = ? AND status = 'done'", (job_id,)
+                    ).fetchall()
+                    return {"id": job_id, "written": dict(written), "resumed": True}
+
+            cursor = conn.execute(
+                "INSERT INTO jobs (kind, account, target, signature, status, total, created, updated, owner)"
+                " VALUES (?, ?, ?, ?, 'running', ?, ?, ?, ?)",
+                (kind, account, target, signature, len(keys), now, now, _owner())
+            )
+            job_id = cursor.lastrowid
+            conn.executemany(
+                "INSERT INTO items (job_id, idx, key, status) VALUES (?, ?, ?, 'pending')",
+                [(job_id, i, key) for i, key in enumerate(keys)]
+            )
+            return {"id": job_id, "written": {}, "resumed": False}
+
+    def record(self, job_id, results):
+        """
+        Checkpoint results: (index, remote id, error) per item; error is None on success.
+        Every checkpoint renews the job's lease.
+        """
+        rows = [
+            ('failed' if error is not None else 'done', remote_id, None if error is None else str(error), job_id, i)
+            for i, remote_id, error in results
+        ]
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                "UPDATE items SET status = ?, remote_id = ?, error = ? WHERE job_id = ? AND idx = ?", rows
+            )
+            conn.execute("UPDATE jobs SET updated = ? WHERE id = ?", (self.clock(), job_id))
+
+    def finish(self, job_id):
+        """
+        Close a job: 'done' when every item was written, else 'failed' (resumable).
+        """
+        with closing(self._connect()) as conn, conn:
+            pending = conn.execute(
+                "SELECT COUNT(*) FROM items WHERE job_id = ? AND status != 'done'", (job_id,)
+            ).fetchone()[0]
+            status = 'failed' if pending else 'done'
+            conn.execute("UPDATE jobs SET status = ?, updated = ? WHERE id = ?", (status, self.clock(), job_id))
+            return status
+
+    def progress(self, job_id):
+        with closing(self._connect()) as conn:
+            job = conn.execute("SELECT kind, target, status, total, created, updated FROM jobs WHERE id = ?",
+                               (job_id,)).fetchone()
+            if job is None:
+                return None
+            counts = dict(conn.execute(
+                "SELECT status, COUNT(*) FROM items WHERE job_id = ? GROUP BY status", (job_id,)
+            ).fetchall())
+        kind, target, status, total, created, updated = job
+        return {"id": job_id, "kind": kind, "target": target, "status": status, "total": total,
+                "done": counts.get('done', 0), "failed": counts.get('failed', 0),
+                "created": created, "updated": updated}
+
+    def latest(self, kind=None, since=None):
+        """
+        Progress of the most recent job (of kind, started at or after since), or None.
+        """
+        query, params = "SELECT id FROM jobs WHERE 1 = 1", []
+        if kind is not None:
+            query += " AND kind = ?"
+            params.append(kind)
+        if since is not None:
+            query += " AND created >= ?"
+            params.append(since)
+        with closing(self._connect()) as conn:
+            row = conn.execute(query + " ORDER BY id DESC LIMIT 1", params).fetchone()
+        return self.progress(row[0]) if row else None
+
+    def clear(self):
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM items")
+            conn.execute("DELETE FROM jobs")
+
+
+_default_journal = SyncJournal()
+
+
+def get_sync_journal():
+    return _default_journal
@@ -0,0 +1,78 @@
+"""
+On-disk copies of the remote list snapshots kept by calendar_sync.
+
+A snapshot is what a Google task list looked like at the last fetch, plus when that
+fetch started. Keeping it in SQLite means a restarted app or a new Streamlit worker asks
+Google only for what changed since then (updatedMin) instead of paging through the whole
+history again.
+"""
+from contextlib import closing
+import datetime
+import json
+import os
+import sqlite3
+
+DEFAULT_SNAPSHOT_PATH = os.getenv(
+    "SYNC_SNAPSHOT_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), '.cache', 'sync_snapshots.sqlite3')
+)
+
+
+def _snapshot_key(key):
+    return json.dumps(list(key))
+
+
+class SnapshotStore:
+    def __init__(self, path=DEFAULT_SNAPSHOT_PATH):
+        self.path = path
+        self._ready = False
+
+    def _connect(self):
+        if not self._ready:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        if not self._ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS snapshots ("
+                " key TEXT PRIMARY KEY, items TEXT, dupes TEXT, synced_at TEXT)"
+            )
+            conn.commit()
+            self._ready = True
+        return conn
+
+    def get(self, key):
+        """
+        Stored snapshot for key as {"items", "dupes", "synced_at"}, or None if there is
+        none or it can't be read.
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT items, dupes, synced_at FROM snapshots WHERE key = ?", (_snapshot_key(key),)
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            return {"items": json.loads(row[0]), "dupes": set(json.loads(row[1])),
+                    "synced_at": datetime.datetime.fromisoformat(row[2])}
+        except (TypeError, ValueError):
+            return None
+
+    def put(self, key, snapshot):
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO snapshots (key, items, dupes, synced_at) VALUES (?, ?, ?, ?)",
+                (_snapshot_key(key), json.dumps(snapshot['items']), json.dumps(sorted(snapshot['dupes'])),
+                 snapshot['synced_at'].isoformat())
+            )
+
+    def clear(self):
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM snapshots")
+
+
+_default_store = SnapshotStore()
+
+
+def get_snapshot_store():
+    return _default_store